@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# Run from the project root, e.g.:  python -m benchmarks.bench_place_order
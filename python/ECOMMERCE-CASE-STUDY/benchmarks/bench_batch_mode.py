@@ -0,0 +1,130 @@
+# benchmarks/bench_batch_mode.py
+"""
+Batch mode (dao.command_batch) vs. one repository call per command.
+
+    python -m benchmarks.bench_batch_mode --carts 2000 --lines 5 --orders 2000
+
+Builds a feed that loads --carts carts of --lines lines each and replays
+--orders orders with explicit lines, then runs it against a fresh scratch
+SQLite database:
+  - "per command": addToCart / placeOrder once per command, as the
+    interactive menu does;
+  - CommandBatch at each --chunk-sizes, with each of --workers.
+Reports commands/s and statements per command, and checks every run
+leaves the same cart lines and order count behind.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+
+from dao.command_batch import CommandBatch, parse_command
+from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+from dao.order_request import OrderRequest
+from entity.customer import Customer
+from entity.product import Product
+from benchmarks.support import StatementCounter, build_pool
+
+
+def _feed(customers, products, carts: int, lines: int, orders: int, seed: int):
+    rnd = random.Random(seed)
+    feed = []
+    for cust in rnd.sample(customers, min(carts, len(customers))):
+        for prod in rnd.sample(products, lines):
+            feed.append({"op": "add_to_cart", "customer_id": cust.customer_id,
+                         "product_id": prod.product_id, "quantity": rnd.randint(1, 3)})
+    for i in range(orders):
+        feed.append({"op": "place_order", "customer_id": rnd.choice(customers).customer_id,
+                     "shipping_address": "replay", "request_key": f"replay-{seed}-{i}",
+                     "lines": [[p.product_id, rnd.randint(1, 2)] for p in rnd.sample(products, 2)]})
+    return [parse_command(rec, n) for n, rec in enumerate(feed, start=1)]
+
+
+def _setup(props: str, counter: StatementCounter, args):
+    scratch = os.path.join(tempfile.gettempdir(), f"ecom-batch-{uuid.uuid4().hex[:8]}.sqlite3")
+    pool = build_pool(props, counter=counter, overrides={"database": scratch,
+                                                        "pool_max_size": str(max(args.workers) + 2)})
+    repo = OrderProcessorRepositoryImpl(pool=pool)
+    tag = uuid.uuid4().hex[:8]
+    products = [Product(name=f"batch-{tag}-{i}", price=float(i % 40 + 1), description=None, stockQuantity=10**9)
+                for i in range(args.products)]
+    repo.createProducts(products)
+    customers = repo.createCustomers(
+        Customer(name=f"batch {i}", email=f"batch-{tag}-{i}@example.com", password="x")
+        for i in range(args.customers)
+    ).succeeded
+    return scratch, pool, repo, customers, products
+
+
+def _state(pool):
+    with pool.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*), COALESCE(SUM(quantity), 0) FROM dbo.cart")
+            cart = tuple(cur.fetchall()[0])
+            cur.execute("SELECT COUNT(*) FROM dbo.orders")
+            orders = cur.fetchall()[0][0]
+    return cart, orders
+
+
+def _per_command(repo, feed):
+    failed = 0
+    for command in feed:
+        f = command.fields
+        try:
+            if command.op == "add_to_cart":
+                repo.addToCart(Customer(customer_id=f["customer_id"]), Product(product_id=f["product_id"]),
+                               f["quantity"])
+            else:
+                result = repo.placeOrders([OrderRequest(f["customer_id"], f["lines"], f["shipping_address"],
+                                                        f["request_key"])])[0]
+                failed += result.error is not None
+        except Exception:
+            failed += 1
+    return failed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--props", default="config/db-sqlite.properties")
+    parser.add_argument("--customers", type=int, default=2000)
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--carts", type=int, default=2000)
+    parser.add_argument("--lines", type=int, default=5)
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--chunk-sizes", default="100,500,2000")
+    parser.add_argument("--workers", default="1,4", help="worker counts to try")
+    args = parser.parse_args()
+    args.workers = [int(w) for w in args.workers.split(",")]
+
+    runs = [("per command", None, 1)]
+    runs += [(f"chunk {c}, {w} workers", int(c), w) for c in args.chunk_sizes.split(",") for w in args.workers]
+    print(f"{'run':<26} {'commands':>9} {'failed':>7} {'seconds':>8} {'commands/s':>11} {'stmts/cmd':>10} "
+          f"{'state':>6}")
+    expected = None
+    for label, chunk_size, workers in runs:
+        counter = StatementCounter()
+        scratch, pool, repo, customers, products = _setup(args.props, counter, args)
+        try:
+            feed = _feed(customers, products, args.carts, args.lines, args.orders, seed=42)
+            counter.reset()
+            started = time.perf_counter()
+            if chunk_size is None:
+                failed = _per_command(repo, feed)
+            else:
+                failed = sum(not r.ok for r in CommandBatch(repo, chunk_size, workers).run(feed))
+            elapsed = time.perf_counter() - started
+            state = _state(pool)
+            expected = expected or state
+            print(f"{label:<26} {len(feed):>9} {failed:>7} {elapsed:>8.2f} {len(feed) / elapsed:>11.0f} "
+                  f"{counter.round_trips / len(feed):>10.2f} {'ok' if state == expected else 'DIFF':>6}")
+        finally:
+            pool.close()
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(scratch + suffix):
+                    os.remove(scratch + suffix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/bench_cart_store.py
+"""
+Cart operations with carts in dbo.cart vs. the in-memory write-behind store.
+
+    python -m benchmarks.bench_cart_store --ops 20000 --threads 8
+
+The workload is 60% addToCart, 10% removeFromCart and 30% getAllFromCart
+over --customers customers and --products products. The memory run logs
+every change to a scratch append-only log and reports how many database
+writes the flusher needed for them.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from dao.cart_store import CartStore
+from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+from entity.customer import Customer
+from entity.product import Product
+from benchmarks.support import StatementCounter, build_pool, percentile
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--props", default="config/db-sqlite.properties")
+    parser.add_argument("--ops", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--customers", type=int, default=1000)
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--flush-ms", type=float, default=500)
+    args = parser.parse_args()
+
+    counter = StatementCounter()
+    overrides = {}
+    scratch = os.path.join(tempfile.gettempdir(), f"ecom-carts-{uuid.uuid4().hex[:8]}")
+    if "sqlite" in args.props:
+        overrides["database"] = scratch + ".sqlite3"
+    pool = build_pool(args.props, counter, overrides)
+    repo = OrderProcessorRepositoryImpl(pool=pool)
+    try:
+        tag = uuid.uuid4().hex[:8]
+        products = [Product(name=f"cart-{tag}-{i}", price=1.0, description=None, stockQuantity=100)
+                    for i in range(args.products)]
+        repo.createProducts(products)
+        customers = repo.createCustomers(
+            Customer(name=f"cart {i}", email=f"cart-{tag}-{i}@example.com", password="x")
+            for i in range(args.customers)
+        ).succeeded
+        rnd = random.Random(42)
+
+        print(f"{'store':<8} {'ops/s':>9} {'p50 us':>9} {'p99 us':>9} {'db stmts':>9} {'commits':>8}")
+        for store in ("db", "memory"):
+            plan = [(rnd.random(), rnd.choice(customers), rnd.choice(products)) for _ in range(args.ops)]
+            if store == "memory":
+                repo.carts = CartStore(repo, log_path=scratch + ".log", flush_ms=args.flush_ms)
+
+            def one(step) -> float:
+                r, cust, prod = step
+                started = time.perf_counter()
+                if r < 0.6:
+                    repo.addToCart(cust, prod, 1)
+                elif r < 0.7:
+                    repo.removeFromCart(cust, prod)
+                else:
+                    repo.getAllFromCart(cust)
+                return (time.perf_counter() - started) * 1_000_000.0
+
+            counter.reset()
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.threads) as executor:
+                latencies = list(executor.map(one, plan))
+            elapsed = time.perf_counter() - started
+            if repo.carts is not None:
+                repo.carts.close()      # include the final write-behind in the counts
+                repo.carts = None
+            print(f"{store:<8} {args.ops / elapsed:>9.0f} {percentile(latencies, 50):>9.1f} "
+                  f"{percentile(latencies, 99):>9.1f} {counter.statements:>9} {counter.commits:>8}")
+    finally:
+        pool.close()
+        for suffix in (".sqlite3", ".sqlite3-wal", ".sqlite3-shm", ".log"):
+            if os.path.exists(scratch + suffix):
+                os.remove(scratch + suffix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/bench_cart_upsert.py
+"""
+Concurrency check and timing for the cart upsert.
+
+    python -m benchmarks.bench_cart_upsert --threads 32 --adds 100 --basket 50
+
+1) Many threads call addToCart for the same (customer, product) pair. Every
+   call must succeed and the final quantity must equal threads * adds.
+2) A basket is added line by line with addToCart and then in one call with
+   addManyToCart, comparing latency.
+
+tests/test_cart_upsert.py runs check 1) on SQLite under pytest; use this
+script for SQL Server and larger thread counts.
+"""
+import argparse
+import threading
+import time
+import uuid
+
+from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+from entity.customer import Customer
+from entity.product import Product
+from benchmarks.support import build_pool
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--props", default="config/db.properties")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--adds", type=int, default=100, help="addToCart calls per thread")
+    parser.add_argument("--basket", type=int, default=50)
+    args = parser.parse_args()
+
+    pool = build_pool(args.props)
+    pool.max_size = max(pool.max_size, args.threads)
+    repo = OrderProcessorRepositoryImpl(pool=pool)
+
+    tag = uuid.uuid4().hex[:8]
+    customer = Customer(name=f"bench-{tag}", email=f"bench-{tag}@example.com", password="x")
+    repo.createCustomer(customer)
+    products = []
+    for i in range(max(args.basket, 1)):
+        prod = Product(name=f"bench-{tag}-{i}", price=1.0, description=None, stockQuantity=10)
+        repo.createProduct(prod)
+        products.append(prod)
+    hot = products[0]
+
+    # 1) same pair from many threads
+    errors = []
+
+    def hammer() -> None:
+        for _ in range(args.adds):
+            try:
+                repo.addToCart(customer, hot, 1)
+            except Exception as e:   # any failure is a bug here
+                errors.append(e)
+
+    threads = [threading.Thread(target=hammer) for _ in range(args.threads)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    qty = dict((p.get_product_id(), q) for p, q in repo.getAllFromCart(customer)).get(hot.get_product_id(), 0)
+    expected = args.threads * args.adds
+    print(f"concurrent addToCart: {expected} calls in {elapsed:.2f}s ({expected / elapsed:.0f}/s), "
+          f"errors={len(errors)}, final quantity={qty} (expected {expected})")
+
+    # 2) basket: per-line vs bulk
+    repo.removeFromCart(customer, hot)
+    basket = [(p, 1) for p in products[:args.basket]]
+    started = time.perf_counter()
+    for prod, q in basket:
+        repo.addToCart(customer, prod, q)
+    per_line_ms = (time.perf_counter() - started) * 1000.0
+    started = time.perf_counter()
+    repo.addManyToCart(customer, basket)
+    bulk_ms = (time.perf_counter() - started) * 1000.0
+    print(f"basket of {len(basket)}: addToCart loop {per_line_ms:.1f} ms, addManyToCart {bulk_ms:.1f} ms")
+
+    if errors or qty != expected:
+        raise SystemExit("cart upsert lost or rejected concurrent adds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_catalog_import.py
+"""
+Rows/sec and peak memory of the bulk catalog import.
+
+    python -m benchmarks.bench_catalog_import --rows 200000 --batch-size 5000
+
+Writes a synthetic CSV feed to a temp file, imports it with CatalogImporter
+and, for reference, inserts a small sample through the one-row-per-commit
+createProduct path. Peak traced memory should stay flat as --rows grows.
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+from dao.catalog_importer import CatalogImporter
+from entity.product import Product
+from benchmarks.support import build_pool
+
+
+def _write_feed(path: str, rows: int, tag: str) -> None:
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["name", "price", "description", "stockQuantity"])
+        for i in range(rows):
+            w.writerow([f"feed-{tag}-{i}", f"{(i % 5000) / 10:.2f}", f"Synthetic item {i}", i % 100])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--props", default="config/db.properties")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--single-rows", type=int, default=500, help="sample size for createProduct")
+    args = parser.parse_args()
+
+    repo = OrderProcessorRepositoryImpl(pool=build_pool(args.props))
+    tag = uuid.uuid4().hex[:8]
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        _write_feed(path, args.rows, tag)
+        importer = CatalogImporter(repo, batch_size=args.batch_size)
+        tracemalloc.start()
+        started = time.perf_counter()
+        count = sum(1 for _ in importer.import_file(path))
+        bulk_s = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        os.remove(path)
+
+    started = time.perf_counter()
+    for i in range(args.single_rows):
+        repo.createProduct(Product(None, f"single-{tag}-{i}", 1.0, None, 1))
+    single_s = time.perf_counter() - started
+
+    print(f"bulk import : {count} rows in {bulk_s:.2f}s = {count / bulk_s:,.0f} rows/s "
+          f"(peak {peak / 1e6:.1f} MB, batch {args.batch_size})")
+    print(f"createProduct: {args.single_rows} rows in {single_s:.2f}s = {args.single_rows / single_s:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# benchmarks/bench_checkout_queue.py
+"""
+Synchronous placeOrder vs. the checkout queue with worker processes.
+
+    python -m benchmarks.bench_checkout_queue --orders 2000 --clients 16 --workers 4
+
+A flash-sale shape: --clients threads check out --orders orders, each with
+2-3 lines drawn from a few --hot products. The synchronous run reports the
+latency clients see while placeOrder runs in their own threads. The queued
+run reports the enqueue latency clients see, then how long --workers
+processes take to drain the queue (groups of orders sharing products are
+placed with one placeOrders() call each).
+
+Runs on a scratch SQLite database unless --props points elsewhere
+(the queue itself is always a scratch SQLite file).
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from dao.checkout_worker import run_worker
+from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+from dao.order_queue import OrderQueue
+from entity.customer import Customer
+from entity.product import Product
+from util.property_util import DBPropertyUtil
+from benchmarks.support import build_pool, percentile
+
+
+def _orders(products: List[Product], customers: List[Customer], n: int,
+            seed: int) -> List[Tuple[Customer, List[Tuple[Product, int]]]]:
+    rnd = random.Random(seed)
+    return [
+        (rnd.choice(customers), [(p, rnd.randint(1, 2)) for p in rnd.sample(products, rnd.randint(2, 3))])
+        for _ in range(n)
+    ]
+
+
+def _timed(clients: int, fn, items) -> Tuple[float, List[float]]:
+    def one(item) -> float:
+        started = time.perf_counter()
+        fn(item)
+        return (time.perf_counter() - started) * 1000.0
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        latencies = list(executor.map(one, items))
+    return time.perf_counter() - started, latencies
+
+
+def _report(label: str, count: int, seconds: float, latencies: List[float]) -> None:
+    print(f"{label:<28} {count / seconds:>9.0f} {percentile(latencies, 50):>8.2f} "
+          f"{percentile(latencies, 95):>8.2f} {percentile(latencies, 99):>8.2f}")
+
+
+def _write_props(props: Dict[str, str], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for k, v in props.items():
+            f.write(f"{k}={v}\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--props", default="config/db-sqlite.properties")
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--hot", type=int, default=10, help="products the orders are drawn from")
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    props = DBPropertyUtil.get_properties(args.props)
+    scratch = []
+    if props.get("dialect", "").lower() == "sqlite":
+        props["database"] = os.path.join(tempfile.gettempdir(), f"ecom-queue-{uuid.uuid4().hex[:8]}.sqlite3")
+        scratch.append(props["database"])
+    queue_path = os.path.join(tempfile.gettempdir(), f"ecom-queue-{uuid.uuid4().hex[:8]}.queue")
+    prop_file = queue_path + ".properties"
+    scratch += [queue_path, prop_file]
+    _write_props(props, prop_file)
+
+    pool = build_pool(prop_file)
+    repo = OrderProcessorRepositoryImpl(pool=pool)
+    try:
+        tag = uuid.uuid4().hex[:8]
+        products = [Product(name=f"queue-{tag}-{i}", price=5.0 + i, description=None,
+                            stockQuantity=1_000_000_000) for i in range(args.hot)]
+        repo.createProducts(products)
+        customers = repo.createCustomers(
+            Customer(name=f"queue {i}", email=f"queue-{tag}-{i}@example.com", password="x")
+            for i in range(args.customers)
+        ).succeeded
+
+        print(f"{args.orders} orders over {args.hot} hot products, {args.clients} clients, "
+              f"{args.workers} workers ({pool.dialect.name})")
+        print(f"{'mode':<28} {'orders/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+
+        sync_orders = _orders(products, customers, args.orders, args.seed)
+        seconds, latencies = _timed(
+            args.clients, lambda o: repo.placeOrder(o[0], o[1], "1 Benchmark Road"), sync_orders)
+        _report("placeOrder (synchronous)", args.orders, seconds, latencies)
+
+        queue = OrderQueue(queue_path)
+        queued_orders = _orders(products, customers, args.orders, args.seed + 1)
+        seconds, latencies = _timed(
+            args.clients,
+            lambda o: queue.enqueue(o[0].customer_id, [(p.product_id, q) for p, q in o[1]], "1 Benchmark Road"),
+            queued_orders,
+        )
+        _report("enqueue (client latency)", args.orders, seconds, latencies)
+
+        started = time.perf_counter()
+        procs = [
+            multiprocessing.Process(target=run_worker, args=(f"bench-{i}", queue_path, prop_file),
+                                    kwargs=dict(batch_size=args.batch_size, exit_when_idle=True))
+            for i in range(args.workers)
+        ]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        drain_s = time.perf_counter() - started
+        stats = queue.stats()
+        queue.close()
+        print(f"{'drain (workers)':<28} {stats['done'] / drain_s:>9.0f}   "
+              f"done={stats['done']} failed={stats['failed']} left={stats['queued'] + stats['processing']}")
+    finally:
+        pool.close()
+        for path in scratch:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+
+if __name__ == "__main__":
+    main()
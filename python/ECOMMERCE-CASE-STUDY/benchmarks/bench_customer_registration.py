@@ -0,0 +1,56 @@
+# benchmarks/bench_customer_registration.py
+"""
+Throughput of createCustomers against the single-row createCustomer path.
+
+    python -m benchmarks.bench_customer_registration --rows 100000 --single-rows 1000
+
+About 1% of the generated rows repeat an earlier email, so the per-row
+failure reporting is exercised as well.
+"""
+import argparse
+import time
+import uuid
+
+from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+from entity.customer import Customer
+from benchmarks.support import build_pool
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--props", default="config/db.properties")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--single-rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    repo = OrderProcessorRepositoryImpl(pool=build_pool(args.props))
+    tag = uuid.uuid4().hex[:8]
+
+    def customers(prefix: str, n: int):
+        for i in range(n):
+            j = i - 1 if i and i % 100 == 0 else i      # every 100th row duplicates the previous email
+            yield Customer(None, f"{prefix} {i}", f"{prefix}-{tag}-{j}@example.com", "secret")
+
+    started = time.perf_counter()
+    result = repo.createCustomers(customers("bulk", args.rows), chunkSize=args.chunk_size)
+    bulk_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    single_ok = 0
+    for cust in customers("single", args.single_rows):
+        try:
+            repo.createCustomer(cust)
+            single_ok += 1
+        except Exception:
+            pass
+    single_s = time.perf_counter() - started
+
+    print(f"createCustomers: {args.rows} rows in {bulk_s:.2f}s = {args.rows / bulk_s:,.0f} rows/s "
+          f"({len(result.succeeded)} created, {len(result.failures)} rejected)")
+    print(f"createCustomer : {args.single_rows} rows in {single_s:.2f}s = {args.single_rows / single_s:,.0f} rows/s "
+          f"({single_ok} created)")
+
+
+if __name__ == "__main__":
+    main()
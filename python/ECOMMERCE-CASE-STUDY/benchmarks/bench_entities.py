@@ -0,0 +1,84 @@
+# benchmarks/bench_entities.py
+"""
+Memory and throughput of row -> Product mapping (no database needed).
+
+    python -m benchmarks.bench_entities --rows 1000000
+
+Compares the previous entity style (per-instance __dict__, keyword
+construction with int()/float() on every column) against the slotted
+Product built positionally by entity.row_mapper. Rows are plain tuples
+shaped like pyodbc.Row results.
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from decimal import Decimal
+
+from entity.product import Product
+from entity.row_mapper import products_from_rows
+
+
+class _DictProduct:
+    """
+    Replica of the pre-__slots__ Product, kept only for comparison.
+    """
+
+    def __init__(self, product_id=None, name=None, price=None, description=None, stockQuantity=None):
+        self._product_id = product_id
+        self._name = name
+        self._price = price
+        self._description = description
+        self._stockQuantity = stockQuantity
+
+    def get_price(self):
+        return self._price
+
+
+def _legacy_map(rows):
+    return [
+        _DictProduct(
+            product_id=int(r[0]),
+            name=r[1],
+            price=float(r[2]),
+            description=r[3],
+            stockQuantity=int(r[4]),
+        )
+        for r in rows
+    ]
+
+
+def _measure(label, fn, rows, read_price):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    objs = fn(rows)
+    build_s = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    total = 0.0
+    for o in objs:
+        total += read_price(o)
+    read_s = time.perf_counter() - started
+
+    n = len(rows)
+    print(f"{label:<22} build {n / build_s:>12,.0f} rows/s   read {n / read_s:>12,.0f} rows/s   "
+          f"peak {peak / 1e6:>8.1f} MB ({peak / n:.0f} B/row)")
+    return objs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rows = [(i, f"Product {i}", Decimal("19.99"), None, 100) for i in range(args.rows)]
+    _measure("dict + keywords", _legacy_map, rows, lambda o: o.get_price())
+    _measure("slots + row_mapper", products_from_rows, rows, lambda o: o.price)
+    _measure("slots + getter shim", products_from_rows, rows, Product.get_price)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/bench_existence_checks.py
+"""
+Statements and latency per cart call with and without existence pre-checks.
+
+    python -m benchmarks.bench_existence_checks --props config/db.properties --repeat 200
+
+"precheck" runs SELECTs on customers/products before each write (the old
+behaviour); "constraint" writes directly and relies on the FK constraints.
+The product cache is disabled so product pre-checks really hit the database.
+"""
+import argparse
+import time
+import uuid
+
+from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+from dao.product_cache import ProductCache
+from entity.customer import Customer
+from entity.product import Product
+from benchmarks.support import StatementCounter, build_pool, percentile
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--props", default="config/db.properties")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    counter = StatementCounter()
+    pool = build_pool(args.props, counter)
+    repos = {
+        "precheck": OrderProcessorRepositoryImpl(pool=pool, product_cache=ProductCache(max_size=0),
+                                                 precheck_existence=True),
+        "constraint": OrderProcessorRepositoryImpl(pool=pool, product_cache=ProductCache(max_size=0),
+                                                   precheck_existence=False),
+    }
+
+    tag = uuid.uuid4().hex[:8]
+    setup = repos["constraint"]
+    customer = Customer(name=f"bench-{tag}", email=f"bench-{tag}@example.com", password="x")
+    setup.createCustomer(customer)
+    product = Product(name=f"bench-{tag}", price=1.0, description=None, stockQuantity=10)
+    setup.createProduct(product)
+
+    # name -> (prepare, operation); prepare runs outside the measurement
+    operations = {
+        "addToCart": (None, lambda repo: repo.addToCart(customer, product, 1)),
+        "getAllFromCart": (None, lambda repo: repo.getAllFromCart(customer)),
+        "removeFromCart": (lambda repo: repo.addToCart(customer, product, 1),
+                           lambda repo: repo.removeFromCart(customer, product)),
+    }
+
+    print(f"{'mode':<11} {'operation':<15} {'stmts/call':>10} {'p50 ms':>9} {'p95 ms':>9}")
+    for mode, repo in repos.items():
+        for name, (prepare, op) in operations.items():
+            latencies = []
+            statements = 0
+            for _ in range(args.repeat):
+                if prepare is not None:
+                    prepare(repo)
+                before = counter.statements
+                started = time.perf_counter()
+                op(repo)
+                latencies.append((time.perf_counter() - started) * 1000.0)
+                statements += counter.statements - before
+            print(f"{mode:<11} {name:<15} {statements / args.repeat:>10.1f} "
+                  f"{percentile(latencies, 50):>9.2f} {percentile(latencies, 95):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# benchmarks/bench_group_commit.py
+"""
+placeOrder throughput with one commit per order vs. group commit.
+
+    python -m benchmarks.bench_group_commit --clients 1 16 128 --orders 3000
+
+For each client count, --clients threads place --orders orders (2-3 lines
+over --products products) first with per-order transactions, then through
+a GroupCommitCoordinator (--max-batch, --max-wait-ms). Reports orders/sec,
+p50/p99 latency, commits per order and the mean group size.
+
+Runs on a scratch SQLite database by default; --synchronous full makes
+every commit an fsync, which is where group commit pays off most.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+from dao.group_commit import GroupCommitCoordinator
+from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+from entity.customer import Customer
+from entity.product import Product
+from util.property_util import DBPropertyUtil
+from benchmarks.support import StatementCounter, build_pool, percentile
+
+
+def _run(place, orders: List[Tuple[Customer, List[Tuple[Product, int]]]], clients: int) -> Tuple[float, List[float], int]:
+    errors = 0
+
+    def one(order) -> float:
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            place(order[0], order[1], "1 Benchmark Road")
+        except Exception:
+            errors += 1
+        return (time.perf_counter() - started) * 1000.0
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        latencies = list(executor.map(one, orders))
+    return time.perf_counter() - started, latencies, errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--props", default="config/db-sqlite.properties")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 16, 128])
+    parser.add_argument("--orders", type=int, default=3000, help="orders per run")
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--customers", type=int, default=500)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--synchronous", help="sqlite_synchronous override, e.g. full")
+    args = parser.parse_args()
+
+    overrides = {"group_commit": "no", "pool_max_size": str(max(args.clients))}
+    scratch = None
+    if DBPropertyUtil.get_properties(args.props).get("dialect", "").lower() == "sqlite":
+        scratch = os.path.join(tempfile.gettempdir(), f"ecom-group-{uuid.uuid4().hex[:8]}.sqlite3")
+        overrides["database"] = scratch
+        if args.synchronous:
+            overrides["sqlite_synchronous"] = args.synchronous
+
+    counter = StatementCounter()
+    pool = build_pool(args.props, counter, overrides)
+    repo = OrderProcessorRepositoryImpl(pool=pool)
+    try:
+        tag = uuid.uuid4().hex[:8]
+        products = [Product(name=f"group-{tag}-{i}", price=1.0 + i % 50, description=None,
+                            stockQuantity=1_000_000_000) for i in range(args.products)]
+        repo.createProducts(products)
+        customers = repo.createCustomers(
+            Customer(name=f"group {i}", email=f"group-{tag}-{i}@example.com", password="x")
+            for i in range(args.customers)
+        ).succeeded
+        rnd = random.Random(42)
+
+        print(f"{'mode':<14} {'clients':>7} {'orders/s':>9} {'p50 ms':>8} {'p99 ms':>8} "
+              f"{'commits/order':>13} {'group':>6} {'errors':>7}")
+        for clients in args.clients:
+            for mode in ("per-order", "group commit"):
+                orders = [(rnd.choice(customers), [(p, rnd.randint(1, 2)) for p in rnd.sample(products, rnd.randint(2, 3))])
+                          for _ in range(args.orders)]
+                coordinator = None
+                place = repo.placeOrder
+                if mode == "group commit":
+                    coordinator = GroupCommitCoordinator(repo, args.max_batch, args.max_wait_ms)
+                    place = coordinator.placeOrder
+                counter.reset()
+                seconds, latencies, errors = _run(place, orders, clients)
+                group = "-"
+                if coordinator is not None:
+                    coordinator.close()
+                    group = f"{coordinator.orders / max(coordinator.batches, 1):.1f}"
+                print(f"{mode:<14} {clients:>7} {args.orders / seconds:>9.0f} {percentile(latencies, 50):>8.2f} "
+                      f"{percentile(latencies, 99):>8.2f} {counter.commits / args.orders:>13.2f} {group:>6} {errors:>7}")
+    finally:
+        pool.close()
+        if scratch:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(scratch + suffix):
+                    os.remove(scratch + suffix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# benchmarks/bench_import_time.py
+"""
+Cold-start cost of the entry point and packages, from `python -X importtime`.
+
+    python -m benchmarks.bench_import_time --runs 7
+    python -m benchmarks.bench_import_time --scale 2     # slower machine: double every budget
+
+Each target is imported in a fresh interpreter --runs times; the report
+gives the median import time of the modules it pulled in beyond the
+interpreter's own startup, the heaviest of them, and the modules it must
+not load (the SQL Server driver, asyncio, the full repository, ...).
+"EcomApp()" times constructing the CLI up to the first menu render, with
+--props (a scratch SQLite file by default; it must not be opened).
+
+Exits with status 1 if a target's median is over its budget (times
+--scale), it loads a module it must not, or the app touches the database
+before the first menu choice. Timings are noisy on shared machines: the
+budgets sit well above a quiet run; use --runs >= 5. tests/test_import_time.py
+checks the same targets and budgets under pytest.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import uuid
+from typing import Dict, List, Tuple
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+# statement, budget ms, modules it must leave unloaded
+_TARGETS: List[Tuple[str, float, Tuple[str, ...]]] = [
+    ("import util", 15, ("pyodbc", "asyncio", "util.db_connection", "util.async_connection_pool")),
+    ("import dao", 15, ("pyodbc", "asyncio", "dao.order_processor_repository_impl", "dao.cart_store",
+                        "dao.product_search", "dao.sales_analytics")),
+    ("import entity", 15, ("entity.row_mapper",)),
+    ("from main.ecom_app import EcomApp", 60, ("pyodbc", "asyncio", "sqlite3",
+                                               "dao.order_processor_repository_impl")),
+    ("from dao import OrderProcessorRepositoryImpl", 110, ("pyodbc", "asyncio", "concurrent.futures",
+                                                           "dao.product_search", "dao.cart_store",
+                                                           "dao.sales_analytics", "util.replica_router")),
+]
+_APP_BUDGET_MS = 60
+
+_APP = (
+    "import sys, time\n"
+    "started = time.perf_counter()\n"
+    "from main.ecom_app import EcomApp\n"
+    "EcomApp(sys.argv[1])\n"
+    "print((time.perf_counter() - started) * 1000.0)\n"
+    "print(' '.join(m for m in ('pyodbc', 'asyncio', 'sqlite3', 'dao.order_processor_repository_impl')"
+    " if m in sys.modules))\n"
+)
+
+
+def _importtime(statement: str) -> Dict[str, Tuple[int, int, int]]:
+    """
+    module -> (self us, cumulative us, depth) for one fresh interpreter.
+    """
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=_ROOT,
+                         capture_output=True, text=True, check=True).stderr
+    modules = {}
+    for line in out.splitlines():
+        m = _LINE.match(line)
+        if m:
+            modules[m.group(4)] = (int(m.group(1)), int(m.group(2)), (len(m.group(3)) - 1) // 2)
+    return modules
+
+
+def _measure(statement: str, startup: set, runs: int) -> Tuple[float, List[Tuple[str, float]], set]:
+    totals, heaviest, loaded = [], {}, set()
+    for _ in range(runs):
+        modules = {k: v for k, v in _importtime(statement).items() if k not in startup}
+        loaded = set(modules)
+        totals.append(sum(cum for _, cum, depth in modules.values() if depth == 0) / 1000.0)
+        for name, (own, _, _) in modules.items():
+            heaviest.setdefault(name, []).append(own / 1000.0)
+    top = sorted(((name, statistics.median(v)) for name, v in heaviest.items()), key=lambda x: -x[1])
+    return statistics.median(totals), top, loaded
+
+
+def _app(props: str, runs: int) -> Tuple[float, List[str]]:
+    times, loaded = [], []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", _APP, props], cwd=_ROOT,
+                             capture_output=True, text=True, check=True).stdout.splitlines()
+        times.append(float(out[0]))
+        loaded = out[1].split() if len(out) > 1 else []
+    return statistics.median(times), loaded
+
+
+def _scratch_props() -> Tuple[str, str]:
+    """
+    config/db-sqlite.properties pointed at a database file that does not exist yet.
+    """
+    scratch = os.path.join(tempfile.gettempdir(), f"ecom-cold-{uuid.uuid4().hex[:8]}")
+    with open(os.path.join(_ROOT, "config", "db-sqlite.properties"), encoding="utf-8") as f:
+        lines = [line for line in f.read().splitlines()
+                 if not line.strip().startswith("database=")]
+    lines.append(f"database={scratch}.sqlite3")
+    with open(scratch + ".properties", "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return scratch + ".properties", scratch + ".sqlite3"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=5, help="heaviest modules listed per target")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies every budget")
+    parser.add_argument("--props", default=None, help="property file for EcomApp() (default: scratch SQLite)")
+    args = parser.parse_args()
+
+    startup = set(_importtime("pass"))
+    failures = []
+    print(f"{'target':<46} {'median ms':>10} {'budget':>7}  heaviest modules (self ms)")
+    for statement, budget, forbidden in _TARGETS:
+        budget *= args.scale
+        total, top, loaded = _measure(statement, startup, args.runs)
+        heavy = ", ".join(f"{name} {ms:.1f}" for name, ms in top[:args.top])
+        print(f"{statement:<46} {total:>10.1f} {budget:>7g}  {heavy}")
+        if total > budget:
+            failures.append(f"{statement}: {total:.1f} ms over the {budget:g} ms budget")
+        for name in sorted(loaded & set(forbidden)):
+            failures.append(f"{statement}: loads {name}")
+
+    props, database = (args.props, None) if args.props else _scratch_props()
+    try:
+        budget = _APP_BUDGET_MS * args.scale
+        elapsed, loaded = _app(props, args.runs)
+        print(f"{'EcomApp() up to the menu':<46} {elapsed:>10.1f} {budget:>7g}  loaded: {' '.join(loaded) or '-'}")
+        if elapsed > budget:
+            failures.append(f"EcomApp(): {elapsed:.1f} ms over the {budget:g} ms budget")
+        for name in loaded:
+            failures.append(f"EcomApp(): loads {name}")
+        if database is not None and os.path.exists(database):
+            failures.append("EcomApp(): opened the database before the first menu choice")
+    finally:
+        if database is not None:
+            os.remove(props)
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(database + suffix):
+                    os.remove(database + suffix)
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
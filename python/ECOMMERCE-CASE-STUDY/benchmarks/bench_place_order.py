@@ -0,0 +1,57 @@
+# benchmarks/bench_place_order.py
+"""
+Round trips and latency of placeOrder against cart size.
+
+    python -m benchmarks.bench_place_order --props config/db.properties --sizes 1 10 100
+
+Seeds one customer and enough products for the largest cart, then repeatedly
+fills the cart and places an order from it. The old per-line path needed
+about 4N+3 statements for N lines; the set-based path stays constant.
+"""
+import argparse
+import time
+import uuid
+
+from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+from entity.customer import Customer
+from entity.product import Product
+from benchmarks.support import StatementCounter, build_pool, percentile
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--props", default="config/db.properties")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    counter = StatementCounter()
+    repo = OrderProcessorRepositoryImpl(pool=build_pool(args.props, counter))
+
+    tag = uuid.uuid4().hex[:8]
+    customer = Customer(name=f"bench-{tag}", email=f"bench-{tag}@example.com", password="x")
+    repo.createCustomer(customer)
+    products = []
+    for i in range(max(args.sizes)):
+        prod = Product(name=f"bench-{tag}-{i}", price=10.0 + i, description=None, stockQuantity=1_000_000)
+        repo.createProduct(prod)
+        products.append(prod)
+
+    print(f"{'lines':>6} {'round trips':>12} {'legacy (4N+3)':>14} {'p50 ms':>9} {'p95 ms':>9}")
+    for size in args.sizes:
+        latencies = []
+        trips = 0
+        for _ in range(args.repeat):
+            for prod in products[:size]:
+                repo.addToCart(customer, prod, 1)
+            counter.reset()
+            started = time.perf_counter()
+            repo.placeOrder(customer, None, "1 Benchmark Road")
+            latencies.append((time.perf_counter() - started) * 1000.0)
+            trips = counter.round_trips
+        print(f"{size:>6} {trips:>12} {4 * size + 3:>14} "
+              f"{percentile(latencies, 50):>9.2f} {percentile(latencies, 95):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
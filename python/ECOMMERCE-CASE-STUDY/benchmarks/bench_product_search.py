@@ -0,0 +1,102 @@
+# benchmarks/bench_product_search.py
+"""
+Build time, memory and query latency of the product search index.
+
+    python -m benchmarks.bench_product_search --products 1000000
+
+Generates a synthetic catalog in memory (no database): names of 3-5 words
+and descriptions of 8-15 words drawn from a Zipf-like vocabulary of
+--vocabulary words, so some words are very common and most are rare. Then
+runs each query shape --queries times and reports mean/p50/p99 latency in
+microseconds and the mean number of matches. --trace-memory measures the
+build's allocations exactly instead of estimating them.
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from dao.product_search import ProductSearchIndex
+from benchmarks.support import percentile
+
+
+def _vocabulary(size: int, rnd: random.Random) -> List[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < size:
+        words.add("".join(rnd.choice(letters) for _ in range(rnd.randint(4, 9))))
+    return sorted(words)
+
+
+def _catalog(n: int, vocab: List[str], rnd: random.Random):
+    # Zipf-like: word i drawn with weight 1 / (i + 1)
+    weights = [1.0 / (i + 1) for i in range(len(vocab))]
+    cum = []
+    total = 0.0
+    for w in weights:
+        total += w
+        cum.append(total)
+    pick = lambda k: rnd.choices(vocab, cum_weights=cum, k=k)
+    for pid in range(1, n + 1):
+        yield (pid, " ".join(pick(rnd.randint(3, 5))), round(rnd.uniform(1, 500), 2),
+               " ".join(pick(rnd.randint(8, 15))), rnd.choice((0, 5, 50, 500)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=2000, help="runs per query shape")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="measure the build's allocations with tracemalloc (slows the build down severalfold)")
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    vocab = _vocabulary(args.vocabulary, rnd)
+    rows = list(_catalog(args.products, vocab, rnd))
+
+    gc.collect()
+    if args.trace_memory:
+        tracemalloc.start()
+    index = ProductSearchIndex()
+    started = time.perf_counter()
+    index.build(rows)
+    build_s = time.perf_counter() - started
+    stats = index.stats()
+    memory = stats["approx_bytes"]
+    if args.trace_memory:
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    print(f"built {stats['products']} products, {stats['words']} words, {stats['postings']} postings "
+          f"in {build_s:.1f}s ({stats['products'] / build_s:.0f} products/s), index memory {memory / 2**20:.0f} MiB"
+          f"{' (traced)' if args.trace_memory else ' (approx.)'}")
+
+    common, mid, rare = vocab[:20], vocab[200:2000], vocab[10_000:]
+    shapes: Dict[str, Callable[[], float]] = {
+        "rare word": lambda: index.search(rnd.choice(rare)),
+        "mid word": lambda: index.search(rnd.choice(mid)),
+        "mid + rare": lambda: index.search(f"{rnd.choice(mid)} {rnd.choice(rare)}"),
+        "common + mid": lambda: index.search(f"{rnd.choice(common)} {rnd.choice(mid)}"),
+        "prefix (4 chars)": lambda: index.search(rnd.choice(rare)[:4]),
+        "mid, price+stock": lambda: index.search(rnd.choice(mid), min_price=50, max_price=150, in_stock=True),
+        "mid, page 5": lambda: index.search(rnd.choice(mid), offset=80, limit=20),
+        "common word": lambda: index.search(rnd.choice(common)),
+    }
+    print(f"{'query':<20} {'mean us':>10} {'p50 us':>10} {'p99 us':>10} {'matches':>10}")
+    for name, run in shapes.items():
+        latencies, matches = [], 0
+        queries = args.queries if name != "common word" else max(args.queries // 100, 5)
+        for _ in range(queries):
+            started = time.perf_counter()
+            result = run()
+            latencies.append((time.perf_counter() - started) * 1_000_000.0)
+            matches += result.total
+        print(f"{name:<20} {sum(latencies) / len(latencies):>10.1f} {percentile(latencies, 50):>10.1f} "
+              f"{percentile(latencies, 99):>10.1f} {matches / queries:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
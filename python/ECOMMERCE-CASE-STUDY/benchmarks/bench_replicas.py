@@ -0,0 +1,115 @@
+# benchmarks/bench_replicas.py
+"""
+Mixed read/write load on the primary alone vs. primary + SQLite replicas.
+
+    python -m benchmarks.bench_replicas --ops 20000 --threads 8 --replicas 2
+
+Customers are split between the threads, so each cart is only touched
+by one thread. Each operation picks one of the thread's customers; 20% are
+writes (addToCart, every fifth one followed by a placeOrder of the cart),
+the rest reads (getAllFromCart, getOrdersByCustomerPage). Right after each
+addToCart the thread reads the cart back and checks the line is there;
+"stale" counts reads that missed their own write, which only a lagging
+replica can cause (0 on the primary alone). The replica runs are done with the read-your-writes window
+on and off, with the replicas refreshed every --sync-ms by
+SQLiteReplicaSync.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+from dao.sqlite_dialect import SQLiteReplicaSync
+from entity.customer import Customer
+from entity.product import Product
+from util.replica_router import ReplicaRouter
+from benchmarks.support import build_pool, percentile
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--props", default="config/db-sqlite.properties")
+    parser.add_argument("--ops", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--replicas", type=int, default=2)
+    parser.add_argument("--customers", type=int, default=500)
+    parser.add_argument("--products", type=int, default=100)
+    parser.add_argument("--sync-ms", type=float, default=200)
+    parser.add_argument("--window", type=float, default=2.0, help="read_your_writes_seconds")
+    args = parser.parse_args()
+
+    scratch = os.path.join(tempfile.gettempdir(), f"ecom-replicas-{uuid.uuid4().hex[:8]}")
+    files = [f"{scratch}.sqlite3"] + [f"{scratch}-r{n}.sqlite3" for n in range(1, args.replicas + 1)]
+    primary = build_pool(args.props, overrides={"database": files[0]})
+    try:
+        repo = OrderProcessorRepositoryImpl(pool=primary)
+        tag = uuid.uuid4().hex[:8]
+        products = [Product(name=f"rep-{tag}-{i}", price=1.0, description=None, stockQuantity=10**9)
+                    for i in range(args.products)]
+        repo.createProducts(products)
+        customers = repo.createCustomers(
+            Customer(name=f"rep {i}", email=f"rep-{tag}-{i}@example.com", password="x")
+            for i in range(args.customers)
+        ).succeeded
+
+        print(f"{'setup':<22} {'ops/s':>8} {'read p50':>9} {'read p99':>9} {'write p50':>9} "
+              f"{'write p99':>9} {'stale':>6} {'replica reads':>13}")
+        for label, replicas, window in (("primary only", 0, 0.0),
+                                        (f"{args.replicas} replicas, no RYW", args.replicas, 0.0),
+                                        (f"{args.replicas} replicas, RYW {args.window:g}s", args.replicas, args.window)):
+            sync = router = None
+            if replicas:
+                sync = SQLiteReplicaSync(files[0], files[1:], args.sync_ms / 1000.0)
+                router = ReplicaRouter(primary, {str(n): build_pool(args.props, overrides={"database": f})
+                                                 for n, f in enumerate(files[1:], 1)},
+                                       read_your_writes=window)
+            repo.replicas = router
+            rnd = random.Random(42)
+            plans = [[(rnd.random(), rnd.choice(customers[t::args.threads]), rnd.choice(products))
+                      for _ in range(args.ops // args.threads + (t < args.ops % args.threads))]
+                     for t in range(args.threads)]
+
+            def one(step):
+                r, cust, prod = step
+                started = time.perf_counter()
+                stale = 0
+                if r < 0.04:
+                    repo.addToCart(cust, prod, 1)
+                    repo.placeOrder(cust, None, "bench")
+                elif r < 0.2:
+                    repo.addToCart(cust, prod, 1)
+                    stale = int(all(p.product_id != prod.product_id for p, _ in repo.getAllFromCart(cust)))
+                elif r < 0.6:
+                    repo.getAllFromCart(cust)
+                else:
+                    repo.getOrdersByCustomerPage(cust.customer_id, pageSize=10)
+                return r < 0.2, (time.perf_counter() - started) * 1_000_000.0, stale
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.threads) as executor:
+                outcomes = [o for part in executor.map(lambda plan: [one(step) for step in plan], plans)
+                            for o in part]
+            elapsed = time.perf_counter() - started
+            reads = [us for write, us, _ in outcomes if not write]
+            writes = [us for write, us, _ in outcomes if write]
+            replica_reads = sum(r["reads"] for r in router.stats()["replicas"].values()) if router else 0
+            print(f"{label:<22} {args.ops / elapsed:>8.0f} {percentile(reads, 50):>9.1f} {percentile(reads, 99):>9.1f} "
+                  f"{percentile(writes, 50):>9.1f} {percentile(writes, 99):>9.1f} "
+                  f"{sum(s for _, _, s in outcomes):>6} {replica_reads:>13}")
+            if router is not None:
+                sync.stop()
+                router.close()
+    finally:
+        primary.close()
+        for path in files:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+
+if __name__ == "__main__":
+    main()
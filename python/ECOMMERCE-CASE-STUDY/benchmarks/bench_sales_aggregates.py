@@ -0,0 +1,179 @@
+# benchmarks/bench_sales_aggregates.py
+"""
+Sales analytics from the incremental aggregates vs. GROUP BY over history.
+
+    python -m benchmarks.bench_sales_aggregates --history 20000,100000,500000
+
+Fills a scratch SQLite database with synthetic order history spread over
+the last year (growing to each --history size in turn), backfills the
+aggregates while a thread keeps placing orders through the repository,
+and then:
+  - checks product totals, customer values and the 30-day top 10 against
+    the same figures computed with GROUP BY over dbo.orders/order_items;
+  - times the 30-day top 10 both ways (the ranking cache is off).
+Finally reports placeOrder latency with the aggregates off and on.
+"""
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+
+from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+from dao.sales_analytics import SalesAggregates
+from entity.customer import Customer
+from entity.product import Product
+from benchmarks.support import build_pool, percentile
+
+_ADHOC_TOP = """
+    SELECT oi.product_id, SUM(oi.quantity), SUM(oi.quantity * oi.unit_price)
+    FROM dbo.order_items oi
+    JOIN dbo.orders o ON o.order_id = oi.order_id
+    WHERE o.order_date >= ?
+    GROUP BY oi.product_id
+    ORDER BY SUM(oi.quantity * oi.unit_price) DESC, oi.product_id
+    LIMIT ?
+    """
+
+
+def _timed(fn, runs: int = 5):
+    best, result = float("inf"), None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000.0, result
+
+
+def _history(conn, rnd: random.Random, count: int, customers, products, now: datetime.datetime) -> None:
+    cur = conn.cursor()
+    cur.execute("SELECT COALESCE(MAX(order_id), 0) FROM orders")
+    first = cur.fetchone()[0] + 1
+    orders, items = [], []
+    for order_id in range(first, first + count):
+        placed = now - datetime.timedelta(seconds=rnd.randint(0, 365 * 86400))
+        lines = {rnd.choice(products).product_id: rnd.randint(1, 3) for _ in range(rnd.randint(1, 4))}
+        total = 0.0
+        for pid, qty in lines.items():
+            price = float(pid % 50 + 1)
+            items.append((order_id, pid, qty, price))
+            total += qty * price
+        orders.append((order_id, rnd.choice(customers).customer_id, placed.strftime("%Y-%m-%d %H:%M:%S"),
+                       total, "history"))
+    cur.executemany("INSERT INTO orders (order_id, customer_id, order_date, total_price, shipping_address) "
+                    "VALUES (?, ?, ?, ?, ?)", orders)
+    cur.executemany("INSERT INTO order_items (order_id, product_id, quantity, unit_price) VALUES (?, ?, ?, ?)", items)
+    conn.commit()
+
+
+def _check(repo, since: str) -> str:
+    with repo.pool.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT product_id, SUM(quantity), SUM(quantity * unit_price) FROM dbo.order_items "
+                        "GROUP BY product_id")
+            products = {pid: (units, round(rev, 2)) for pid, units, rev in cur.fetchall()}
+            cur.execute("SELECT product_id, units, revenue FROM dbo.product_sales")
+            agg_products = {pid: (units, round(rev, 2)) for pid, units, rev in cur.fetchall()}
+            cur.execute("SELECT customer_id, COUNT(*), SUM(total_price) FROM dbo.orders GROUP BY customer_id")
+            customers = {cid: (n, round(v, 2)) for cid, n, v in cur.fetchall()}
+            cur.execute("SELECT customer_id, order_count, lifetime_value FROM dbo.customer_value")
+            agg_customers = {cid: (n, round(v, 2)) for cid, n, v in cur.fetchall()}
+            cur.execute(_ADHOC_TOP, since, 10)
+            adhoc_top = [pid for pid, _, _ in cur.fetchall()]
+    top = [pid for pid, _, _ in repo.sales.top_products(10, since=since[:10])]
+    bad_products = sum(1 for k in products.keys() | agg_products.keys()
+                       if abs(products.get(k, (0, 0))[1] - agg_products.get(k, (0, 0))[1]) > 0.01
+                       or products.get(k, (0,))[0] != agg_products.get(k, (0,))[0])
+    bad_customers = sum(1 for k in customers.keys() | agg_customers.keys()
+                        if customers.get(k, (0,))[0] != agg_customers.get(k, (0,))[0]
+                        or abs(customers.get(k, (0, 0))[1] - agg_customers.get(k, (0, 0))[1]) > 0.01)
+    if bad_products or bad_customers or top != adhoc_top:
+        return f"MISMATCH products={bad_products} customers={bad_customers} top_equal={top == adhoc_top}"
+    return "ok"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--props", default="config/db-sqlite.properties")
+    parser.add_argument("--history", default="20000,100000,500000", help="order history sizes to test")
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--customers", type=int, default=5000)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--orders", type=int, default=2000, help="placeOrder calls for the latency run")
+    args = parser.parse_args()
+
+    scratch = os.path.join(tempfile.gettempdir(), f"ecom-sales-{uuid.uuid4().hex[:8]}.sqlite3")
+    pool = build_pool(args.props, overrides={"database": scratch})
+    try:
+        repo = OrderProcessorRepositoryImpl(pool=pool)
+        repo.sales = SalesAggregates(repo, cache_seconds=0)   # time the queries, not the cache
+        tag = uuid.uuid4().hex[:8]
+        products = [Product(name=f"sales-{tag}-{i}", price=float(i % 50 + 1), description=None,
+                            stockQuantity=10**9) for i in range(args.products)]
+        repo.createProducts(products)
+        customers = repo.createCustomers(
+            Customer(name=f"sales {i}", email=f"sales-{tag}-{i}@example.com", password="x")
+            for i in range(args.customers)
+        ).succeeded
+        rnd = random.Random(42)
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        since = (now - datetime.timedelta(days=29)).strftime("%Y-%m-%d 00:00:00")
+
+        print(f"{'history':>9} {'backfill s':>11} {'orders/s':>9} {'live':>6} {'check':>6} "
+              f"{'GROUP BY ms':>12} {'aggregate ms':>13}")
+        loaded = 0
+        for size in (int(x) for x in args.history.split(",")):
+            with pool.connection() as conn:
+                _history(conn, rnd, size - loaded, customers, products, now)
+            loaded = size
+
+            stop = threading.Event()
+            live = [0]
+
+            def shop():
+                # orders committing while the backfill runs
+                while not stop.is_set():
+                    repo.placeOrder(rnd.choice(customers), [(rnd.choice(products), 1)], "live")
+                    live[0] += 1
+
+            shopper = threading.Thread(target=shop)
+            shopper.start()
+            started = time.perf_counter()
+            counted = repo.sales.backfill(args.chunk_size, restart=True)
+            backfill_s = time.perf_counter() - started
+            stop.set()
+            shopper.join()
+
+            def adhoc():
+                with pool.connection() as conn:
+                    with conn.cursor() as cur:
+                        cur.execute(_ADHOC_TOP, since, 10)
+                        return cur.fetchall()
+
+            adhoc_ms, _ = _timed(adhoc)
+            agg_ms, _ = _timed(lambda: repo.sales.top_products(10, since=since[:10]))
+            print(f"{size:>9} {backfill_s:>11.1f} {counted / backfill_s:>9.0f} {live[0]:>6} "
+                  f"{_check(repo, since):>6} {adhoc_ms:>12.1f} {agg_ms:>13.2f}")
+
+        print(f"\n{'aggregates':<11} {'placeOrder p50 us':>18} {'p99 us':>9}")
+        for label, sales in (("off", None), ("on", repo.sales)):
+            repo.sales = sales
+            latencies = []
+            for _ in range(args.orders):
+                started = time.perf_counter()
+                repo.placeOrder(rnd.choice(customers), [(rnd.choice(products), 1), (rnd.choice(products), 2)],
+                                "bench")
+                latencies.append((time.perf_counter() - started) * 1_000_000.0)
+            print(f"{label:<11} {percentile(latencies, 50):>18.1f} {percentile(latencies, 99):>9.1f}")
+    finally:
+        pool.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(scratch + suffix):
+                os.remove(scratch + suffix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/bench_statement_cache.py
+"""
+Per-call cost of _load_product and addToCart with and without the
+per-connection statement cache (util.statement_cache).
+
+    python -m benchmarks.bench_statement_cache --props config/db.properties --calls 20000
+
+The product cache is disabled so every _load_product reaches the database.
+Both runs use one pooled connection, so the difference is the cursor
+allocation and statement prepare saved per call.
+"""
+import argparse
+import time
+import uuid
+
+from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+from dao.product_cache import ProductCache
+from entity.customer import Customer
+from entity.product import Product
+from benchmarks.support import build_pool, percentile
+
+
+def _measure(fn, calls: int):
+    latencies = []
+    for i in range(calls):
+        started = time.perf_counter()
+        fn(i)
+        latencies.append((time.perf_counter() - started) * 1_000_000.0)
+    return sum(latencies) / len(latencies), percentile(latencies, 50), percentile(latencies, 99)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--props", default="config/db.properties")
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--products", type=int, default=100)
+    parser.add_argument("--cache-size", type=int, default=32)
+    args = parser.parse_args()
+
+    print(f"{'statement cache':<16} {'call':<14} {'mean us':>9} {'p50 us':>9} {'p99 us':>9}")
+    for size in (0, args.cache_size):
+        pool = build_pool(args.props, overrides={"statement_cache_size": str(size), "pool_max_size": "1"})
+        repo = OrderProcessorRepositoryImpl(pool=pool, product_cache=ProductCache(max_size=0))
+
+        tag = uuid.uuid4().hex[:8]
+        customer = Customer(name=f"stmt-{tag}", email=f"stmt-{tag}@example.com", password="x")
+        repo.createCustomer(customer)
+        products = [Product(name=f"stmt-{tag}-{i}", price=1.0, description=None, stockQuantity=10)
+                    for i in range(args.products)]
+        repo.createProducts(products)
+        ids = [p.product_id for p in products]
+
+        def load(i):
+            with pool.connection() as conn:
+                repo._load_product(conn, ids[i % len(ids)])
+
+        def add(i):
+            repo.addToCart(customer, products[i % len(products)], 1)
+
+        label = "off" if size == 0 else f"{size} cursors"
+        for name, fn in (("_load_product", load), ("addToCart", add)):
+            fn(0)       # warm the pool connection
+            mean, p50, p99 = _measure(fn, args.calls)
+            print(f"{label:<16} {name:<14} {mean:>9.1f} {p50:>9.1f} {p99:>9.1f}")
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
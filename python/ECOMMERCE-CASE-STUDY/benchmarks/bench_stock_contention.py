@@ -0,0 +1,97 @@
+# benchmarks/bench_stock_contention.py
+"""
+Multi-threaded checkout contention on hot SKUs; verifies zero oversell.
+
+    python -m benchmarks.bench_stock_contention --threads 32 --orders 50 --stock 500
+
+Every thread places orders of random quantities against a few hot products
+whose combined demand far exceeds stock. At the end the units actually sold
+(sum of order_items) plus the remaining stock must equal the initial stock,
+and no product may go negative.
+"""
+import argparse
+import random
+import threading
+import time
+import uuid
+from typing import List
+
+from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+from entity.customer import Customer
+from entity.product import Product
+from myexceptions import InsufficientStockException
+from benchmarks.support import build_pool
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--props", default="config/db.properties")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--orders", type=int, default=50, help="orders per thread")
+    parser.add_argument("--skus", type=int, default=3)
+    parser.add_argument("--stock", type=int, default=500)
+    args = parser.parse_args()
+
+    pool = build_pool(args.props)
+    pool.max_size = max(pool.max_size, args.threads)
+    repo = OrderProcessorRepositoryImpl(pool=pool)
+
+    tag = uuid.uuid4().hex[:8]
+    hot: List[Product] = []
+    for i in range(args.skus):
+        prod = Product(name=f"hot-{tag}-{i}", price=1.0, description=None, stockQuantity=args.stock)
+        repo.createProduct(prod)
+        hot.append(prod)
+    customers = []
+    for t in range(args.threads):
+        cust = Customer(name=f"buyer-{tag}-{t}", email=f"buyer-{tag}-{t}@example.com", password="x")
+        repo.createCustomer(cust)
+        customers.append(cust)
+
+    lock = threading.Lock()
+    placed = [0]
+    rejected = [0]
+
+    def worker(cust: Customer) -> None:
+        rnd = random.Random()
+        for _ in range(args.orders):
+            lines = [(p, rnd.randint(1, 5)) for p in rnd.sample(hot, rnd.randint(1, len(hot)))]
+            try:
+                repo.placeOrder(cust, lines, "1 Contention Lane")
+                with lock:
+                    placed[0] += 1
+            except InsufficientStockException:
+                with lock:
+                    rejected[0] += 1
+
+    threads = [threading.Thread(target=worker, args=(c,)) for c in customers]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    oversold = False
+    with pool.connection() as conn:
+        with conn.cursor() as cur:
+            for prod in hot:
+                cur.execute("SELECT stockQuantity FROM dbo.products WHERE product_id = ?", prod.get_product_id())
+                remaining = int(cur.fetchone()[0])
+                cur.execute("SELECT COALESCE(SUM(quantity), 0) FROM dbo.order_items WHERE product_id = ?",
+                            prod.get_product_id())
+                sold = int(cur.fetchone()[0])
+                ok = remaining >= 0 and sold + remaining == args.stock
+                oversold |= not ok
+                print(f"product {prod.get_product_id()}: sold={sold} remaining={remaining} "
+                      f"{'OK' if ok else 'OVERSOLD'}")
+
+    attempts = placed[0] + rejected[0]
+    print(f"{attempts} checkouts in {elapsed:.2f}s ({attempts / elapsed:.0f}/s): "
+          f"{placed[0]} placed, {rejected[0]} rejected for stock")
+    if oversold:
+        raise SystemExit("oversell detected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# benchmarks/load_async_vs_sync.py
+"""
+Load generator comparing requests/sec of the sync and async repositories.
+
+    python -m benchmarks.load_async_vs_sync --clients 1000 --requests 20000
+
+The workload is a cart-heavy mix (80% getAllFromCart, 20% addToCart) spread
+over --customers customers. The sync side runs --threads OS threads; the
+async side runs concurrent coroutines on one event loop, first as many as
+--threads (same concurrency as the sync run) and then --clients. Latency is
+per call as the caller sees it: with more async clients than pool slots it
+is mostly queueing (about clients / throughput).
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+from dao.async_order_processor_repository import AsyncOrderProcessorRepository
+from entity.customer import Customer
+from entity.product import Product
+from benchmarks.support import build_pool, percentile
+
+
+def _seed(repo: OrderProcessorRepositoryImpl, customers: int, products: int):
+    tag = uuid.uuid4().hex[:8]
+    custs: List[Customer] = []
+    for i in range(customers):
+        cust = Customer(name=f"load-{tag}-{i}", email=f"load-{tag}-{i}@example.com", password="x")
+        repo.createCustomer(cust)
+        custs.append(cust)
+    prods: List[Product] = []
+    for i in range(products):
+        prod = Product(name=f"load-{tag}-{i}", price=1.0, description=None, stockQuantity=1000)
+        repo.createProduct(prod)
+        prods.append(prod)
+    return custs, prods
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--props", default="config/db.properties")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=32, help="sync worker threads")
+    parser.add_argument("--clients", type=int, default=1000, help="concurrent async clients")
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--products", type=int, default=50)
+    args = parser.parse_args()
+
+    repo = OrderProcessorRepositoryImpl(pool=build_pool(args.props))
+    custs, prods = _seed(repo, args.customers, args.products)
+    rnd = random.Random(42)
+    plan = [(rnd.random() < 0.8, rnd.choice(custs), rnd.choice(prods)) for _ in range(args.requests)]
+
+    # ---- sync: thread pool ----
+    def sync_request(step):
+        read, cust, prod = step
+        started = time.perf_counter()
+        if read:
+            repo.getAllFromCart(cust)
+        else:
+            repo.addToCart(cust, prod, 1)
+        return (time.perf_counter() - started) * 1000.0
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        sync_latencies = list(executor.map(sync_request, plan))
+    sync_elapsed = time.perf_counter() - started
+
+    # ---- async: one event loop, many clients ----
+    async_repo = AsyncOrderProcessorRepository(repository=repo)
+
+    async def run_async(clients: int) -> List[float]:
+        queue = iter(plan)
+        latencies: List[float] = []
+
+        async def client():
+            for read, cust, prod in queue:
+                t0 = time.perf_counter()
+                if read:
+                    await async_repo.getAllFromCart(cust)
+                else:
+                    await async_repo.addToCart(cust, prod, 1)
+                latencies.append((time.perf_counter() - t0) * 1000.0)
+
+        await asyncio.gather(*(client() for _ in range(clients)))
+        return latencies
+
+    runs = [(f"sync, {args.threads} threads", sync_elapsed, sync_latencies)]
+    for clients in sorted({args.threads, args.clients}):
+        started = time.perf_counter()
+        latencies = asyncio.run(run_async(clients))
+        runs.append((f"async, {clients} clients", time.perf_counter() - started, latencies))
+    async_repo.close()
+
+    print(f"{'mode':<22} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for mode, elapsed, lat in runs:
+        print(f"{mode:<22} {len(lat) / elapsed:>9.0f} {percentile(lat, 50):>9.2f} {percentile(lat, 99):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/profile_calls.py
+"""
+Per-call statement profile of the repository, via util.instrumentation.
+
+    python -m benchmarks.profile_calls --props config/db-sqlite.properties --lines 1 10 50
+
+For each cart size it fills a cart, places the order and reads the history,
+then prints round trips and commits per repository call (a count growing
+with --lines is an N+1 pattern), the statements with the most total time,
+and any statement slower than --slow-ms through the slow-query log.
+"""
+import argparse
+import logging
+import uuid
+
+from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+from entity.customer import Customer
+from entity.product import Product
+from util.instrumentation import CallStats, Instrumentation
+from benchmarks.support import build_pool
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--props", default="config/db.properties")
+    parser.add_argument("--lines", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--slow-ms", type=float, default=50.0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format="%(name)s: %(message)s")
+
+    for lines in args.lines:
+        instrumentation = Instrumentation(slow_query_ms=args.slow_ms)
+        stats = CallStats()
+        instrumentation.add_listener(stats)
+        repo = OrderProcessorRepositoryImpl(pool=build_pool(args.props, instrumentation=instrumentation))
+
+        tag = uuid.uuid4().hex[:8]
+        customer = Customer(name=f"profile-{tag}", email=f"profile-{tag}@example.com", password="x")
+        repo.createCustomer(customer)
+        products = [Product(name=f"profile-{tag}-{i}", price=5.0, description=None, stockQuantity=100)
+                    for i in range(lines)]
+        repo.createProducts(products)
+        for prod in products:
+            repo.addToCart(customer, prod, 1)
+        repo.getAllFromCart(customer)
+        repo.placeOrder(customer, None, "1 Profile Lane")
+        repo.getOrdersWithItemsByCustomer(customer.customer_id)
+        repo.pool.close()
+
+        print(f"\n== cart of {lines} line(s)")
+        print(f"{'call':<30} {'calls':>6} {'stmts/call':>11} {'commits/call':>13} {'mean ms':>9}")
+        for row in stats.per_call():
+            print(f"{row['operation']:<30} {row['calls']:>6} {row['statements_per_call']:>11.1f} "
+                  f"{row['commits_per_call']:>13.1f} {row['mean_ms']:>9.2f}")
+        print("top statements by total time:")
+        for row in stats.top_statements(5):
+            print(f"  {row['total_ms']:>8.2f} ms  x{row['count']:<4} {row['sql'][:100]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+# benchmarks/suite.py
+"""
+End-to-end benchmark of every OrderProcessorRepositoryImpl operation.
+
+    python -m benchmarks.suite --threads 1 8 --ops 2000 --out results.json
+    python -m benchmarks.suite --compare baseline.json --max-regression 0.25
+
+Seeds a synthetic catalog, customers and carts (--products, --customers,
+--cart-lines), then runs each operation --ops times per thread count and
+reports p50/p95/p99 latency, ops/sec and statements per operation.
+
+By default it runs against a scratch SQLite file (config/db-sqlite.properties
+with `database` pointed at a temp file, deleted afterwards); pass --props
+for another database and --db to keep the file.
+
+--out writes the results as JSON. --compare loads an earlier JSON run and
+exits with status 1 if any operation lost more than --max-regression of its
+throughput or grew its p95 by more than that fraction.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+from entity.customer import Customer
+from entity.product import Product
+from util.property_util import DBPropertyUtil
+from benchmarks.support import StatementCounter, build_pool, percentile
+
+
+class Workload:
+    """
+    Seeded data shared by the operations. Targets that an operation consumes
+    (rows to delete) are handed out under a lock.
+    """
+
+    def __init__(self, repo: OrderProcessorRepositoryImpl, seed: int):
+        self.repo = repo
+        self.tag = uuid.uuid4().hex[:8]
+        self.customers: List[Customer] = []
+        self.products: List[Product] = []
+        self.deletable_customers: List[Customer] = []
+        self.deletable_products: List[Product] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._seed = seed
+
+    def rnd(self) -> random.Random:
+        """
+        Per-thread Random, so threads do not contend on one generator.
+        """
+        r = getattr(self._local, "rnd", None)
+        if r is None:
+            r = self._local.rnd = random.Random(f"{self._seed}-{threading.get_ident()}")
+        return r
+
+    def seed(self, products: int, customers: int, cart_lines: int, deletable: int) -> None:
+        self.products = [
+            Product(name=f"suite-{self.tag}-{i}", price=round(1.0 + (i % 500) * 0.5, 2),
+                    description=f"synthetic product {i}", stockQuantity=1_000_000_000)
+            for i in range(products)
+        ]
+        self.repo.createProducts(self.products)
+        result = self.repo.createCustomers(
+            Customer(name=f"suite {i}", email=f"suite-{self.tag}-{i}@example.com", password="x")
+            for i in range(customers + deletable)
+        )
+        self.customers = result.succeeded[:customers]
+        self.deletable_customers = result.succeeded[customers:]
+        rnd = random.Random(self._seed)
+        for cust in self.customers:
+            lines = rnd.sample(self.products, min(cart_lines, len(self.products)))
+            if lines:
+                self.repo.addManyToCart(cust, [(prod, rnd.randint(1, 3)) for prod in lines])
+
+    def any_customer(self) -> Customer:
+        return self.rnd().choice(self.customers)
+
+    def any_product(self) -> Product:
+        return self.rnd().choice(self.products)
+
+    def take(self, items: List[Any]) -> Any:
+        with self._lock:
+            if not items:
+                raise RuntimeError("workload exhausted; raise --ops headroom")
+            return items.pop()
+
+    def give(self, items: List[Any], item: Any) -> None:
+        with self._lock:
+            items.append(item)
+
+
+def _create_product(w: Workload) -> None:
+    prod = Product(name=f"suite-{w.tag}-new", price=9.99, description=None, stockQuantity=10)
+    w.repo.createProduct(prod)
+    w.give(w.deletable_products, prod)
+
+
+def _add_to_cart(w: Workload) -> None:
+    w.repo.addToCart(w.any_customer(), w.any_product(), 1)
+
+
+def _get_all_from_cart(w: Workload) -> None:
+    w.repo.getAllFromCart(w.any_customer())
+
+
+def _place_order(w: Workload) -> None:
+    rnd = w.rnd()
+    items = [(prod, rnd.randint(1, 2)) for prod in rnd.sample(w.products, min(3, len(w.products)))]
+    w.repo.placeOrder(w.any_customer(), items, "1 Benchmark Road")
+
+
+def _get_orders_by_customer(w: Workload) -> None:
+    w.repo.getOrdersByCustomer(w.any_customer().customer_id)
+
+
+def _get_orders_page(w: Workload) -> None:
+    w.repo.getOrdersWithItemsByCustomer(w.any_customer().customer_id, pageSize=20)
+
+
+def _remove_from_cart(w: Workload) -> None:
+    w.repo.removeFromCart(w.any_customer(), w.any_product())
+
+
+def _delete_product(w: Workload) -> None:
+    w.repo.deleteProduct(w.take(w.deletable_products).product_id)
+
+
+def _delete_customer(w: Workload) -> None:
+    w.repo.deleteCustomer(w.take(w.deletable_customers).customer_id)
+
+
+# Run in this order: later operations read what earlier ones wrote
+# (order history, products created to be deleted).
+OPERATIONS: Dict[str, Callable[[Workload], None]] = {
+    "createProduct": _create_product,
+    "addToCart": _add_to_cart,
+    "getAllFromCart": _get_all_from_cart,
+    "placeOrder": _place_order,
+    "getOrdersByCustomer": _get_orders_by_customer,
+    "getOrdersWithItemsByCustomer": _get_orders_page,
+    "removeFromCart": _remove_from_cart,
+    "deleteProduct": _delete_product,
+    "deleteCustomer": _delete_customer,
+}
+
+
+def run_operation(w: Workload, counter: StatementCounter, name: str, ops: int, threads: int) -> Dict[str, Any]:
+    fn = OPERATIONS[name]
+    errors = 0
+    lock = threading.Lock()
+
+    def one(_) -> float:
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            fn(w)
+        except Exception:
+            with lock:
+                errors += 1
+        return (time.perf_counter() - started) * 1000.0
+
+    counter.reset()
+    started = time.perf_counter()
+    if threads == 1:
+        latencies = [one(i) for i in range(ops)]
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            latencies = list(executor.map(one, range(ops)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "operation": name,
+        "threads": threads,
+        "ops": ops,
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "ops_per_sec": round(ops / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        "statements_per_op": round(counter.statements / ops, 2) if ops else 0.0,
+        "commits_per_op": round(counter.commits / ops, 2) if ops else 0.0,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], max_regression: float) -> List[str]:
+    """
+    Regressions of `current` against `baseline`, one message per offending
+    (operation, threads) pair present in both runs.
+    """
+    before = {(r["operation"], r["threads"]): r for r in baseline.get("results", [])}
+    problems = []
+    for r in current["results"]:
+        b = before.get((r["operation"], r["threads"]))
+        if b is None:
+            continue
+        key = f"{r['operation']} x{r['threads']}"
+        if b["ops_per_sec"] and r["ops_per_sec"] < b["ops_per_sec"] * (1 - max_regression):
+            problems.append(f"{key}: {b['ops_per_sec']:.0f} -> {r['ops_per_sec']:.0f} ops/s")
+        if b["p95_ms"] and r["p95_ms"] > b["p95_ms"] * (1 + max_regression):
+            problems.append(f"{key}: p95 {b['p95_ms']:.2f} -> {r['p95_ms']:.2f} ms")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--props", default="config/db-sqlite.properties")
+    parser.add_argument("--db", help="database file for SQLite runs (default: a temp file)")
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--customers", type=int, default=500)
+    parser.add_argument("--cart-lines", type=int, default=5, help="seeded cart lines per customer")
+    parser.add_argument("--ops", type=int, default=1000, help="calls per operation and thread count")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--only", nargs="+", choices=list(OPERATIONS), help="run a subset of operations")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="earlier JSON run to check for regressions")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args()
+
+    overrides: Dict[str, str] = {}
+    scratch: Optional[str] = None
+    if args.db:
+        overrides["database"] = args.db
+    elif DBPropertyUtil.get_properties(args.props).get("dialect", "").lower() == "sqlite":
+        fd, scratch = tempfile.mkstemp(prefix="ecom-suite-", suffix=".sqlite3")
+        os.close(fd)
+        os.remove(scratch)          # let the dialect create and seed it
+        overrides["database"] = scratch
+
+    counter = StatementCounter()
+    pool = build_pool(args.props, counter, overrides)
+    repo = OrderProcessorRepositoryImpl(pool=pool)
+    names = args.only or list(OPERATIONS)
+    try:
+        workload = Workload(repo, args.seed)
+        started = time.perf_counter()
+        deletable = args.ops * len(args.threads)
+        workload.seed(args.products, args.customers, args.cart_lines, deletable)
+        seed_s = time.perf_counter() - started
+        print(f"seeded {args.products} products, {args.customers} customers "
+              f"({args.cart_lines} cart lines each) in {seed_s:.2f}s on {pool.dialect.name}")
+
+        results = []
+        print(f"{'operation':<30} {'thr':>4} {'ops/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'stmts/op':>9} {'errors':>7}")
+        for threads in args.threads:
+            for name in names:
+                r = run_operation(workload, counter, name, args.ops, threads)
+                results.append(r)
+                print(f"{name:<30} {threads:>4} {r['ops_per_sec']:>9.0f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+                      f"{r['p99_ms']:>8.2f} {r['statements_per_op']:>9.2f} {r['errors']:>7}")
+    finally:
+        pool.close()
+        if scratch:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(scratch + suffix):
+                    os.remove(scratch + suffix)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "dialect": pool.dialect.name,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "products": args.products,
+            "customers": args.customers,
+            "cart_lines": args.cart_lines,
+            "ops": args.ops,
+            "seed": args.seed,
+            "seed_seconds": round(seed_s, 3),
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            problems = compare(json.load(f), report, args.max_regression)
+        if problems:
+            print("regressions against", args.compare)
+            for p in problems:
+                print("  " + p)
+            return 1
+        print(f"no regressions beyond {args.max_regression:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
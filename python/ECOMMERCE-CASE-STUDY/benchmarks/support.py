@@ -0,0 +1,122 @@
+# benchmarks/support.py
+import threading
+from typing import Any, Dict, List, Optional
+
+from dao.dialect import get_dialect
+from util.property_util import DBPropertyUtil
+from util.connection_pool import ConnectionPool
+from util.instrumentation import Instrumentation
+from util.statement_cache import CachingConnection
+
+
+class StatementCounter:
+    """
+    Thread-safe count of statements sent to the database (round trips).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.statements = 0
+        self.commits = 0
+
+    def add_statement(self) -> None:
+        with self._lock:
+            self.statements += 1
+
+    def add_commit(self) -> None:
+        with self._lock:
+            self.commits += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.statements = 0
+            self.commits = 0
+
+    @property
+    def round_trips(self) -> int:
+        return self.statements + self.commits
+
+
+class CountingCursor:
+    """
+    Cursor proxy that counts execute/executemany calls.
+    """
+
+    def __init__(self, cur: Any, counter: StatementCounter):
+        self._cur = cur
+        self._counter = counter
+
+    def execute(self, *args):
+        self._counter.add_statement()
+        self._cur.execute(*args)
+        return self
+
+    def executemany(self, *args):
+        self._counter.add_statement()
+        self._cur.executemany(*args)
+        return self
+
+    def __getattr__(self, name: str):
+        return getattr(self._cur, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cur.close()
+        return False
+
+
+class CountingConnection:
+    """
+    Connection proxy whose cursors count statements and which counts commits.
+    """
+
+    def __init__(self, conn: Any, counter: StatementCounter):
+        self._conn = conn
+        self._counter = counter
+
+    def cursor(self) -> CountingCursor:
+        return CountingCursor(self._conn.cursor(), self._counter)
+
+    def commit(self) -> None:
+        self._counter.add_commit()
+        self._conn.commit()
+
+    def __getattr__(self, name: str):
+        return getattr(self._conn, name)
+
+
+def build_pool(prop_file: str, counter: Optional[StatementCounter] = None,
+               overrides: Optional[Dict[str, str]] = None,
+               instrumentation: Optional[Instrumentation] = None) -> ConnectionPool:
+    """
+    Pool for the configured database (any dialect); with a counter every
+    connection is wrapped in CountingConnection. Borrow-time health checks are
+    disabled so they do not show up in the counts. `overrides` replaces
+    individual properties (e.g. a scratch `database` file); an
+    `instrumentation` wraps every connection in its hooks.
+    """
+    props = DBPropertyUtil.get_properties(prop_file)
+    props.update(overrides or {})
+    dialect = get_dialect(props)
+
+    def connect():
+        conn = dialect.connect(props)
+        return CountingConnection(conn, counter) if counter is not None else conn
+
+    if instrumentation is not None:
+        connect = instrumentation.wrap_connect(connect)
+    connect = CachingConnection.wrap_connect(
+        connect, int(props.get("statement_cache_size") or dialect.statement_cache_size))
+    pool = ConnectionPool.from_properties(props, connect, dialect=dialect, instrumentation=instrumentation)
+    pool.health_check_query = None
+    return pool
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
@@ -1,5 +1,22 @@
 # dao/__init__.py
-from .order_processor_repository import OrderProcessorRepository
-from .order_processor_repository_impl import OrderProcessorRepositoryImpl
+# Exports load on first access (PEP 562): `from dao.order_queue import ...`
+# or `import dao` does not import the repository and everything behind it.
+from importlib import import_module
 
-__all__ = ["OrderProcessorRepository", "OrderProcessorRepositoryImpl"]
+_EXPORTS = {
+    "OrderProcessorRepository": ".order_processor_repository",
+    "OrderProcessorRepositoryImpl": ".order_processor_repository_impl",
+    "AsyncOrderProcessorRepository": ".async_order_processor_repository",
+}
+
+__all__ = ["OrderProcessorRepository", "OrderProcessorRepositoryImpl", "AsyncOrderProcessorRepository"]
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = getattr(import_module(module, __name__), name)
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
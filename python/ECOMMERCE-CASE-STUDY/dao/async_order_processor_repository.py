@@ -0,0 +1,101 @@
+# dao/async_order_processor_repository.py
+from typing import List, Tuple, Optional, Dict, Any
+
+from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+from entity.product import Product
+from entity.customer import Customer
+from entity.order import Order
+from util.async_connection_pool import AsyncConnectionPool
+
+
+class AsyncOrderProcessorRepository:
+    """
+    Coroutine version of every OrderProcessorRepository operation.
+
+    Each call is one unit of work executed by the sync implementation on an
+    AsyncConnectionPool worker thread, so SQL, caching, stock reservation and
+    error mapping are shared with OrderProcessorRepositoryImpl. pyodbc has no
+    native async API (aioodbc itself wraps it in a thread executor), so this
+    offloads directly and keeps thread/connection affinity per transaction.
+
+    It exists so event-loop code can call the repository without blocking
+    the loop, not for speed: every call adds a thread hand-off, so plain
+    threads on the sync repository serve more requests
+    (benchmarks/load_async_vs_sync.py).
+
+    Usage:
+        repo = AsyncOrderProcessorRepository("config/db.properties")
+        items = await repo.getAllFromCart(customer)
+    """
+
+    def __init__(self,
+                 prop_file: str = "config/db.properties",
+                 repository: Optional[OrderProcessorRepositoryImpl] = None,
+                 pool: Optional[AsyncConnectionPool] = None):
+        self.repository = repository if repository is not None else OrderProcessorRepositoryImpl(prop_file)
+        self.pool = pool if pool is not None else AsyncConnectionPool(self.repository.pool)
+
+    async def createProduct(self, product: Product) -> bool:
+        return await self.pool.run(self.repository.createProduct, product)
+
+    async def createCustomer(self, customer: Customer) -> bool:
+        return await self.pool.run(self.repository.createCustomer, customer)
+
+    async def deleteProduct(self, productId: int) -> bool:
+        return await self.pool.run(self.repository.deleteProduct, productId)
+
+    async def deleteCustomer(self, customerId: int) -> bool:
+        return await self.pool.run(self.repository.deleteCustomer, customerId)
+
+    async def addToCart(self, customer: Customer, product: Product, quantity: int) -> bool:
+        return await self.pool.run(self.repository.addToCart, customer, product, quantity)
+
+    async def addManyToCart(self, customer: Customer, items: List[Tuple[Product, int]]) -> bool:
+        return await self.pool.run(self.repository.addManyToCart, customer, items)
+
+    async def removeFromCart(self, customer: Customer, product: Product) -> bool:
+        return await self.pool.run(self.repository.removeFromCart, customer, product)
+
+    async def getAllFromCart(self, customer: Customer) -> List[Tuple[Product, int]]:
+        return await self.pool.run(self.repository.getAllFromCart, customer)
+
+    async def placeOrder(
+        self,
+        customer: Customer,
+        items: Optional[List[Tuple[Product, int]]],
+        shippingAddress: str,
+        idempotencyKey: Optional[str] = None,
+    ) -> bool:
+        return await self.pool.run(self.repository.placeOrder, customer, items, shippingAddress, idempotencyKey)
+
+    async def placeOrderIdempotent(
+        self,
+        customer: Customer,
+        items: Optional[List[Tuple[Product, int]]],
+        shippingAddress: str,
+        idempotencyKey: str,
+    ) -> int:
+        return await self.pool.run(self.repository.placeOrderIdempotent, customer, items, shippingAddress,
+                                   idempotencyKey)
+
+    async def getOrdersByCustomer(self, customerId: int) -> List[Dict[str, Any]]:
+        return await self.pool.run(self.repository.getOrdersByCustomer, customerId)
+
+    async def getOrdersByCustomerPage(
+        self,
+        customerId: int,
+        pageSize: int = 20,
+        after: Optional[Tuple[Any, int]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[Any, int]]]:
+        return await self.pool.run(self.repository.getOrdersByCustomerPage, customerId, pageSize, after)
+
+    async def getOrdersWithItemsByCustomer(
+        self,
+        customerId: int,
+        pageSize: int = 20,
+        after: Optional[Tuple[Any, int]] = None,
+    ) -> Tuple[List[Order], Optional[Tuple[Any, int]]]:
+        return await self.pool.run(self.repository.getOrdersWithItemsByCustomer, customerId, pageSize, after)
+
+    def close(self) -> None:
+        self.pool.close()
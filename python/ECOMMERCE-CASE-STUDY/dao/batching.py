@@ -0,0 +1,22 @@
+# dao/batching.py
+from typing import Any, List, Sequence
+
+# Keeps batched statements under SQL Server's 2100-parameter and 1000-row VALUES limits
+MAX_PARAMS = 1000
+
+
+def chunks(seq: Sequence[Any], size: int) -> List[Sequence[Any]]:
+    """
+    Splits seq into consecutive slices of at most `size` items.
+    """
+    return [seq[i:i + size] for i in range(0, len(seq), size)]
+
+
+def placeholders(count: int, width: int = 1) -> str:
+    """
+    "?, ?, ?" for width 1, "(?, ?), (?, ?)" for width 2 and so on.
+    """
+    if width == 1:
+        return ", ".join("?" * count)
+    row = "(" + ", ".join("?" * width) + ")"
+    return ", ".join([row] * count)
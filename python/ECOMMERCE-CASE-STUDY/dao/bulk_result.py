@@ -0,0 +1,34 @@
+# dao/bulk_result.py
+from typing import Any, List
+
+
+class RowFailure:
+    """
+    One input row rejected by a bulk operation.
+    index is the row's 0-based position in the input.
+    """
+
+    def __init__(self, index: int, item: Any, reason: str):
+        self.index = index
+        self.item = item
+        self.reason = reason
+
+    def __repr__(self) -> str:
+        return f"RowFailure(index={self.index}, reason={self.reason!r})"
+
+
+class BulkResult:
+    """
+    Outcome of a bulk call that reports per-row failures instead of aborting.
+    """
+
+    def __init__(self):
+        self.succeeded: List[Any] = []
+        self.failures: List[RowFailure] = []
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    def __repr__(self) -> str:
+        return f"BulkResult(succeeded={len(self.succeeded)}, failures={len(self.failures)})"
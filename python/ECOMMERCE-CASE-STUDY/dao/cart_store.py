@@ -0,0 +1,414 @@
+# dao/cart_store.py
+"""
+In-memory cart store with write-behind persistence to dbo.cart.
+
+With `cart_store=memory`, addToCart / addManyToCart / removeFromCart and
+getAllFromCart work on a process-local map of customer -> {product_id:
+quantity}, which is the authoritative cart (placeOrder reads it too).
+Changes reach dbo.cart asynchronously: a flusher thread writes the
+changed lines in one transaction at most `cart_flush_ms` after they were
+made (sooner once `cart_flush_batch` lines are pending).
+
+Crash safety: every change is appended to a local log (`cart_log`) before
+it is applied. Entries hold absolute quantities, so replaying them is
+idempotent; on startup any log left behind is replayed into dbo.cart.
+Each flush rotates the log and deletes the rotated segment once the
+batch is committed.
+
+Memory is bounded: after a flush, the least recently used clean carts
+beyond `cart_max_carts`, and clean carts idle for `cart_idle_seconds`,
+are dropped from memory (their rows are already in dbo.cart) and reloaded
+on next use.
+
+Only one process may own carts in this mode (the store does not see
+writes other processes make to dbo.cart). With a log, the store holds an
+exclusive lock on `<cart_log>.lock` while it is open and refuses to start
+if another process holds it; the OS drops the lock if the owner dies, so
+the next owner still recovers a crashed run's log. Processes that share
+the properties but do not serve carts (checkout workers, main.batch,
+main.import_catalog, main.sales_backfill) build their repository with
+own_carts=False and use dbo.cart directly.
+"""
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from dao.batching import MAX_PARAMS, chunks, placeholders
+from entity.product import Product
+from entity.row_mapper import product_from_row
+
+_log = logging.getLogger(__name__)
+
+_CART_ROWS_SQL = """
+    SELECT p.product_id, p.name, p.price, p.[description], p.stockQuantity, c.quantity
+    FROM dbo.cart c
+    JOIN dbo.products p ON p.product_id = c.product_id
+    WHERE c.customer_id = ?
+    """
+
+
+class _Cart:
+    __slots__ = ("lines", "touched")
+
+    def __init__(self, lines: Dict[int, int]):
+        self.lines = lines              # product_id -> quantity (insertion order = add order)
+        self.touched = time.monotonic()
+
+
+class CartStore:
+    """
+    Thread-safe; one instance per repository.
+    """
+
+    def __init__(self, repo, log_path: Optional[str] = None, flush_ms: float = 500.0,
+                 flush_batch: int = 500, max_carts: int = 10000, idle_seconds: float = 300.0,
+                 fsync: bool = False):
+        self.repo = repo
+        self.flush_delay = flush_ms / 1000.0
+        self.flush_batch = flush_batch
+        self.max_carts = max_carts
+        self.idle_seconds = idle_seconds
+        self.fsync = fsync
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._carts: "OrderedDict[int, _Cart]" = OrderedDict()
+        self._dirty: Dict[Tuple[int, int], int] = {}       # (customer_id, product_id) -> quantity, 0 = delete
+        self._segments: List[str] = []                      # rotated log files awaiting a commit
+        self._closed = False
+        self.flushes = 0
+        self.lines_flushed = 0
+        self.loads = 0
+        self.spills = 0
+        self._log_file = None
+        self._owner_lock = None
+        if log_path:
+            self._lock_log()
+            try:
+                self._recover()
+            except Exception:
+                self._owner_lock.close()
+                raise
+            self._log_file = open(log_path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="cart-flusher", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_properties(cls, repo, props: Dict[str, str]) -> Optional["CartStore"]:
+        """
+        A store if `cart_store=memory`, else None (carts live in dbo.cart).
+        """
+        if props.get("cart_store", "db").lower() != "memory":
+            return None
+        return cls(
+            repo,
+            log_path=props.get("cart_log") or None,
+            flush_ms=float(props.get("cart_flush_ms") or 500),
+            flush_batch=int(props.get("cart_flush_batch") or 500),
+            max_carts=int(props.get("cart_max_carts") or 10000),
+            idle_seconds=float(props.get("cart_idle_seconds") or 300),
+            fsync=props.get("cart_log_fsync", "no").lower() in ("yes", "true", "1"),
+        )
+
+    # ---------- cart operations ----------
+
+    def add(self, customer_id: int, quantities: Dict[int, int]) -> None:
+        """
+        Adds quantities to the customer's cart. Raises Customer/Product
+        NotFoundException like the database-backed path.
+        """
+        with self.repo.pool.connection() as conn:
+            self.repo._load_products(conn, list(quantities))          # raises for an unknown product
+        with self._cart(customer_id) as cart:
+            changes = []
+            for pid, qty in quantities.items():
+                new_qty = cart.lines.get(pid, 0) + qty
+                cart.lines[pid] = new_qty
+                changes.append((customer_id, pid, new_qty))
+            self._record(changes)
+
+    def remove(self, customer_id: int, product_id: int) -> bool:
+        """
+        Removes the product from the cart; False when it was not there.
+        """
+        with self._cart(customer_id) as cart:
+            removed = cart.lines.pop(product_id, None) is not None
+            if removed:
+                self._record([(customer_id, product_id, 0)])
+        if not removed:
+            with self.repo.pool.connection() as conn:
+                self.repo._load_products(conn, [product_id])        # tell a missing product from a missing line
+        return removed
+
+    def items(self, customer_id: int) -> List[Tuple[Product, int]]:
+        """
+        The cart as (Product, quantity), ordered by product name; products
+        come from the product cache where possible.
+        """
+        with self._cart(customer_id) as cart:
+            lines = dict(cart.lines)
+        if not lines:
+            return []
+        with self.repo.pool.connection() as conn:
+            products = self.repo._load_products(conn, list(lines), missing_ok=True)
+        items = [(products[pid], qty) for pid, qty in lines.items() if pid in products]
+        items.sort(key=lambda item: item[0].get_name() or "")
+        return items
+
+    def discard_lines(self, customer_id: int, product_ids: Iterable[int]) -> None:
+        """
+        Drops purchased lines (the order transaction already deleted them
+        from dbo.cart; recording the delete keeps a pending write from
+        bringing them back).
+        """
+        with self._lock:
+            cart = self._carts.get(customer_id)
+            if cart is None:
+                return
+            changes = [(customer_id, pid, 0) for pid in product_ids if cart.lines.pop(pid, None) is not None]
+            self._record(changes)
+
+    def drop_customer(self, customer_id: int) -> None:
+        with self._lock:
+            self._carts.pop(customer_id, None)
+            for key in [k for k in self._dirty if k[0] == customer_id]:
+                del self._dirty[key]
+
+    def drop_product(self, product_id: int) -> None:
+        with self._lock:
+            for cart in self._carts.values():
+                cart.lines.pop(product_id, None)
+            for key in [k for k in self._dirty if k[1] == product_id]:
+                del self._dirty[key]
+
+    # ---------- persistence ----------
+
+    def flush(self) -> int:
+        """
+        Writes all pending changes now; returns the number of lines written.
+        Called by the flusher thread and usable directly (tests, shutdown).
+        """
+        with self._lock:
+            if not self._dirty:
+                return 0
+            batch, self._dirty = self._dirty, {}
+            self._rotate_log()
+        try:
+            self._write(batch)
+        except Exception as e:
+            _log.warning("cart flush of %d lines failed, will retry: %s", len(batch), e)
+            with self._lock:
+                for key, qty in batch.items():
+                    self._dirty.setdefault(key, qty)    # keep newer changes made meanwhile
+            raise
+        with self._lock:
+            segments, self._segments = self._segments, []
+        for path in segments:
+            os.remove(path)
+        self.flushes += 1
+        self.lines_flushed += len(batch)
+        return len(batch)
+
+    def close(self) -> None:
+        """
+        Flushes what is pending and stops the flusher thread.
+        """
+        with self._lock:
+            self._closed = True
+            self._wake.notify()
+        self._thread.join()
+        self.flush()
+        if self._log_file is not None:
+            self._log_file.close()
+            if os.path.exists(self.log_path) and os.path.getsize(self.log_path) == 0:
+                os.remove(self.log_path)
+        if self._owner_lock is not None:
+            self._owner_lock.close()        # releases the lock
+            self._owner_lock = None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"carts": len(self._carts), "pending_lines": len(self._dirty), "loads": self.loads,
+                    "flushes": self.flushes, "lines_flushed": self.lines_flushed, "spills": self.spills}
+
+    # ---------- internals ----------
+
+    def _ensure_loaded(self, customer_id: int) -> None:
+        with self._lock:
+            if customer_id in self._carts:
+                return
+        with self.repo.pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(_CART_ROWS_SQL, customer_id)
+                rows = cur.fetchall()
+            if not rows:
+                self.repo._ensure_customer_exists(conn, customer_id)
+            conn.rollback()     # read-only
+        for row in rows:
+            self.repo.product_cache.put(product_from_row(row))
+        with self._lock:
+            if customer_id not in self._carts:      # another thread may have loaded it meanwhile
+                lines = {int(row[0]): int(row[5]) for row in rows}
+                # changes still waiting for the flusher win over what the table says
+                for (cid, pid), qty in self._dirty.items():
+                    if cid == customer_id:
+                        if qty:
+                            lines[pid] = qty
+                        else:
+                            lines.pop(pid, None)
+                self._carts[customer_id] = _Cart(lines)
+                self.loads += 1
+
+    @contextmanager
+    def _cart(self, customer_id: int) -> Iterator[_Cart]:
+        """
+        The customer's cart, loaded if needed, with the store lock held.
+        """
+        while True:
+            self._ensure_loaded(customer_id)
+            with self._lock:
+                cart = self._carts.get(customer_id)
+                if cart is None:
+                    continue        # spilled between load and lock; load again
+                cart.touched = time.monotonic()
+                self._carts.move_to_end(customer_id)
+                yield cart
+                return
+
+    def _record(self, changes: List[Tuple[int, int, int]]) -> None:
+        # caller holds the lock, so log order matches memory order
+        if not changes:
+            return
+        if self._log_file is not None:
+            self._log_file.write("".join(json.dumps(change) + "\n" for change in changes))
+            self._log_file.flush()
+            if self.fsync:
+                os.fsync(self._log_file.fileno())
+        for cid, pid, qty in changes:
+            self._dirty[(cid, pid)] = qty
+        if len(self._dirty) >= self.flush_batch or len(self._carts) > self.max_carts:
+            self._wake.notify()
+
+    def _rotate_log(self) -> None:
+        if self._log_file is None:
+            return
+        self._log_file.close()
+        segment = f"{self.log_path}.{time.time_ns()}"
+        os.replace(self.log_path, segment)
+        self._segments.append(segment)
+        self._log_file = open(self.log_path, "a", encoding="utf-8")
+
+    def _write(self, batch: Dict[Tuple[int, int], int]) -> None:
+        """
+        One transaction: delete the touched rows, re-insert those with a
+        quantity. Lines whose customer or product has been deleted are dropped.
+        """
+        repo = self.repo
+        keys = list(batch)
+        rows = [(cid, pid, qty) for (cid, pid), qty in batch.items() if qty > 0]
+        with repo.pool.connection() as conn:
+            for attempt in (1, 2):
+                try:
+                    with conn.cursor() as cur:
+                        for chunk in chunks(keys, MAX_PARAMS // 2):
+                            cur.execute(
+                                "DELETE FROM dbo.cart WHERE EXISTS (SELECT 1 FROM "
+                                + repo.dialect.values_table(len(chunk), ("customer_id", "product_id"), "v")
+                                + " WHERE v.customer_id = dbo.cart.customer_id AND v.product_id = dbo.cart.product_id)",
+                                *[v for key in chunk for v in key],
+                            )
+                        for chunk in chunks(rows, MAX_PARAMS // 3):
+                            cur.execute(
+                                "INSERT INTO dbo.cart (customer_id, product_id, quantity) VALUES "
+                                + placeholders(len(chunk), 3),
+                                *[v for row in chunk for v in row],
+                            )
+                    conn.commit()
+                    return
+                except repo.dialect.IntegrityError:
+                    conn.rollback()
+                    if attempt == 2:
+                        raise
+                    # a customer or product was deleted after its line was added
+                    customers = repo._existing_customers(conn, {r[0] for r in rows})
+                    products = repo._load_products(conn, list({r[1] for r in rows}), missing_ok=True)
+                    dropped = [r for r in rows if r[0] not in customers or r[1] not in products]
+                    _log.warning("dropping %d cart lines of deleted customers/products", len(dropped))
+                    rows = [r for r in rows if r[0] in customers and r[1] in products]
+                except Exception:
+                    conn.rollback()
+                    raise
+
+    def _lock_log(self) -> None:
+        """
+        Takes the exclusive lock on `<cart_log>.lock` for the life of the
+        store; raises RuntimeError if another process owns the log.
+        """
+        lock = open(self.log_path + ".lock", "a+", encoding="utf-8")
+        try:
+            if os.name == "nt":
+                import msvcrt
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            raise RuntimeError(
+                f"Cart log {self.log_path!r} is owned by another process; only one process may run "
+                f"with cart_store=memory on a log (use cart_store=db or own_carts=False elsewhere).") from None
+        self._owner_lock = lock
+
+    def _recover(self) -> None:
+        """
+        Replays log segments left by a previous run into dbo.cart.
+        """
+        segments = [p for p in glob.glob(glob.escape(self.log_path) + ".*") if p.rsplit(".", 1)[1].isdigit()]
+        paths = sorted(segments, key=lambda p: int(p.rsplit(".", 1)[1]))
+        if os.path.exists(self.log_path):
+            paths.append(self.log_path)
+        batch: Dict[Tuple[int, int], int] = {}
+        for path in paths:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        cid, pid, qty = json.loads(line)
+                    except ValueError:
+                        break       # torn last write of a crashed process
+                    batch[(cid, pid)] = qty
+        if batch:
+            self._write(batch)
+            _log.info("replayed %d cart lines from %s", len(batch), self.log_path)
+        for path in paths:
+            os.remove(path)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._closed:
+                    self._wake.wait(self.flush_delay)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except Exception:
+                continue        # logged in flush(); retried next round
+            self._spill()
+
+    def _spill(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            pending = {cid for cid, _ in self._dirty}
+            for cid in list(self._carts):       # least recently used first
+                if len(self._carts) <= self.max_carts and now - self._carts[cid].touched < self.idle_seconds:
+                    break
+                if cid not in pending:
+                    del self._carts[cid]
+                    self.spills += 1
@@ -0,0 +1,83 @@
+# dao/catalog_importer.py
+import csv
+import json
+import os
+from typing import Iterable, Iterator, List, Optional
+
+from entity.product import Product
+
+# Columns expected in CSV headers / JSONL keys
+PRODUCT_FIELDS = ("name", "price", "description", "stockQuantity")
+
+
+def read_products(path: str, fmt: Optional[str] = None) -> Iterator[Product]:
+    """
+    Streams Products from a CSV (with a header row) or JSONL supplier feed.
+    `fmt` is "csv" or "jsonl"; by default it is taken from the file extension.
+    Only one row is held in memory at a time.
+    """
+    fmt = (fmt or os.path.splitext(path)[1].lstrip(".")).lower()
+    if fmt == "csv":
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for line_no, rec in enumerate(csv.DictReader(f), start=2):
+                yield _to_product(rec, line_no)
+    elif fmt in ("jsonl", "ndjson", "json"):
+        with open(path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, start=1):
+                if line.strip():
+                    yield _to_product(json.loads(line), line_no)
+    else:
+        raise ValueError(f"Unsupported feed format: {fmt!r} (expected csv or jsonl)")
+
+
+def _to_product(rec: dict, line_no: int) -> Product:
+    try:
+        name = (rec.get("name") or "").strip()
+        if not name:
+            raise ValueError("name is required")
+        price = float(rec["price"])
+        stock = int(rec.get("stockQuantity") or 0)
+        if price < 0 or stock < 0:
+            raise ValueError("price and stockQuantity must be >= 0")
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid product on line {line_no}: {e}") from e
+    return Product(None, name, price, rec.get("description") or None, stock)
+
+
+class CatalogImporter:
+    """
+    Bulk catalog import through OrderProcessorRepositoryImpl.createProducts.
+
+    Products are consumed lazily and inserted `batch_size` at a time, one
+    transaction per batch, so memory use depends on the batch size and not
+    on the size of the feed. Generated ids are yielded in input order.
+    A failing batch is rolled back and the error propagates; earlier
+    batches stay committed (rows_imported tells how far it got).
+    """
+
+    def __init__(self, repository, batch_size: int = 5000):
+        if batch_size <= 0:
+            raise ValueError("batch_size must be > 0")
+        self.repository = repository
+        self.batch_size = batch_size
+        self.rows_imported = 0
+        self.batches_committed = 0
+
+    def import_products(self, products: Iterable[Product]) -> Iterator[int]:
+        batch: List[Product] = []
+        for product in products:
+            batch.append(product)
+            if len(batch) >= self.batch_size:
+                yield from self._flush(batch)
+                batch = []
+        if batch:
+            yield from self._flush(batch)
+
+    def import_file(self, path: str, fmt: Optional[str] = None) -> Iterator[int]:
+        return self.import_products(read_products(path, fmt))
+
+    def _flush(self, batch: List[Product]) -> List[int]:
+        ids = self.repository.createProducts(batch)
+        self.rows_imported += len(ids)
+        self.batches_committed += 1
+        return ids
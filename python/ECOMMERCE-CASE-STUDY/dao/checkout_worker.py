@@ -0,0 +1,120 @@
+# dao/checkout_worker.py
+"""
+Worker loop draining the checkout queue (dao.order_queue).
+
+Each round claims up to `claim_size` orders, groups the ones that share
+products, and places every group with one placeOrders() call: one combined
+stock decrement per hot product and one commit per group. Outcomes go back
+to the queue per ticket; transient database errors hand the orders back
+for another attempt.
+"""
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+from dao.order_queue import OrderQueue, QueuedOrder
+
+_log = logging.getLogger(__name__)
+
+
+def group_by_sku(orders: Sequence[QueuedOrder], batch_size: int) -> List[List[QueuedOrder]]:
+    """
+    Splits orders into batches of at most batch_size so that orders sharing
+    a product land in the same batch where possible (connected components
+    over product ids, packed first-fit in FIFO order). A component larger
+    than batch_size is split in FIFO order.
+    """
+    parent: Dict[int, int] = {}
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    owner: Dict[int, int] = {}          # product_id -> first order index using it
+    for i, order in enumerate(orders):
+        parent[i] = i
+        for pid, _ in order.lines:
+            j = owner.setdefault(pid, i)
+            if j != i:
+                parent[find(i)] = find(j)
+
+    components: Dict[int, List[QueuedOrder]] = {}
+    for i, order in enumerate(orders):
+        components.setdefault(find(i), []).append(order)
+
+    batches: List[List[QueuedOrder]] = []
+    for component in components.values():       # dicts keep first-seen (FIFO) order
+        for start in range(0, len(component), batch_size):
+            part = component[start:start + batch_size]
+            target = next((b for b in batches if len(b) + len(part) <= batch_size), None)
+            if target is None:
+                batches.append(part)
+            else:
+                target.extend(part)
+    return batches
+
+
+def drain_once(repo, queue: OrderQueue, worker: str, claim_size: int = 64,
+               batch_size: int = 32, lease_seconds: float = 60.0) -> int:
+    """
+    One claim/place/report round; returns the number of orders claimed.
+    """
+    claimed = queue.claim(worker, claim_size, lease_seconds)
+    for batch in group_by_sku(claimed, batch_size):
+        try:
+            results = repo.placeOrders([order.to_request() for order in batch])
+        except Exception as e:
+            _log.warning("%s: batch of %d orders failed: %s", worker, len(batch), e)
+            queue.release(worker, [order.ticket for order in batch], str(e))
+            continue
+        placed, failed, retry = [], [], []
+        for result in results:
+            ticket = result.request.request_key
+            if result.ok:
+                placed.append((ticket, result.order_id))
+            elif repo.dialect.is_retryable(result.error):
+                retry.append(ticket)
+            else:
+                failed.append((ticket, str(result.error)))
+        queue.complete(placed)
+        queue.fail(failed)
+        if retry:
+            queue.release(worker, retry, "transient database error")
+    return len(claimed)
+
+
+def run_worker(worker: str, queue_path: str, prop_file: str, claim_size: int = 64,
+               batch_size: int = 32, lease_seconds: float = 60.0, max_attempts: int = 5,
+               poll_interval: float = 0.05, stop: Optional[threading.Event] = None,
+               exit_when_idle: bool = False) -> int:
+    """
+    Process entry point: drains the queue until `stop` is set (or, with
+    exit_when_idle, until a claim comes back empty). Returns the number of
+    orders handled.
+    """
+    # imported here so the queue module stays usable without a database driver
+    from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+
+    repo = OrderProcessorRepositoryImpl(prop_file, own_carts=False)     # carts belong to the app
+    queue = OrderQueue(queue_path, max_attempts=max_attempts)
+    handled = 0
+    try:
+        while stop is None or not stop.is_set():
+            n = drain_once(repo, queue, worker, claim_size, batch_size, lease_seconds)
+            handled += n
+            if n == 0:
+                if exit_when_idle:
+                    break
+                if stop is not None:
+                    stop.wait(poll_interval)
+                else:
+                    time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        pass                # leased orders go back to the queue when the lease expires
+    finally:
+        queue.close()
+        repo.pool.close()
+    return handled
@@ -0,0 +1,472 @@
+# dao/command_batch.py
+"""
+EcomApp without the prompts: a stream of commands (JSONL or CSV) run
+through OrderProcessorRepositoryImpl, many per transaction.
+
+Each command names an `op` (the menu actions) and its fields:
+
+    register_customer   name, email, password
+    create_product      name, price, description, stockQuantity
+    delete_product      product_id
+    add_to_cart         customer_id, product_id, quantity
+    remove_from_cart    customer_id, product_id
+    view_cart           customer_id
+    place_order         customer_id, shipping_address, lines, request_key
+    view_orders         customer_id
+
+description, lines and request_key are optional; place_order without
+lines orders the customer's cart (read when its chunk runs, then placed
+like an order with lines). In JSONL `lines` is a list of
+[product_id, quantity]; a CSV feed has a header row naming the fields it
+uses (op first) and spells lines as "product_id:quantity;...". An
+optional `ref` is copied to the command's result.
+
+Commands are taken `chunk_size` at a time. Consecutive commands of one
+kind share a bulk call, one transaction per chunk: createCustomers,
+createProducts, addToCarts and placeOrders; the rest run one by one.
+With `workers` > 1 a window of chunk_size x workers commands is split by
+customer_id (commands without one round-robin) and the parts run
+concurrently on the repository's pool (pool_max_size should be >=
+workers): commands for one customer keep their input order, and windows
+run one after another. Orders are placed directly, even when a
+checkout_queue is configured.
+
+Every command gets one CommandResult, in input order. A command that
+fails (bad input, unknown customer, insufficient stock, ...) reports the
+error and the run goes on.
+"""
+import csv
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from dao.order_request import OrderRequest
+from entity.customer import Customer
+from entity.product import Product
+
+
+def _lines(value: Any) -> List[Tuple[int, int]]:
+    if isinstance(value, str):
+        value = [part.split(":") for part in value.split(";") if part.strip()]
+    return [(int(pid), int(qty)) for pid, qty in value]
+
+
+def _text(value: Any) -> str:
+    return str(value).strip()
+
+
+# op -> fields: (name, converter, required)
+OPS: Dict[str, Tuple[Tuple[str, Callable[[Any], Any], bool], ...]] = {
+    "register_customer": (("name", _text, True), ("email", _text, True), ("password", str, True)),
+    "create_product": (("name", _text, True), ("price", float, True), ("description", str, False),
+                       ("stockQuantity", int, True)),
+    "delete_product": (("product_id", int, True),),
+    "add_to_cart": (("customer_id", int, True), ("product_id", int, True), ("quantity", int, True)),
+    "remove_from_cart": (("customer_id", int, True), ("product_id", int, True)),
+    "view_cart": (("customer_id", int, True),),
+    "place_order": (("customer_id", int, True), ("shipping_address", _text, True), ("lines", _lines, False),
+                    ("request_key", _text, False)),
+    "view_orders": (("customer_id", int, True),),
+}
+
+
+class Command:
+    """
+    One parsed command. line is its line in the feed; error is set (and
+    op may be None) when the line could not be parsed.
+    """
+
+    __slots__ = ("line", "op", "fields", "ref", "error")
+
+    def __init__(self, line: int, op: Optional[str], fields: Dict[str, Any],
+                 ref: Any = None, error: Optional[str] = None):
+        self.line = line
+        self.op = op
+        self.fields = fields
+        self.ref = ref
+        self.error = error
+
+    @property
+    def customer_id(self) -> Optional[int]:
+        return self.fields.get("customer_id")
+
+    def __repr__(self) -> str:
+        return f"Command(line={self.line}, op={self.op}, error={self.error!r})"
+
+
+class CommandResult:
+    """
+    Outcome of one Command: ok with the op's result fields, or the error.
+    """
+
+    __slots__ = ("line", "op", "ref", "ok", "result", "error", "error_type")
+
+    def __init__(self, command: Command):
+        self.line = command.line
+        self.op = command.op
+        self.ref = command.ref
+        self.ok = False
+        self.result: Dict[str, Any] = {}
+        self.error: Optional[str] = command.error
+        self.error_type: Optional[str] = "InvalidCommand" if command.error else None
+
+    def succeed(self, **result: Any) -> None:
+        self.ok = True
+        self.result = result
+
+    def fail(self, error: Any) -> None:
+        self.ok = False
+        self.error = str(error)
+        self.error_type = type(error).__name__ if isinstance(error, Exception) else "Rejected"
+
+    def to_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"line": self.line, "op": self.op, "ok": self.ok}
+        if self.ref is not None:
+            out["ref"] = self.ref
+        if self.ok:
+            out.update(self.result)
+        else:
+            out["error"] = self.error
+            out["error_type"] = self.error_type
+        return out
+
+    def __repr__(self) -> str:
+        return f"CommandResult(line={self.line}, op={self.op}, ok={self.ok})"
+
+
+def parse_command(rec: Dict[str, Any], line_no: int) -> Command:
+    """
+    Command from one JSON object / CSV row; never raises (a bad line
+    becomes a Command carrying its error).
+    """
+    op = _text(rec.get("op") or "").lower()
+    ref = rec.get("ref") if rec.get("ref") != "" else None
+    spec = OPS.get(op)
+    if spec is None:
+        return Command(line_no, op or None, {}, ref, f"unknown op {op!r} (expected one of: {', '.join(OPS)})")
+    fields: Dict[str, Any] = {}
+    for name, convert, required in spec:
+        value = rec.get(name)
+        if value is None or value == "":
+            if required:
+                return Command(line_no, op, {}, ref, f"{name} is required")
+            continue
+        try:
+            fields[name] = convert(value)
+        except (TypeError, ValueError) as e:
+            return Command(line_no, op, {}, ref, f"invalid {name} {value!r}: {e}")
+    return Command(line_no, op, fields, ref)
+
+
+def read_commands(stream: TextIO, fmt: str) -> Iterator[Command]:
+    """
+    Streams Commands from a JSONL or CSV (header row) feed, one line in
+    memory at a time.
+    """
+    if fmt == "csv":
+        for line_no, rec in enumerate(csv.DictReader(stream), start=2):
+            yield parse_command(rec, line_no)
+    elif fmt in ("jsonl", "ndjson", "json"):
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError as e:
+                yield Command(line_no, None, {}, error=f"invalid JSON: {e}")
+                continue
+            if not isinstance(rec, dict):
+                yield Command(line_no, None, {}, error="expected a JSON object")
+                continue
+            yield parse_command(rec, line_no)
+    else:
+        raise ValueError(f"Unsupported command format: {fmt!r} (expected csv or jsonl)")
+
+
+class _OpStats:
+    __slots__ = ("commands", "failed", "calls")
+
+    def __init__(self):
+        self.commands = 0
+        self.failed = 0
+        self.calls = 0
+
+
+class CommandBatch:
+    """
+    Runs Commands through a repository; see the module docstring.
+
+        batch = CommandBatch(repo, chunk_size=500, workers=4)
+        for result in batch.run(read_commands(stream, "jsonl")): ...
+        batch.summary()
+    """
+
+    def __init__(self, repository, chunk_size: int = 500, workers: int = 1):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be > 0")
+        if workers <= 0:
+            raise ValueError("workers must be > 0")
+        self.repo = repository
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._stats: Dict[str, _OpStats] = {}
+        self._elapsed = 0.0
+        self._handlers: Dict[str, Callable[[List[Command], List[CommandResult]], None]] = {
+            "register_customer": self._register_customers,
+            "create_product": self._create_products,
+            "delete_product": self._one_by_one(self._delete_product),
+            "add_to_cart": self._add_to_carts,
+            "remove_from_cart": self._one_by_one(self._remove_from_cart),
+            "view_cart": self._one_by_one(self._view_cart),
+            "place_order": self._place_orders,
+            "view_orders": self._one_by_one(self._view_orders),
+        }
+
+    # ---------- driving ----------
+
+    def run(self, commands: Iterable[Command]) -> Iterator[CommandResult]:
+        """
+        Yields one CommandResult per command, in input order, as each window
+        of chunk_size x workers commands completes.
+        """
+        executor = ThreadPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        window: List[Command] = []
+        before, started = self._elapsed, time.perf_counter()
+        try:
+            for command in commands:
+                window.append(command)
+                if len(window) >= self.chunk_size * self.workers:
+                    results = self._run_window(window, executor)
+                    self._elapsed = before + time.perf_counter() - started
+                    yield from results
+                    window = []
+            if window:
+                results = self._run_window(window, executor)
+                self._elapsed = before + time.perf_counter() - started
+                yield from results
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def _run_window(self, window: List[Command], executor: Optional[ThreadPoolExecutor]) -> List[CommandResult]:
+        results = [CommandResult(command) for command in window]
+        if executor is None:
+            self._run_part(list(zip(window, results)))
+        else:
+            parts: List[List[Tuple[Command, CommandResult]]] = [[] for _ in range(self.workers)]
+            for n, (command, result) in enumerate(zip(window, results)):
+                key = command.customer_id
+                parts[(key if key is not None else n) % self.workers].append((command, result))
+            for future in [executor.submit(self._run_part, part) for part in parts if part]:
+                future.result()
+        return results
+
+    def _run_part(self, part: List[Tuple[Command, CommandResult]]) -> None:
+        # runs of consecutive commands with the same op, at most chunk_size long
+        start = 0
+        while start < len(part):
+            op = part[start][0].op
+            end = start + 1
+            while end < len(part) and end - start < self.chunk_size and part[end][0].op == op:
+                end += 1
+            run = [(c, r) for c, r in part[start:end] if c.error is None]
+            if run:
+                commands, results = [c for c, _ in run], [r for _, r in run]
+                try:
+                    self._handlers[op](commands, results)
+                except Exception as e:      # e.g. the database went away: the whole run fails
+                    for result in results:
+                        result.fail(e)
+            self._count(op, [r for _, r in part[start:end]])
+            start = end
+
+    def _count(self, op: Optional[str], results: List[CommandResult]) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(op if op in OPS else "invalid", _OpStats())
+            stats.commands += len(results)
+            stats.failed += sum(1 for r in results if not r.ok)
+
+    def _calls(self, op: str, calls: int = 1) -> None:
+        with self._lock:
+            self._stats.setdefault(op, _OpStats()).calls += calls
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Totals so far: commands and failures per op and overall, repository
+        calls (each its own transaction), wall time from the first command
+        read to the last result and commands per second.
+        """
+        with self._lock:
+            ops = {op: {"commands": s.commands, "failed": s.failed, "calls": s.calls}
+                   for op, s in sorted(self._stats.items())}
+        commands = sum(s["commands"] for s in ops.values())
+        failed = sum(s["failed"] for s in ops.values())
+        return {
+            "commands": commands,
+            "succeeded": commands - failed,
+            "failed": failed,
+            "calls": sum(s["calls"] for s in ops.values()),
+            "elapsed_s": round(self._elapsed, 3),
+            "commands_per_s": round(commands / self._elapsed, 1) if self._elapsed else 0.0,
+            "workers": self.workers,
+            "chunk_size": self.chunk_size,
+            "ops": ops,
+        }
+
+    # ---------- bulk ops ----------
+
+    def _register_customers(self, commands: List[Command], results: List[CommandResult]) -> None:
+        customers = [Customer(name=c.fields["name"], email=c.fields["email"], password=c.fields["password"])
+                     for c in commands]
+        bulk = self.repo.createCustomers(customers, chunkSize=self.chunk_size)
+        self._calls("register_customer")
+        failed = {f.index: f.reason for f in bulk.failures}
+        for i, (customer, result) in enumerate(zip(customers, results)):
+            if i in failed:
+                result.fail(failed[i])
+            else:
+                result.succeed(customer_id=customer.customer_id)
+
+    def _create_products(self, commands: List[Command], results: List[CommandResult]) -> None:
+        products = []
+        for command, result in zip(commands, results):
+            f = command.fields
+            if f["price"] < 0 or f["stockQuantity"] < 0:
+                result.fail("price and stockQuantity must be >= 0")
+            else:
+                products.append((Product(name=f["name"], price=f["price"], description=f.get("description"),
+                                         stockQuantity=f["stockQuantity"]), result))
+        if not products:
+            return
+        try:
+            self.repo.createProducts([p for p, _ in products])
+            self._calls("create_product")
+        except Exception:
+            # the batch was rolled back: find the offending rows one by one
+            for product, result in products:
+                product.product_id = None
+                self._one("create_product", result, lambda p=product: self._create_product(p))
+            return
+        for product, result in products:
+            result.succeed(product_id=product.product_id)
+
+    def _add_to_carts(self, commands: List[Command], results: List[CommandResult]) -> None:
+        lines = [(c.fields["customer_id"], c.fields["product_id"], c.fields["quantity"]) for c in commands]
+        bulk = self.repo.addToCarts(lines, chunkSize=self.chunk_size)
+        self._calls("add_to_cart", -(-len(lines) // self.chunk_size))
+        failed = {f.index: f.reason for f in bulk.failures}
+        for i, result in enumerate(results):
+            if i in failed:
+                result.fail(failed[i])
+            else:
+                result.succeed()
+
+    def _place_orders(self, commands: List[Command], results: List[CommandResult]) -> None:
+        # a cart order must see the cart as the earlier orders of its customer
+        # left it, so it starts a new placeOrders call after them
+        group: List[Tuple[Command, CommandResult]] = []
+        ordered = set()
+        for command, result in zip(commands, results):
+            cid = command.fields["customer_id"]
+            if "lines" not in command.fields and cid in ordered:
+                self._place_group(group)
+                group, ordered = [], set()
+            group.append((command, result))
+            ordered.add(cid)
+        self._place_group(group)
+
+    def _place_group(self, group: List[Tuple[Command, CommandResult]]) -> None:
+        """
+        One placeOrders call for the group; orders without lines take the
+        customer's cart, read just before.
+        """
+        batched = []
+        for command, result in group:
+            f = command.fields
+            lines = f.get("lines")
+            if lines is None:
+                try:
+                    lines = self._cart_lines(command, result)
+                except Exception as e:
+                    result.fail(e)
+                finally:
+                    self._calls("place_order")
+                if lines is None:
+                    continue        # failed, or answered by placeOrderIdempotent
+            batched.append((OrderRequest(f["customer_id"], lines, f["shipping_address"], f.get("request_key")),
+                            result))
+        if not batched:
+            return
+        outcomes = self.repo.placeOrders([request for request, _ in batched])
+        self._calls("place_order")
+        for (_, result), outcome in zip(batched, outcomes):
+            if outcome.error is not None:
+                result.fail(outcome.error)
+            else:
+                result.succeed(order_id=outcome.order_id, replayed=outcome.replayed)
+
+    def _cart_lines(self, command: Command, result: CommandResult) -> Optional[List[Tuple[int, int]]]:
+        """
+        The customer's cart as order lines. An empty cart under a
+        request_key goes to placeOrderIdempotent, which replays the order
+        that emptied it; None then, with `result` filled in.
+        """
+        f = command.fields
+        customer = Customer(customer_id=f["customer_id"])
+        if self.repo.replicas is not None:
+            self.repo.replicas.wrote(customer.customer_id)      # read the cart from the primary
+        lines = [(product.get_product_id(), qty) for product, qty in self.repo.getAllFromCart(customer)]
+        if lines:
+            return lines
+        if not f.get("request_key"):
+            raise ValueError("Cart is empty; nothing to order.")
+        # with the cart empty this either replays the key's order or raises
+        result.succeed(order_id=self.repo.placeOrderIdempotent(customer, None, f["shipping_address"],
+                                                               f["request_key"]), replayed=True)
+        return None
+
+    # ---------- one call per command ----------
+
+    def _one_by_one(self, call: Callable[[Dict[str, Any]], Dict[str, Any]]):
+        def handler(commands: List[Command], results: List[CommandResult]) -> None:
+            for command, result in zip(commands, results):
+                self._one(command.op, result, lambda c=command: call(c.fields))
+        return handler
+
+    def _one(self, op: str, result: CommandResult, call: Callable[[], Optional[Dict[str, Any]]]) -> None:
+        try:
+            outcome = call()
+        except Exception as e:
+            result.fail(e)
+        else:
+            result.succeed(**(outcome or {}))
+        finally:
+            self._calls(op)
+
+    def _create_product(self, product: Product) -> Dict[str, Any]:
+        self.repo.createProduct(product)
+        return {"product_id": product.product_id}
+
+    def _delete_product(self, f: Dict[str, Any]) -> Dict[str, Any]:
+        return {"deleted": self.repo.deleteProduct(f["product_id"])}
+
+    def _remove_from_cart(self, f: Dict[str, Any]) -> Dict[str, Any]:
+        return {"removed": self.repo.removeFromCart(Customer(customer_id=f["customer_id"]),
+                                                    Product(product_id=f["product_id"]))}
+
+    def _view_cart(self, f: Dict[str, Any]) -> Dict[str, Any]:
+        items = self.repo.getAllFromCart(Customer(customer_id=f["customer_id"]))
+        return {"items": [{"product_id": p.product_id, "name": p.name, "price": p.price, "quantity": qty}
+                          for p, qty in items]}
+
+    def _view_orders(self, f: Dict[str, Any]) -> Dict[str, Any]:
+        orders: Dict[int, Dict[str, Any]] = {}
+        for row in self.repo.iterOrdersByCustomer(f["customer_id"]):
+            order = orders.setdefault(row["order_id"], {"order_id": row["order_id"],
+                                                        "order_date": str(row["order_date"]), "items": []})
+            order["items"].append({"product_id": row["product"].product_id, "quantity": row["quantity"],
+                                   "unit_price": row["unit_price"]})
+        return {"orders": list(orders.values())}
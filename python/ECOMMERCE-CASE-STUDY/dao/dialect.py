@@ -0,0 +1,249 @@
+# dao/dialect.py
+"""
+SQL dialects: how to open a connection and how to spell the handful of
+statements that differ between backends.
+
+Repository SQL is written against the SQL Server schema (dbo.<table>,
+[bracketed] names, `?` parameters, `cur.execute(sql, *params)`); a dialect
+only builds the constructs that have no common spelling:
+
+    insert_returning      INSERT ... OUTPUT INSERTED.id   | INSERT ... RETURNING id
+    insert_many_returning multi-row MERGE ... OUTPUT      | one INSERT ... RETURNING per row
+    upsert_increment      MERGE WITH (HOLDLOCK)           | INSERT ... ON CONFLICT DO UPDATE
+    upsert_add            (same, several counter columns)
+    lock_table            SELECT ... WITH (TABLOCKX)      | (write lock taken by BEGIN IMMEDIATE)
+    select_top            SELECT TOP (?) ...              | SELECT ... LIMIT ?
+    values_table          (VALUES ...) AS v (a, b)        | (SELECT column1 AS a, ... FROM (VALUES ...)) AS v
+
+Select one with `dialect=sqlserver|sqlite` in db.properties (default sqlserver).
+"""
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from dao.batching import MAX_PARAMS, chunks, placeholders
+from util.db_conn_util import DBConnUtil
+from util.property_util import DBPropertyUtil
+
+
+class _NeverRaised(Exception):
+    """
+    Stands in for a driver exception class when the driver is not installed,
+    so `except dialect.IntegrityError` stays valid.
+    """
+
+
+class Dialect:
+    """
+    Base class; see the module docstring for what each method builds.
+    """
+    name = "generic"
+    IntegrityError: type = _NeverRaised
+    # per-connection cursor cache size when statement_cache_size is unset
+    # (util.statement_cache); worth it only where the driver re-prepares
+    statement_cache_size = 0
+
+    def connect(self, props: Dict[str, str]) -> Any:
+        raise NotImplementedError
+
+    def is_retryable(self, err: Exception) -> bool:
+        """
+        True for transient errors (deadlock victim, lock timeout, busy database).
+        """
+        return False
+
+    def is_foreign_key_violation(self, err: Exception) -> bool:
+        """
+        True for FK errors whose message does not name the constraint, so the
+        caller has to look the referenced rows up itself.
+        """
+        return False
+
+    def insert_returning(self, table: str, columns: Sequence[str], id_column: str) -> str:
+        raise NotImplementedError
+
+    def insert_many_returning(self, cur, table: str, columns: Sequence[str], id_column: str,
+                              rows: Sequence[Sequence[Any]]) -> List[int]:
+        """
+        Inserts `rows` and returns their generated ids in input order.
+        """
+        raise NotImplementedError
+
+    def upsert_increment(self, table: str, keys: Sequence[str], column: str, rows: int) -> str:
+        """
+        Statement inserting `rows` (*keys, column) tuples, adding `column` to the
+        existing value when the key is already present.
+        """
+        return self.upsert_add(table, keys, (column,), rows)
+
+    def upsert_add(self, table: str, keys: Sequence[str], columns: Sequence[str], rows: int) -> str:
+        """
+        upsert_increment for several counter columns: `rows` (*keys, *columns)
+        tuples, each column added to the existing value. Keys must be unique
+        within one statement.
+        """
+        raise NotImplementedError
+
+    def lock_table(self, cur, table: str) -> None:
+        """
+        Takes an exclusive lock on `table` until the end of the transaction,
+        waiting for writers already in flight.
+        """
+        raise NotImplementedError
+
+    def select_top(self, limit: int, columns: str, rest: str, params: Sequence[Any]) -> Tuple[str, List[Any]]:
+        """
+        `SELECT columns rest` limited to `limit` rows; `rest` is the FROM ...
+        ORDER BY tail and `params` its parameters. Returns (sql, params).
+        """
+        raise NotImplementedError
+
+    def values_table(self, rows: int, columns: Sequence[str], alias: str) -> str:
+        """
+        Table expression over `rows` parameter tuples, usable in FROM/JOIN.
+        """
+        raise NotImplementedError
+
+    def start_replication(self, props: Dict[str, str],
+                          replicas: Dict[str, Dict[str, str]]) -> Optional[Callable[[], None]]:
+        """
+        Starts keeping the replicas (util.replica_router) in step with the
+        primary when the backend has no replication of its own; returns a
+        callable stopping it, or None when replication happens elsewhere.
+        """
+        return None
+
+
+class SqlServerDialect(Dialect):
+    name = "sqlserver"
+    # pyodbc skips SQLPrepare when a cursor re-runs its statement text
+    statement_cache_size = 32
+    # SQLSTATEs worth retrying: serialization failure / deadlock victim, lock timeout
+    RETRYABLE_SQLSTATES = ("40001", "HYT00")
+
+    def __init__(self):
+        # the driver is loaded only when this dialect is selected
+        pyodbc = DBConnUtil.driver()
+        self.IntegrityError = pyodbc.IntegrityError if pyodbc is not None else _NeverRaised
+
+    def connect(self, props: Dict[str, str]) -> Any:
+        return _ClosingConnection(DBConnUtil.get_connection(DBPropertyUtil.build_connection_string(props)))
+
+    def is_retryable(self, err: Exception) -> bool:
+        args = getattr(err, "args", ())
+        return bool(args) and args[0] in self.RETRYABLE_SQLSTATES
+
+    def insert_returning(self, table: str, columns: Sequence[str], id_column: str) -> str:
+        return (
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"OUTPUT INSERTED.{id_column} "
+            f"VALUES ({placeholders(len(columns))})"
+        )
+
+    def insert_many_returning(self, cur, table: str, columns: Sequence[str], id_column: str,
+                              rows: Sequence[Sequence[Any]]) -> List[int]:
+        # MERGE ... ON 1 = 0 inserts every row and, unlike INSERT, may OUTPUT a
+        # source column, so each generated id is paired with its row position.
+        ids: List[Any] = [None] * len(rows)
+        width = len(columns) + 1
+        for chunk in chunks(list(enumerate(rows)), MAX_PARAMS // width):
+            cur.execute(
+                f"""
+                MERGE {table} AS t
+                USING (VALUES {placeholders(len(chunk), width)})
+                    AS s (seq, {', '.join(columns)})
+                   ON 1 = 0
+                WHEN NOT MATCHED THEN
+                    INSERT ({', '.join(columns)})
+                    VALUES ({', '.join('s.' + c for c in columns)})
+                OUTPUT s.seq, INSERTED.{id_column};
+                """,
+                *[v for seq, row in chunk for v in (seq, *row)],
+            )
+            for seq, new_id in cur.fetchall():
+                ids[seq] = new_id
+        return ids
+
+    def upsert_add(self, table: str, keys: Sequence[str], columns: Sequence[str], rows: int) -> str:
+        # HOLDLOCK keeps the match-then-insert atomic under concurrency.
+        cols = [*keys, *columns]
+        return f"""
+            MERGE {table} WITH (HOLDLOCK) AS t
+            USING (VALUES {placeholders(rows, len(cols))}) AS s ({', '.join(cols)})
+               ON {' AND '.join(f't.{k} = s.{k}' for k in keys)}
+            WHEN MATCHED THEN
+                UPDATE SET {', '.join(f't.{c} = t.{c} + s.{c}' for c in columns)}
+            WHEN NOT MATCHED THEN
+                INSERT ({', '.join(cols)})
+                VALUES ({', '.join('s.' + c for c in cols)});
+            """
+
+    def lock_table(self, cur, table: str) -> None:
+        cur.execute(f"SELECT TOP (0) 1 FROM {table} WITH (TABLOCKX, HOLDLOCK)")
+        cur.fetchall()
+
+    def select_top(self, limit: int, columns: str, rest: str, params: Sequence[Any]) -> Tuple[str, List[Any]]:
+        return f"SELECT TOP (?) {columns} {rest}", [limit, *params]
+
+    def values_table(self, rows: int, columns: Sequence[str], alias: str) -> str:
+        return f"(VALUES {placeholders(rows, len(columns))}) AS {alias} ({', '.join(columns)})"
+
+
+class _ClosingCursor:
+    """
+    pyodbc cursor whose `with` block closes it. A bare pyodbc cursor commits
+    when its `with` block exits, which would end the caller's transaction
+    early (e.g. keep a stock decrement that is about to be rolled back).
+    """
+    __slots__ = ("_cur",)
+
+    def __init__(self, cur: Any):
+        object.__setattr__(self, "_cur", cur)
+
+    def __getattr__(self, name: str):
+        return getattr(self._cur, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._cur, name, value)
+
+    def __enter__(self):
+        return self._cur
+
+    def __exit__(self, *exc) -> bool:
+        self._cur.close()
+        return False
+
+
+class _ClosingConnection:
+    """
+    pyodbc connection handing out _ClosingCursor; transactions end only on
+    an explicit commit() / rollback().
+    """
+    __slots__ = ("_conn",)
+
+    def __init__(self, conn: Any):
+        self._conn = conn
+
+    def cursor(self) -> _ClosingCursor:
+        return _ClosingCursor(self._conn.cursor())
+
+    def __getattr__(self, name: str):
+        return getattr(self._conn, name)
+
+
+_DIALECTS = {
+    "sqlserver": "dao.dialect:SqlServerDialect",
+    "mssql": "dao.dialect:SqlServerDialect",
+    "sqlite": "dao.sqlite_dialect:SQLiteDialect",
+}
+
+
+def get_dialect(props: Dict[str, str]) -> Dialect:
+    """
+    The dialect named by the `dialect` property (default sqlserver).
+    """
+    name = props.get("dialect", "sqlserver").strip().lower()
+    target = _DIALECTS.get(name)
+    if target is None:
+        raise ValueError(f"Unknown dialect '{name}'; expected one of: {', '.join(sorted(_DIALECTS))}")
+    module_name, class_name = target.split(":")
+    module = __import__(module_name, fromlist=[class_name])
+    return getattr(module, class_name)()
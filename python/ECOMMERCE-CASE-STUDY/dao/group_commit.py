@@ -0,0 +1,144 @@
+# dao/group_commit.py
+"""
+Group commit for concurrent checkouts.
+
+Every placeOrder() is its own transaction, so with many small orders the
+commit (log flush / fsync) is the throughput ceiling. GroupCommitCoordinator
+lets concurrent callers share one: each caller hands its order to a flusher
+thread and blocks; the flusher collects the orders that arrive within a
+short window (up to max_batch orders or max_wait_ms after the first one)
+and places them with one placeOrders() call - one stock decrement per
+product, multi-row inserts, one commit. Each caller gets its own result;
+only the orders that fail validation (unknown customer/product, short
+stock) are retried on their own.
+
+db.properties:
+    group_commit=yes                 route placeOrder through the coordinator
+    group_commit_max_batch=64        orders per transaction
+    group_commit_max_wait_ms=2       how long a batch waits to fill up
+"""
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+from dao.order_request import OrderRequest, OrderResult
+from entity.customer import Customer
+from entity.product import Product
+
+
+class GroupCommitCoordinator:
+    """
+    The window is only waited for while the batch is not full, and orders
+    that arrive while a transaction is in flight simply queue up for the
+    next one. A lone order is flushed at once unless the previous batch had
+    company (like PostgreSQL's commit_siblings), so a single client does not
+    pay the window on every order.
+    """
+
+    def __init__(self, repo, max_batch: int = 64, max_wait_ms: float = 2.0):
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        self.repo = repo
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[OrderRequest, Future]] = []
+        self._closed = False
+        self.batches = 0
+        self.orders = 0
+        self._last_batch = 0
+        self._thread = threading.Thread(target=self._run, name="group-commit", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_properties(cls, repo, props: Dict[str, str]) -> Optional["GroupCommitCoordinator"]:
+        """
+        A coordinator if `group_commit` is on, else None.
+        """
+        if props.get("group_commit", "no").lower() not in ("yes", "true", "1"):
+            return None
+        return cls(repo,
+                   max_batch=int(props.get("group_commit_max_batch", "64")),
+                   max_wait_ms=float(props.get("group_commit_max_wait_ms", "2")))
+
+    def submit(self, request: OrderRequest) -> "Future[OrderResult]":
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("GroupCommitCoordinator is closed")
+            self._pending.append((request, future))
+            self._cond.notify()
+        return future
+
+    def place(self, request: OrderRequest, timeout: Optional[float] = None) -> OrderResult:
+        return self.submit(request).result(timeout)
+
+    def placeOrder(self,
+                   customer: Customer,
+                   items: Optional[List[Tuple[Product, int]]],
+                   shippingAddress: str) -> bool:
+        """
+        Same contract as OrderProcessorRepositoryImpl.placeOrder: items None
+        takes the cart, failures raise the same exceptions.
+        """
+        if items is None:
+            items = self.repo.getAllFromCart(customer)
+            if not items:
+                raise ValueError("Cart is empty; nothing to order.")
+        request = OrderRequest(customer.get_customer_id(),
+                               [(prod.get_product_id(), qty) for prod, qty in items],
+                               shippingAddress)
+        result = self.place(request)
+        if result.error is not None:
+            raise result.error
+        return True
+
+    def close(self) -> None:
+        """
+        Places what is still queued, then stops the flusher thread.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def __enter__(self) -> "GroupCommitCoordinator":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self.close()
+        return False
+
+    # ---------- flusher ----------
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                deadline = time.monotonic() + self.max_wait
+                concurrent = len(self._pending) > 1 or self._last_batch > 1
+                while concurrent and len(self._pending) < self.max_batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                self._last_batch = len(batch)
+            self._flush(batch)
+
+    def _flush(self, batch: List[Tuple[OrderRequest, Future]]) -> None:
+        try:
+            results = self.repo.placeOrders([request for request, _ in batch])
+        except BaseException as e:       # never leave a caller waiting
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.orders += len(batch)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
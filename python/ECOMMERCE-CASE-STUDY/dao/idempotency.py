@@ -0,0 +1,119 @@
+# dao/idempotency.py
+"""
+Support for placeOrder idempotency keys (dbo.orders.request_key).
+
+IdempotencyKeyCache remembers recently placed keys, with the customer
+each was placed for, so a client retry is answered from memory; the unique index on dbo.orders.request_key remains
+the source of truth (other processes, restarts). IdempotencyKeyJanitor
+periodically releases keys older than the retention window
+(OrderProcessorRepositoryImpl.expireIdempotencyKeys).
+
+The retention window bounds how late a replay can come: once a key is
+released, a retry with it places a new order. Keep idempotency_key_ttl
+above the longest a client (or a checkout ticket) may retry. The janitor
+runs only in the process that asks for it (EcomApp) and only with
+idempotency_cleanup_interval > 0; workers, batch runs and benchmarks
+never release keys.
+
+db.properties:
+    idempotency_cache_size=10000          keys remembered in memory (0 = off)
+    idempotency_key_ttl=86400             seconds a key is honoured
+    idempotency_cleanup_interval=0        seconds between cleanups (0 = never)
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+_log = logging.getLogger(__name__)
+
+# width of dbo.orders.request_key
+MAX_KEY_LENGTH = 64
+
+
+def check_key(key: str) -> str:
+    if not isinstance(key, str) or not key or len(key) > MAX_KEY_LENGTH:
+        raise ValueError(f"Idempotency key must be a non-empty string of at most {MAX_KEY_LENGTH} characters.")
+    return key
+
+
+class IdempotencyKeyCache:
+    """
+    Size-bounded LRU of key -> (order_id, customer_id) with a per-entry TTL.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 86400.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # key -> (expires_at, order_id, customer_id)
+        self._entries: "OrderedDict[str, Tuple[float, int, int]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_properties(cls, props: Dict[str, str]) -> "IdempotencyKeyCache":
+        size = props.get("idempotency_cache_size")
+        ttl = props.get("idempotency_key_ttl")
+        return cls(
+            max_size=int(size) if size else 10000,
+            ttl=float(ttl) if ttl else 86400.0,
+        )
+
+    def get(self, key: str) -> Optional[Tuple[int, int]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key: str, order_id: int, customer_id: int) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, order_id, customer_id)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size,
+                    "hits": self.hits, "misses": self.misses}
+
+
+class IdempotencyKeyJanitor:
+    """
+    Daemon thread calling `cleanup()` every `interval` seconds.
+    """
+
+    def __init__(self, cleanup: Callable[[], int], interval: float):
+        self.cleanup = cleanup
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="idempotency-janitor", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                released = self.cleanup()
+                if released:
+                    _log.info("released %d expired idempotency keys", released)
+            except Exception:
+                _log.exception("idempotency key cleanup failed")     # try again next interval
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
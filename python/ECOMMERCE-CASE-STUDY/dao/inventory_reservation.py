@@ -0,0 +1,147 @@
+# dao/inventory_reservation.py
+import random
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from dao.batching import MAX_PARAMS, chunks, placeholders
+from dao.dialect import Dialect, SqlServerDialect
+
+
+class StockShortage:
+    """
+    One product that could not be reserved in full.
+    """
+
+    def __init__(self, product_id: int, requested: int, available: int):
+        self.product_id = product_id
+        self.requested = requested
+        self.available = available
+
+    def __repr__(self) -> str:
+        return f"StockShortage(product_id={self.product_id}, requested={self.requested}, available={self.available})"
+
+
+class ReservationResult:
+    """
+    Outcome of InventoryReservationEngine.reserve().
+
+    reserved  - True when every line was decremented (transaction still open)
+    shortages - products whose current stock is below the requested quantity
+    attempts  - number of decrement attempts made
+    """
+
+    def __init__(self,
+                 reserved: bool,
+                 lines: Sequence[Tuple[int, int]],
+                 shortages: Optional[List[StockShortage]] = None,
+                 attempts: int = 1):
+        self.reserved = reserved
+        self.lines = list(lines)
+        self.shortages = shortages or []
+        self.attempts = attempts
+
+    def available_lines(self) -> List[Tuple[int, int]]:
+        """
+        The (product_id, quantity) lines capped at what is currently in stock,
+        dropping products with nothing left - i.e. what could be ordered now.
+        """
+        short: Dict[int, int] = {s.product_id: s.available for s in self.shortages}
+        result = []
+        for pid, qty in self.lines:
+            qty = min(qty, short.get(pid, qty))
+            if qty > 0:
+                result.append((pid, qty))
+        return result
+
+    def __repr__(self) -> str:
+        return f"ReservationResult(reserved={self.reserved}, shortages={self.shortages}, attempts={self.attempts})"
+
+
+class InventoryReservationEngine:
+    """
+    Reserves stock with a conditional, set-based decrement:
+
+        UPDATE ... SET stockQuantity = stockQuantity - v.quantity
+        WHERE stockQuantity >= v.quantity
+
+    If fewer rows are updated than requested lines, the transaction is rolled
+    back and current stock is re-read. Real shortages are returned at once;
+    if everything looks available again (a concurrent order released stock, or
+    the attempt was a deadlock victim) the decrement is retried with bounded,
+    jittered exponential backoff.
+
+    reserve() must be the first write of the caller's transaction, since a
+    failed attempt rolls the connection back.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.005, max_delay: float = 0.1,
+                 dialect: Optional[Dialect] = None):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be >= 1")
+        self.dialect = dialect or SqlServerDialect()
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def reserve(self, conn, lines: Sequence[Tuple[int, int]]) -> ReservationResult:
+        """
+        lines: (product_id, quantity) pairs with unique product ids.
+        """
+        lines = list(lines)
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                updated = self._decrement(conn, lines)
+            except Exception as e:
+                if not self.dialect.is_retryable(e):
+                    raise
+                updated = -1
+            if updated == len(lines):
+                return ReservationResult(True, lines, attempts=attempt)
+
+            conn.rollback()
+            shortages = self._find_shortages(conn, lines)
+            if shortages:
+                return ReservationResult(False, lines, shortages, attempts=attempt)
+            if attempt < self.max_attempts:
+                self._backoff(attempt)
+
+        return ReservationResult(False, lines, attempts=self.max_attempts)
+
+    # ---------- internals ----------
+
+    def _decrement(self, conn, lines: List[Tuple[int, int]]) -> int:
+        updated = 0
+        with conn.cursor() as cur:
+            for chunk in chunks(lines, MAX_PARAMS // 2):
+                cur.execute(
+                    f"""
+                    UPDATE dbo.products SET stockQuantity = stockQuantity - v.quantity
+                    FROM {self.dialect.values_table(len(chunk), ("product_id", "quantity"), "v")}
+                    WHERE v.product_id = dbo.products.product_id
+                      AND dbo.products.stockQuantity >= v.quantity
+                    """,
+                    *[v for line in chunk for v in line],
+                )
+                updated += cur.rowcount
+        return updated
+
+    def _find_shortages(self, conn, lines: List[Tuple[int, int]]) -> List[StockShortage]:
+        stock: Dict[int, int] = {}
+        with conn.cursor() as cur:
+            for chunk in chunks([pid for pid, _ in lines], MAX_PARAMS):
+                cur.execute(
+                    f"SELECT product_id, stockQuantity FROM dbo.products WHERE product_id IN ({placeholders(len(chunk))})",
+                    *chunk,
+                )
+                for row in cur.fetchall():
+                    stock[int(row[0])] = int(row[1])
+        conn.rollback()   # end the read-only transaction before any retry
+        return [
+            StockShortage(pid, qty, stock.get(pid, 0))
+            for pid, qty in lines
+            if stock.get(pid, 0) < qty
+        ]
+
+    def _backoff(self, attempt: int) -> None:
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        time.sleep(random.uniform(0, delay))
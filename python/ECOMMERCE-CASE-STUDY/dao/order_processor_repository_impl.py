@@ -1,213 +1,766 @@
 # dao/order_processor_repository_impl.py
-from typing import List, Tuple, Optional, Dict, Any
-import pyodbc
+import datetime
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, List, Tuple, Optional, Dict, Any, Iterator, Iterable
 
 from dao.order_processor_repository import OrderProcessorRepository
+from dao.batching import MAX_PARAMS, chunks, placeholders
+from dao.dialect import Dialect, get_dialect
+from dao.idempotency import IdempotencyKeyCache, IdempotencyKeyJanitor, check_key
+from dao.inventory_reservation import InventoryReservationEngine, ReservationResult
+from dao.product_cache import ProductCache
+from dao.bulk_result import BulkResult, RowFailure
+from dao.order_request import OrderRequest, OrderResult
 from entity.product import Product
 from entity.customer import Customer
+from entity.order import Order
+from entity.row_mapper import product_from_row, products_from_rows, order_item_from_row
 from myexceptions import (
     CustomerNotFoundException,
     ProductNotFoundException,
     OrderNotFoundException,
+    InsufficientStockException,
+    IdempotencyKeyConflictException,
 )
 from util.db_connection import DBConnection
+from util.property_util import DBPropertyUtil
+from util.connection_pool import ConnectionPool
+
+if TYPE_CHECKING:
+    # optional features are imported when switched on (see _optional)
+    from dao.cart_store import CartStore
+    from dao.group_commit import GroupCommitCoordinator
+    from dao.product_search import ProductSearchIndex
+    from dao.sales_analytics import SalesAggregates
+    from util.replica_router import ReplicaRouter
+
+# FK constraint names (see sql/ecommerce-case-study-30-07-25.sql) mapped to not-found errors
+_CUSTOMER_FKS = ("FK_cart_customer", "FK_orders_customer")
+_PRODUCT_FKS = ("FK_cart_product", "FK_order_items_product")
+
+# Public calls reported as CallEvents when the pool is instrumented
+_INSTRUMENTED_CALLS = (
+    "createProduct", "createProducts", "createCustomer", "createCustomers",
+    "deleteProduct", "deleteCustomer",
+    "addToCart", "addManyToCart", "addToCarts", "removeFromCart", "getAllFromCart",
+    "searchProducts", "placeOrder", "placeOrderIdempotent", "placeOrders", "expireIdempotencyKeys", "getOrdersByCustomer", "getOrdersByCustomerPage", "getOrdersWithItemsByCustomer",
+)
+
+_PRODUCT_COLUMNS = ("name", "price", "[description]", "stockQuantity")
+_CUSTOMER_COLUMNS = ("name", "email", "[password]")
+_ORDER_COLUMNS = ("customer_id", "total_price", "shipping_address", "request_key")
+
+# Fixed statements (module constants so their text is identical on every call)
+_CUSTOMER_EXISTS_SQL = "SELECT 1 FROM dbo.customers WHERE customer_id = ?"
+_PRODUCT_EXISTS_SQL = "SELECT 1 FROM dbo.products WHERE product_id = ?"
+_PRODUCTS_BY_ID_SQL = "SELECT product_id, name, price, [description], stockQuantity FROM dbo.products WHERE product_id IN "
+_REMOVE_FROM_CART_SQL = "DELETE FROM dbo.cart WHERE customer_id = ? AND product_id = ?"
+_CART_SQL = """
+    SELECT p.product_id, p.name, p.price, p.[description], p.stockQuantity, c.quantity
+    FROM dbo.cart c
+    JOIN dbo.products p ON p.product_id = c.product_id
+    WHERE c.customer_id = ?
+    ORDER BY p.name
+    """
 
 
 class OrderProcessorRepositoryImpl(OrderProcessorRepository):
     """
     Concrete implementation for all repository methods.
-    Uses pyodbc connection from util.DBConnection.
+    Checks out a connection from the util.DBConnection pool
+    for every unit of work. Statements that differ between SQL Server and
+    SQLite are built by the pool's dialect (dao.dialect). With read
+    replicas configured (util.replica_router), cart and order-history reads
+    go to a replica unless the customer wrote recently.
     """
 
-    def __init__(self, prop_file: str = "config/db.properties"):
-        # One shared connection for this repo
-        self.conn = DBConnection.get_connection(prop_file)
+    def __init__(self,
+                 prop_file: str = "config/db.properties",
+                 pool: Optional[ConnectionPool] = None,
+                 product_cache: Optional[ProductCache] = None,
+                 precheck_existence: Optional[bool] = None,
+                 replicas: Optional["ReplicaRouter"] = None,
+                 own_carts: bool = True,
+                 key_cleanup: bool = False):
+        # Shared pool for this property file (or an injected one, e.g. for tests)
+        self.pool = pool if pool is not None else DBConnection.get_pool(prop_file)
+        props = DBPropertyUtil.get_properties(prop_file) if pool is None else {}
+        # Read replicas for read-only calls (None: everything on the primary)
+        self.replicas = replicas if replicas is not None or pool is not None else DBConnection.get_router(prop_file)
+        # SQL spelling for the backend behind the pool (SQL Server unless configured)
+        self.dialect: Dialect = self.pool.dialect or get_dialect(props)
+        # Read-through catalog cache in front of dbo.products
+        self.product_cache = product_cache if product_cache is not None else ProductCache.from_properties(props)
+        # Conditional stock decrement with bounded retry, used by placeOrder
+        self.reservations = InventoryReservationEngine(dialect=self.dialect)
+        # Fixed statement texts, built once so the per-connection statement
+        # cache (util.statement_cache) sees identical SQL on every call
+        self._insert_product_sql = self.dialect.insert_returning("dbo.products", _PRODUCT_COLUMNS, "product_id")
+        self._insert_customer_sql = self.dialect.insert_returning("dbo.customers", _CUSTOMER_COLUMNS, "customer_id")
+        self._insert_order_sql = self.dialect.insert_returning(
+            "dbo.orders", ("customer_id", "total_price", "shipping_address"), "order_id")
+        self._add_to_cart_sql = self._cart_upsert_sql(1)
+        # True: SELECT customer/product before every write (old behaviour).
+        # False: write directly and map FK violations to not-found exceptions.
+        if precheck_existence is None:
+            precheck_existence = props.get("precheck_existence", "no").lower() in ("yes", "true", "1")
+        self.precheck_existence = precheck_existence
+        # Shared transactions for concurrent placeOrder calls (off unless group_commit=yes)
+        self.group_commit: Optional["GroupCommitCoordinator"] = self._optional(
+            props, "group_commit", ("yes", "true", "1"), "dao.group_commit:GroupCommitCoordinator")
+        # Sales aggregates updated in every order transaction (off unless sales_aggregates=yes)
+        self.sales: Optional["SalesAggregates"] = self._optional(
+            props, "sales_aggregates", ("yes", "true", "1"), "dao.sales_analytics:SalesAggregates")
+        # Full-text catalog index, built on the first searchProducts() call and
+        # rebuilt in the background once older than search_refresh_seconds (0 = never)
+        self.search_index: Optional["ProductSearchIndex"] = None
+        self._search_lock = threading.Lock()
+        self._search_rebuild: Optional["ProductSearchIndex"] = None     # being built by refreshSearchIndex
+        self._search_refresh_lock = threading.Lock()                     # one load at a time
+        self._search_removed: Optional[set] = None      # ids deleted while a load runs
+        self._search_built_at = 0.0
+        self.search_refresh_seconds = float(props.get("search_refresh_seconds") or 0)
+        # Process-local carts with write-behind to dbo.cart (off unless cart_store=memory).
+        # own_carts=False: this process does not serve carts (worker, batch
+        # tool) and must not take over the cart log of the one that does.
+        self.carts: Optional["CartStore"] = self._optional(
+            props, "cart_store", ("memory",), "dao.cart_store:CartStore") if own_carts else None
+        # Recently placed idempotency keys, answered without a round trip
+        self.idempotency_keys = IdempotencyKeyCache.from_properties(props)
+        self.idempotency_key_ttl = float(props.get("idempotency_key_ttl") or 86400)
+        # Statement/call hooks (util.instrumentation); methods stay unwrapped when off
+        self.instrumentation = self.pool.instrumentation
+        if self.instrumentation is not None:
+            for name in _INSTRUMENTED_CALLS:
+                setattr(self, name, self.instrumentation.wrap_method(name, getattr(self, name)))
+        # Periodic release of expired keys, only in the one process that asks for it
+        # (key_cleanup=True, EcomApp) and with idempotency_cleanup_interval > 0
+        interval = float(props.get("idempotency_cleanup_interval") or 0) if key_cleanup else 0.0
+        self.key_janitor = IdempotencyKeyJanitor(self.expireIdempotencyKeys, interval) if interval > 0 else None
 
     # ---------- helpers ----------
 
-    def _ensure_customer_exists(self, customer_id: int) -> None:
-        with self.conn.cursor() as cur:
-            cur.execute("SELECT 1 FROM dbo.customers WHERE customer_id = ?", customer_id)
-            if cur.fetchone() is None:
-                raise CustomerNotFoundException(customer_id)
-
-    def _ensure_product_exists(self, product_id: int) -> None:
-        with self.conn.cursor() as cur:
-            cur.execute("SELECT 1 FROM dbo.products WHERE product_id = ?", product_id)
-            if cur.fetchone() is None:
-                raise ProductNotFoundException(product_id)
-
-    def _load_product(self, product_id: int) -> Product:
-        with self.conn.cursor() as cur:
-            cur.execute(
-                "SELECT product_id, name, price, [description], stockQuantity "
-                "FROM dbo.products WHERE product_id = ?",
-                product_id,
-            )
-            row = cur.fetchone()
-            if row is None:
-                raise ProductNotFoundException(product_id)
-            return Product(
-                product_id=row[0],
-                name=row[1],
-                price=float(row[2]),
-                description=row[3],
-                stockQuantity=int(row[4]),
-            )
+    def _optional(self, props: Dict[str, str], key: str, on: Tuple[str, ...], target: str) -> Any:
+        """
+        The feature class's from_properties(self, props) when property `key`
+        is one of `on`, else None without importing the feature's module
+        (so a repository with the feature off does not pay for it at startup).
+        """
+        if props.get(key, "").lower() not in on:
+            return None
+        module_name, class_name = target.split(":")
+        module = __import__(module_name, fromlist=[class_name])
+        return getattr(module, class_name).from_properties(self, props)
+
+    @staticmethod
+    def _statement(conn, sql: str):
+        """
+        Cursor context for one of the fixed statements: the connection's
+        registered cursor when it has a statement cache, else a fresh one.
+        Results must be fetched inside the `with` block.
+        """
+        statements = getattr(conn, "statements", None)
+        return statements.cursor(sql) if statements is not None else conn.cursor()
+
+    def _read_connection(self, customer_id: Optional[int] = None):
+        """
+        Connection context for a read-only unit of work on behalf of
+        `customer_id`: a replica when configured and the customer has not
+        written recently, else the primary.
+        """
+        if self.replicas is None:
+            return self.pool.connection()
+        return self.replicas.connection(customer_id)
+
+    def _wrote(self, *customer_ids: int) -> None:
+        """
+        Keeps these customers' reads on the primary for the read-your-writes window.
+        """
+        if self.replicas is not None:
+            for customer_id in customer_ids:
+                self.replicas.wrote(customer_id)
+
+    def _ensure_customer_exists(self, conn, customer_id: int) -> None:
+        with self._statement(conn, _CUSTOMER_EXISTS_SQL) as cur:
+            cur.execute(_CUSTOMER_EXISTS_SQL, customer_id)
+            found = cur.fetchall()
+        if not found:
+            raise CustomerNotFoundException(customer_id)
+
+    def _ensure_product_exists(self, conn, product_id: int) -> None:
+        if self.product_cache.get(product_id) is not None:
+            return
+        with self._statement(conn, _PRODUCT_EXISTS_SQL) as cur:
+            cur.execute(_PRODUCT_EXISTS_SQL, product_id)
+            found = cur.fetchall()
+        if not found:
+            raise ProductNotFoundException(product_id)
+
+    def _precheck(self, conn, customer_id: Optional[int] = None, product_id: Optional[int] = None) -> None:
+        """
+        Existence pre-checks; a no-op unless precheck_existence is on.
+        """
+        if self.precheck_existence:
+            self._check_on_miss(conn, customer_id, product_id)
+
+    def _check_on_miss(self, conn, customer_id: Optional[int] = None, product_id: Optional[int] = None) -> None:
+        """
+        Raises the matching not-found exception; used when a statement
+        touched no rows and we need to know why. On a replica connection a
+        miss is confirmed on the primary, since the replica may lag.
+        """
+        try:
+            if customer_id is not None:
+                self._ensure_customer_exists(conn, customer_id)
+            if product_id is not None:
+                self._ensure_product_exists(conn, product_id)
+        except (CustomerNotFoundException, ProductNotFoundException):
+            if self.replicas is None or not self.replicas.served_by_replica(conn):
+                raise
+            with self.pool.connection() as primary:
+                self._check_on_miss(primary, customer_id, product_id)
+
+    def _not_found_error(self, conn, err: Exception, customer_id: Optional[int] = None,
+                         product_id: Optional[int] = None) -> Optional[Exception]:
+        """
+        Translates an FK violation into CustomerNotFoundException /
+        ProductNotFoundException, or returns None for any other error.
+        Call after rolling back; backends that do not name the violated
+        constraint (SQLite) get the referenced rows looked up on `conn`.
+        """
+        msg = str(err)
+        if any(fk in msg for fk in _CUSTOMER_FKS):
+            return CustomerNotFoundException(customer_id)
+        if any(fk in msg for fk in _PRODUCT_FKS):
+            return ProductNotFoundException(product_id)
+        if self.dialect.is_foreign_key_violation(err):
+            try:
+                self._check_on_miss(conn, customer_id, product_id)
+            except (CustomerNotFoundException, ProductNotFoundException) as e:
+                return e
+        return None
+
+    def _cart_upsert_sql(self, rows: int) -> str:
+        """
+        Adds `rows` (customer_id, product_id, quantity) lines to dbo.cart.
+        """
+        return self.dialect.upsert_increment("dbo.cart", ("customer_id", "product_id"), "quantity", rows)
+
+    def _load_product(self, conn, product_id: int) -> Product:
+        return self._load_products(conn, [product_id])[product_id]
+
+    def _load_products(self, conn, product_ids: List[int], missing_ok: bool = False) -> Dict[int, Product]:
+        """
+        Read-through load of several products: cache hits are served from
+        memory, misses are fetched with one `IN (...)` query per chunk.
+        Raises ProductNotFoundException for the first id that does not exist,
+        unless missing_ok (then unknown ids are simply absent from the result).
+        """
+        products, missing = self.product_cache.get_many(product_ids)
+        for chunk in chunks(missing, MAX_PARAMS):
+            sql = _PRODUCTS_BY_ID_SQL + f"({placeholders(len(chunk))})"
+            with self._statement(conn, sql) as cur:
+                cur.execute(sql, *chunk)
+                rows = cur.fetchall()
+            for prod in products_from_rows(rows):
+                products[prod.product_id] = prod
+                self.product_cache.put(prod)
+        if not missing_ok:
+            for pid in product_ids:
+                if pid not in products:
+                    raise ProductNotFoundException(pid)
+        return products
 
     def createProduct(self, product: Product) -> bool:
-        with self.conn.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO dbo.products (name, price, [description], stockQuantity)
-                OUTPUT INSERTED.product_id
-                VALUES (?, ?, ?, ?)
-                """,
-                product.get_name(),
-                product.get_price(),
-                product.get_description(),
-                product.get_stockQuantity(),
-            )
-            row = cur.fetchone()
-            if not row or row[0] is None:
-                self.conn.rollback()
-                raise RuntimeError("Failed to obtain new product_id after insert.")
-            product.set_product_id(int(row[0]))
-        self.conn.commit()
+        with self.pool.connection() as conn:
+            with self._statement(conn, self._insert_product_sql) as cur:
+                cur.execute(
+                    self._insert_product_sql,
+                    product.get_name(),
+                    product.get_price(),
+                    product.get_description(),
+                    product.get_stockQuantity(),
+                )
+                row = next(iter(cur.fetchall()), None)
+                if not row or row[0] is None:
+                    conn.rollback()
+                    raise RuntimeError("Failed to obtain new product_id after insert.")
+                product.set_product_id(int(row[0]))
+            conn.commit()
+        self.product_cache.put(product)
+        self._search_created([product.product_id])
+        for index in self._search_targets():
+            index.add(product.product_id, product.name, product.price, product.description, product.stockQuantity)
         return True
 
+    def createProducts(self, products: List[Product]) -> List[int]:
+        """
+        Inserts a batch of products in one transaction and returns their new
+        ids in input order (each Product also gets its id set). On SQL Server
+        rows are sent as multi-row MERGE statements whose OUTPUT pairs every
+        generated product_id with the row's position, so ids map back exactly.
+        Bulk loads bypass the product cache.
+        """
+        if not products:
+            return []
+        with self.pool.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    ids = self.dialect.insert_many_returning(
+                        cur, "dbo.products", _PRODUCT_COLUMNS, "product_id",
+                        [(p.name, p.price, p.description, p.stockQuantity) for p in products],
+                    )
+                if any(i is None for i in ids):
+                    raise RuntimeError("Failed to obtain new product_id after bulk insert.")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        for product, product_id in zip(products, ids):
+            product.product_id = product_id
+        self._search_created(ids)
+        for index in self._search_targets():
+            index.build((p.product_id, p.name, p.price, p.description, p.stockQuantity) for p in products)
+        return ids
+
     def createCustomer(self, customer: Customer) -> bool:
-        with self.conn.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO dbo.customers (name, email, [password])
-                OUTPUT INSERTED.customer_id
-                VALUES (?, ?, ?)
-                """,
-                customer.get_name(),
-                customer.get_email(),
-                customer.get_password(),
-            )
-            row = cur.fetchone()         # e.g., (42,)
-            if not row or row[0] is None:
-                self.conn.rollback()
-                raise RuntimeError("Failed to obtain new customer_id after insert.")
-            customer.set_customer_id(int(row[0]))
-        self.conn.commit()
+        with self.pool.connection() as conn:
+            with self._statement(conn, self._insert_customer_sql) as cur:
+                cur.execute(
+                    self._insert_customer_sql,
+                    customer.get_name(),
+                    customer.get_email(),
+                    customer.get_password(),
+                )
+                row = next(iter(cur.fetchall()), None)         # e.g., (42,)
+                if not row or row[0] is None:
+                    conn.rollback()
+                    raise RuntimeError("Failed to obtain new customer_id after insert.")
+                customer.set_customer_id(int(row[0]))
+            conn.commit()
+        self._wrote(customer.customer_id)
         return True
 
 
+    def createCustomers(self, customers: Iterable[Customer], chunkSize: int = 1000) -> BulkResult:
+        """
+        Registers many customers, `chunkSize` rows per transaction.
+
+        Rows with missing fields or an email repeated earlier in the input are
+        rejected in memory; emails already registered are found with one
+        `IN (...)` query per chunk; the rest are inserted in bulk (multi-row
+        MERGE ... OUTPUT on SQL Server) and every generated customer_id is set
+        on its Customer.
+        Failures are reported per row in the returned BulkResult (succeeded
+        holds the created Customers) and never abort the whole batch.
+        """
+        if chunkSize <= 0:
+            raise ValueError("chunkSize must be > 0")
+        result = BulkResult()
+        seen: set = set()
+        chunk: List[Tuple[int, Customer]] = []
+        for index, customer in enumerate(customers):
+            email = (customer.email or "").strip()
+            if not customer.name or not email or not customer.password:
+                result.failures.append(RowFailure(index, customer, "name, email and password are required"))
+                continue
+            key = email.casefold()      # emails compare case-insensitively in the default collation
+            if key in seen:
+                result.failures.append(RowFailure(index, customer, f"duplicate email in input: {email}"))
+                continue
+            seen.add(key)
+            chunk.append((index, customer))
+            if len(chunk) >= chunkSize:
+                self._insert_customer_chunk(chunk, result)
+                chunk = []
+        if chunk:
+            self._insert_customer_chunk(chunk, result)
+        result.failures.sort(key=lambda f: f.index)
+        return result
+
+    def _insert_customer_chunk(self, chunk: List[Tuple[int, Customer]], result: BulkResult) -> None:
+        with self.pool.connection() as conn:
+            with conn.cursor() as cur:
+                existing = set()
+                for part in chunks([c.email for _, c in chunk], MAX_PARAMS):
+                    cur.execute(
+                        f"SELECT email FROM dbo.customers WHERE email IN ({placeholders(len(part))})",
+                        *part,
+                    )
+                    existing.update(row[0].casefold() for row in cur.fetchall())
+                pending = []
+                for index, customer in chunk:
+                    if customer.email.casefold() in existing:
+                        result.failures.append(RowFailure(index, customer, f"email already registered: {customer.email}"))
+                    else:
+                        pending.append((index, customer))
+                if not pending:
+                    return
+
+                try:
+                    ids = self.dialect.insert_many_returning(
+                        cur, "dbo.customers", _CUSTOMER_COLUMNS, "customer_id",
+                        [(c.name, c.email, c.password) for _, c in pending],
+                    )
+                    for (_, customer), customer_id in zip(pending, ids):
+                        customer.customer_id = customer_id
+                    conn.commit()
+                except self.dialect.IntegrityError:
+                    # e.g. an email registered concurrently: isolate the bad rows one by one
+                    conn.rollback()
+                    for index, customer in pending:
+                        customer.customer_id = None
+                        try:
+                            self.createCustomer(customer)
+                        except self.dialect.IntegrityError as e:
+                            conn.rollback()
+                            result.failures.append(RowFailure(index, customer, f"rejected by database: {e}"))
+                        else:
+                            result.succeeded.append(customer)
+                    return
+        result.succeeded.extend(c for _, c in pending)
+        self._wrote(*(c.customer_id for _, c in pending))
+
     def deleteProduct(self, productId: int) -> bool:
-        
-        self._ensure_product_exists(productId)
-        with self.conn.cursor() as cur:
-            # clean cart rows referencing this product to avoid FK issues
-            cur.execute("DELETE FROM dbo.cart WHERE product_id = ?", productId)
-            
-            try:
-                cur.execute("DELETE FROM dbo.products WHERE product_id = ?", productId)
-            except pyodbc.IntegrityError:
-                # Likely referenced by order_items
-                self.conn.rollback()
-                raise
-        self.conn.commit()
+        with self.pool.connection() as conn:
+            self._precheck(conn, product_id=productId)
+            with conn.cursor() as cur:
+                # clean cart rows referencing this product to avoid FK issues
+                cur.execute("DELETE FROM dbo.cart WHERE product_id = ?", productId)
+
+                try:
+                    cur.execute("DELETE FROM dbo.products WHERE product_id = ?", productId)
+                except self.dialect.IntegrityError:
+                    # Likely referenced by order_items
+                    conn.rollback()
+                    raise
+                if cur.rowcount == 0:
+                    conn.rollback()
+                    raise ProductNotFoundException(productId)
+            conn.commit()
+        # only once the delete stands: a failed one must leave carts as they were
+        # (a line flushed meanwhile fails on the FK and is dropped by the store)
+        if self.carts is not None:
+            self.carts.drop_product(productId)
+        self.product_cache.invalidate([productId])
+        removed = self._search_removed
+        if removed is not None:
+            removed.add(productId)      # before the remove, so a running load cannot miss it
+        for index in self._search_targets():
+            index.remove(productId)
         return True
 
     def deleteCustomer(self, customerId: int) -> bool:
-        # ensure customer exists first
-        self._ensure_customer_exists(customerId)
-        with self.conn.cursor() as cur:
-            # remove from cart; orders may still reference the customer (FK prevents delete)
-            cur.execute("DELETE FROM dbo.cart WHERE customer_id = ?", customerId)
-            try:
-                cur.execute("DELETE FROM dbo.customers WHERE customer_id = ?", customerId)
-            except pyodbc.IntegrityError:
-                # Customer has orders; deletion not allowed due to FK in orders
-                self.conn.rollback()
-                raise
-        self.conn.commit()
+        self._wrote(customerId)
+        with self.pool.connection() as conn:
+            # ensure customer exists first (or detect it from the rowcount below)
+            self._precheck(conn, customer_id=customerId)
+            with conn.cursor() as cur:
+                # remove from cart; orders may still reference the customer (FK prevents delete)
+                cur.execute("DELETE FROM dbo.cart WHERE customer_id = ?", customerId)
+                try:
+                    cur.execute("DELETE FROM dbo.customers WHERE customer_id = ?", customerId)
+                except self.dialect.IntegrityError:
+                    # Customer has orders; deletion not allowed due to FK in orders
+                    conn.rollback()
+                    raise
+                if cur.rowcount == 0:
+                    conn.rollback()
+                    raise CustomerNotFoundException(customerId)
+            conn.commit()
+        if self.carts is not None:
+            self.carts.drop_customer(customerId)        # see deleteProduct
         return True
 
+    # ---------- search ----------
+
+    def searchProducts(
+        self,
+        query: str,
+        minPrice: Optional[float] = None,
+        maxPrice: Optional[float] = None,
+        inStock: bool = False,
+        page: int = 1,
+        pageSize: int = 20,
+    ) -> Tuple[List[Product], int]:
+        """
+        Full-text search over product name and description (see
+        dao.product_search): every word must match, the last one also as a
+        prefix; results are ranked, optionally filtered by price range and
+        stock, and paginated. Returns (products on this page, total matches).
+        """
+        if page < 1 or pageSize < 1:
+            raise ValueError("page and pageSize must be >= 1")
+        result = self._search_index().search(query, minPrice, maxPrice, inStock,
+                                             offset=(page - 1) * pageSize, limit=pageSize)
+        if not result.hits:
+            return [], result.total
+        with self._read_connection() as conn:
+            products = self._load_products(conn, result.product_ids, missing_ok=True)
+        return [products[pid] for pid in result.product_ids if pid in products], result.total
+
+    def refreshSearchIndex(self) -> int:
+        """
+        Rebuilds the search index from dbo.products into a new index and
+        swaps it in; searches keep using the old one until then. Picks up
+        catalog and stock changes made by other processes, which the index
+        does not see otherwise. Returns the number of products indexed.
+        """
+        from dao.product_search import ProductSearchIndex
+        with self._search_refresh_lock:
+            # products written during the load reach the new index too
+            index = self._search_rebuild = ProductSearchIndex()
+            try:
+                self._load_search_index(index)
+                self.search_index = index
+                self._search_built_at = time.monotonic()
+            finally:
+                self._search_rebuild = None
+        return len(index)
+
+    def _search_index(self) -> "ProductSearchIndex":
+        index = self.search_index
+        if index is not None and not self._search_lock.locked():
+            if (self.search_refresh_seconds > 0 and not self._search_refresh_lock.locked()
+                    and time.monotonic() - self._search_built_at > self.search_refresh_seconds):
+                self._search_built_at = time.monotonic()        # one rebuild per interval
+                threading.Thread(target=self._refresh_search_quietly, name="search-refresh", daemon=True).start()
+            return index
+        with self._search_lock:
+            if self.search_index is None:
+                from dao.product_search import ProductSearchIndex
+                with self._search_refresh_lock:
+                    # published before the load so products created meanwhile are added too
+                    index = self.search_index = ProductSearchIndex()
+                    try:
+                        self._load_search_index(index)
+                        self._search_built_at = time.monotonic()
+                    except Exception:
+                        self.search_index = None
+                        raise
+            return self.search_index
+
+    def _search_targets(self) -> List["ProductSearchIndex"]:
+        """
+        The indexes a catalog or stock change must reach: the live one and
+        a rebuild in progress.
+        """
+        return [index for index in (self.search_index, self._search_rebuild) if index is not None]
+
+    def _load_search_index(self, index: "ProductSearchIndex") -> None:
+        """
+        Fills `index` from dbo.products; caller holds _search_refresh_lock.
+        A product deleted while the rows stream in may have been read
+        before its delete committed and added after its remove(), so the
+        ids deleted meanwhile are removed again at the end.
+        """
+        removed = self._search_removed = set()
+        try:
+            # from the primary: a lagging replica could miss products for good
+            with self.pool.connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT product_id, name, price, [description], stockQuantity FROM dbo.products")
+                    while True:
+                        rows = cur.fetchmany(10000)
+                        if not rows:
+                            break
+                        index.build(rows)
+                conn.rollback()     # read-only
+            for product_id in list(removed):
+                index.remove(product_id)
+        finally:
+            self._search_removed = None
+
+    def _search_created(self, product_ids: Iterable[int]) -> None:
+        # a new product reusing a deleted id must not be removed by a running load
+        removed = self._search_removed
+        if removed is not None:
+            removed.difference_update(product_ids)
+
+    def _refresh_search_quietly(self) -> None:
+        try:
+            self.refreshSearchIndex()
+        except Exception as e:
+            # searches go on with the old index; the next interval tries again
+            logging.getLogger(__name__).warning("search index refresh failed: %s", e)
+
     # ---------- cart ----------
 
     def addToCart(self, customer: Customer, product: Product, quantity: int) -> bool:
+        """
+        Atomic upsert: a single statement (MERGE, or INSERT ... ON CONFLICT on
+        SQLite) inserts the cart row or adds to its quantity, so concurrent
+        adds of the same item cannot collide on UQ_cart_customer_product.
+        """
         if quantity <= 0:
             raise ValueError("quantity must be > 0")
 
         customer_id = customer.get_customer_id()
         product_id = product.get_product_id()
+        if self.carts is not None:
+            self.carts.add(customer_id, {product_id: quantity})
+            return True
 
-        self._ensure_customer_exists(customer_id)
-        self._ensure_product_exists(product_id)
-
-        with self.conn.cursor() as cur:
-            # upsert-like behavior: if exists, increase quantity; else insert
-            cur.execute(
-                "SELECT quantity FROM dbo.cart WHERE customer_id = ? AND product_id = ?",
-                customer_id,
-                product_id,
-            )
-            row = cur.fetchone()
-            if row is None:
-                cur.execute(
-                    "INSERT INTO dbo.cart (customer_id, product_id, quantity) VALUES (?, ?, ?)",
-                    customer_id,
-                    product_id,
-                    quantity,
-                )
-            else:
-                cur.execute(
-                    "UPDATE dbo.cart SET quantity = quantity + ? WHERE customer_id = ? AND product_id = ?",
-                    quantity,
-                    customer_id,
-                    product_id,
-                )
-        self.conn.commit()
+        self._wrote(customer_id)
+        with self.pool.connection() as conn:
+            self._precheck(conn, customer_id, product_id)
+
+            with self._statement(conn, self._add_to_cart_sql) as cur:
+                try:
+                    cur.execute(self._add_to_cart_sql, customer_id, product_id, quantity)
+                except self.dialect.IntegrityError as e:
+                    conn.rollback()
+                    raise (self._not_found_error(conn, e, customer_id, product_id) or e) from e
+            conn.commit()
+        return True
+
+    def addManyToCart(self, customer: Customer, items: List[Tuple[Product, int]]) -> bool:
+        """
+        Upserts a whole basket of (Product, quantity) in one statement (per
+        chunk of lines) and one commit. Repeated products are summed first.
+        """
+        customer_id = customer.get_customer_id()
+        quantities: Dict[int, int] = {}
+        for prod, qty in items:
+            if qty <= 0:
+                raise ValueError(f"Invalid quantity {qty} for product_id={prod.get_product_id()}")
+            pid = prod.get_product_id()
+            quantities[pid] = quantities.get(pid, 0) + qty
+        if not quantities:
+            return True
+        if self.carts is not None:
+            self.carts.add(customer_id, quantities)
+            return True
+
+        self._wrote(customer_id)
+        with self.pool.connection() as conn:
+            self._precheck(conn, customer_id)
+            if self.precheck_existence:
+                self._load_products(conn, list(quantities))
+
+            with conn.cursor() as cur:
+                try:
+                    for chunk in chunks(list(quantities.items()), MAX_PARAMS // 3):
+                        cur.execute(
+                            self._cart_upsert_sql(len(chunk)),
+                            *[v for pid, qty in chunk for v in (customer_id, pid, qty)],
+                        )
+                except self.dialect.IntegrityError as e:
+                    conn.rollback()
+                    err = self._not_found_error(conn, e, customer_id)
+                    if isinstance(err, ProductNotFoundException) or (
+                            err is None and self.dialect.is_foreign_key_violation(e)):
+                        # find out which product is missing (raises for the first one)
+                        self._load_products(conn, list(quantities))
+                    raise (err or e) from e
+            conn.commit()
         return True
 
+    def addToCarts(self, lines: Iterable[Tuple[int, int, int]], chunkSize: int = 1000) -> BulkResult:
+        """
+        Adds (customer_id, product_id, quantity) lines to many customers'
+        carts, `chunkSize` lines per transaction: one multi-row upsert (per
+        MAX_PARAMS) and one commit per chunk instead of one per cart.
+
+        Lines with a non-positive quantity are rejected in memory. A chunk
+        that hits an unknown customer or product is rolled back and added
+        again one cart at a time (addManyToCart), and a failing cart line by
+        line, so only the offending lines fail; the per-cart path is also
+        used with the in-memory cart store or precheck_existence on.
+        Failures are reported per line in the returned BulkResult (succeeded
+        holds the added lines) and never abort the whole batch.
+        """
+        if chunkSize <= 0:
+            raise ValueError("chunkSize must be > 0")
+        result = BulkResult()
+        chunk: List[Tuple[int, Tuple[int, int, int]]] = []
+        for index, line in enumerate(lines):
+            if line[2] <= 0:
+                result.failures.append(RowFailure(index, line, f"Invalid quantity {line[2]} for product_id={line[1]}"))
+                continue
+            chunk.append((index, line))
+            if len(chunk) >= chunkSize:
+                self._add_cart_chunk(chunk, result)
+                chunk = []
+        if chunk:
+            self._add_cart_chunk(chunk, result)
+        result.failures.sort(key=lambda f: f.index)
+        return result
+
+    def _add_cart_chunk(self, chunk: List[Tuple[int, Tuple[int, int, int]]], result: BulkResult) -> None:
+        if self.carts is None and not self.precheck_existence:
+            quantities: Dict[Tuple[int, int], int] = {}
+            for _, (customer_id, product_id, quantity) in chunk:
+                quantities[(customer_id, product_id)] = quantities.get((customer_id, product_id), 0) + quantity
+            self._wrote(*{customer_id for customer_id, _ in quantities})
+            with self.pool.connection() as conn:
+                try:
+                    with conn.cursor() as cur:
+                        # key order, so concurrent chunks lock cart rows in the same order
+                        for part in chunks(sorted(quantities.items()), MAX_PARAMS // 3):
+                            cur.execute(
+                                self._cart_upsert_sql(len(part)),
+                                *[v for (customer_id, pid), qty in part for v in (customer_id, pid, qty)],
+                            )
+                    conn.commit()
+                except self.dialect.IntegrityError:
+                    conn.rollback()     # unknown customer or product: isolate it below
+                else:
+                    result.succeeded.extend(line for _, line in chunk)
+                    return
+
+        carts: Dict[int, List[Tuple[int, Tuple[int, int, int]]]] = {}
+        for index, line in chunk:
+            carts.setdefault(line[0], []).append((index, line))
+        for customer_id, entries in carts.items():
+            attempts = [entries]
+            while attempts:
+                part = attempts.pop()
+                try:
+                    self.addManyToCart(Customer(customer_id=customer_id),
+                                       [(Product(product_id=pid), qty) for _, (_, pid, qty) in part])
+                except (CustomerNotFoundException, ProductNotFoundException, self.dialect.IntegrityError) as e:
+                    if len(part) > 1 and not isinstance(e, CustomerNotFoundException):
+                        attempts.extend([entry] for entry in reversed(part))
+                    else:
+                        result.failures.extend(RowFailure(index, line, str(e)) for index, line in part)
+                else:
+                    result.succeeded.extend(line for _, line in part)
+
     def removeFromCart(self, customer: Customer, product: Product) -> bool:
         customer_id = customer.get_customer_id()
         product_id = product.get_product_id()
+        if self.carts is not None:
+            return self.carts.remove(customer_id, product_id)
 
-        self._ensure_customer_exists(customer_id)
-        self._ensure_product_exists(product_id)
-
-        with self.conn.cursor() as cur:
-            cur.execute(
-                "DELETE FROM dbo.cart WHERE customer_id = ? AND product_id = ?",
-                customer_id,
-                product_id,
-            )
-            removed = cur.rowcount > 0
-        self.conn.commit()
+        self._wrote(customer_id)
+        with self.pool.connection() as conn:
+            self._precheck(conn, customer_id, product_id)
+
+            with self._statement(conn, _REMOVE_FROM_CART_SQL) as cur:
+                cur.execute(_REMOVE_FROM_CART_SQL, customer_id, product_id)
+                removed = cur.rowcount > 0
+            conn.commit()
+            if not removed and not self.precheck_existence:
+                # nothing deleted: tell a missing customer/product from a missing cart row
+                self._check_on_miss(conn, customer_id, product_id)
         return removed
 
     def getAllFromCart(self, customer: Customer) -> List[Tuple[Product, int]]:
         customer_id = customer.get_customer_id()
-        self._ensure_customer_exists(customer_id)
+        if self.carts is not None:
+            return self.carts.items(customer_id)
 
         items: List[Tuple[Product, int]] = []
-        with self.conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT p.product_id, p.name, p.price, p.[description], p.stockQuantity, c.quantity
-                FROM dbo.cart c
-                JOIN dbo.products p ON p.product_id = c.product_id
-                WHERE c.customer_id = ?
-                ORDER BY p.name
-                """,
-                customer_id,
-            )
-            for row in cur.fetchall():
-                prod = Product(
-                    product_id=int(row[0]),
-                    name=row[1],
-                    price=float(row[2]),
-                    description=row[3],
-                    stockQuantity=int(row[4]),
-                )
-                qty = int(row[5])
-                items.append((prod, qty))
+        with self._read_connection(customer_id) as conn:
+            self._precheck(conn, customer_id)
+            with self._statement(conn, _CART_SQL) as cur:
+                cur.execute(_CART_SQL, customer_id)
+                items = [(product_from_row(row), row[5]) for row in cur.fetchall()]
+            if not items and not self.precheck_existence:
+                self._check_on_miss(conn, customer_id)
         return items
 
     # ---------- orders ----------
@@ -217,129 +770,579 @@ class OrderProcessorRepositoryImpl(OrderProcessorRepository):
         customer: Customer,
         items: Optional[List[Tuple[Product, int]]],
         shippingAddress: str,
+        idempotencyKey: Optional[str] = None,
     ) -> bool:
         """
         If items is None, takes the current cart items for the customer.
-        Validates stock, creates an order, inserts order_items, decrements stock,
+        With an idempotencyKey, a retry of an order that was already placed
+        succeeds without placing it again (see placeOrderIdempotent).
+        Reserves stock, creates an order, inserts order_items,
         and clears the purchased items from the cart.
+
+        Round trips do not grow with the number of lines: one product load,
+        then one statement each for the stock reservation, the order, its
+        items and the cart clear. Raises InsufficientStockException (a
+        ValueError) carrying the per-product availability when stock is short.
+        With sales aggregates on (dao.sales_analytics), the same transaction
+        also updates them (three more statements).
+
+        With group commit on, the order is handed to the GroupCommitCoordinator
+        and committed together with concurrent ones (same result/exceptions).
         """
+        if idempotencyKey is not None:
+            self.placeOrderIdempotent(customer, items, shippingAddress, idempotencyKey)
+            return True
+        if self.group_commit is not None:
+            return self.group_commit.placeOrder(customer, items, shippingAddress)
         customer_id = customer.get_customer_id()
-        self._ensure_customer_exists(customer_id)
 
-        # Determine source items
-        if items is None:
-            cart_items = self.getAllFromCart(customer)
-            if not cart_items:
-                raise ValueError("Cart is empty; nothing to order.")
-            items = cart_items
+        self._wrote(customer_id)
+        with self.pool.connection() as conn:
+            # without pre-checks an unknown customer surfaces as FK_orders_customer
+            self._precheck(conn, customer_id)
 
-        # Build a snapshot {product_id: (Product, qty)} and validate products/qty
-        prod_map: Dict[int, Tuple[Product, int]] = {}
-        for prod, qty in items:
-            if qty <= 0:
-                raise ValueError(f"Invalid quantity {qty} for product_id={prod.get_product_id()}")
-            # Ensure product still exists & load latest stock/pricing
-            p = self._load_product(prod.get_product_id())
-            prod_map[p.get_product_id()] = (p, qty)
-
-        # Validate stock and compute total
-        total = 0.0
-        for p, qty in prod_map.values():
-            if p.get_stockQuantity() < qty:
-                raise ValueError(f"Insufficient stock for '{p.get_name()}': have {p.get_stockQuantity()}, need {qty}")
-            total += (p.get_price() or 0.0) * qty
-
-        # Transaction: create order, insert items, decrement stock, clear cart
-        try:
-            with self.conn.cursor() as cur:
-                # 1) create order
-                cur.execute(
-                    """
-                    INSERT INTO dbo.orders (customer_id, total_price, shipping_address)
-                    OUTPUT INSERTED.order_id
-                    VALUES (?, ?, ?)
-                    """,
-                    customer_id, total, shippingAddress,
-                )
-                row = cur.fetchone()
+            # Determine source items (nested call reuses this connection)
+            from_cart = items is None
+            if from_cart:
+                cart_items = self.getAllFromCart(customer)
+                if not cart_items:
+                    raise ValueError("Cart is empty; nothing to order.")
+                items = cart_items
+
+            # Sum quantities per product and validate them
+            quantities: Dict[int, int] = {}
+            for prod, qty in items:
+                if qty <= 0:
+                    raise ValueError(f"Invalid quantity {qty} for product_id={prod.get_product_id()}")
+                pid = prod.get_product_id()
+                quantities[pid] = quantities.get(pid, 0) + qty
+
+            # Cart rows were just joined against products; otherwise read pricing through the cache
+            if from_cart:
+                products = {prod.get_product_id(): prod for prod, _ in items}
+            else:
+                products = self._load_products(conn, list(quantities))
+
+            total = 0.0
+            for pid, qty in quantities.items():
+                total += (products[pid].get_price() or 0.0) * qty
+
+            lines = list(quantities.items())
+
+            # Transaction: reserve stock, create order, insert items, clear cart
+            try:
+                # 1) conditional decrement; stock is checked by the UPDATE itself
+                reservation = self.reservations.reserve(conn, lines)
+                if not reservation.reserved:
+                    raise InsufficientStockException(reservation, _shortage_message(reservation, products))
+
+                with self._statement(conn, self._insert_order_sql) as cur:
+                    # 2) create order
+                    cur.execute(self._insert_order_sql, customer_id, total, shippingAddress)
+                    row = next(iter(cur.fetchall()), None)
                 if not row or row[0] is None:
                     raise RuntimeError("Failed to obtain new order_id after insert.")
                 order_id = int(row[0])
 
+                with conn.cursor() as cur:
+                    for chunk in chunks(lines, MAX_PARAMS // 4):
+                        # 3) insert order_items (with the price paid) as one multi-row insert
+                        cur.execute(
+                            "INSERT INTO dbo.order_items (order_id, product_id, quantity, unit_price) VALUES "
+                            + placeholders(len(chunk), 4),
+                            *[v for pid, qty in chunk
+                              for v in (order_id, pid, qty, products[pid].get_price() or 0.0)],
+                        )
+
+                    if self.sales is not None:
+                        self.sales.record(cur, [(customer_id, [(pid, qty, products[pid].get_price() or 0.0)
+                                                               for pid, qty in lines])])
+
+                    for chunk in chunks(list(quantities), MAX_PARAMS - 1):
+                        # 4) clear purchased items from cart (for this customer)
+                        cur.execute(
+                            "DELETE FROM dbo.cart WHERE customer_id = ? AND product_id IN ("
+                            + placeholders(len(chunk)) + ")",
+                            customer_id,
+                            *chunk,
+                        )
+
+                conn.commit()
+                # cached stock for these products is now stale
+                self.product_cache.invalidate(quantities)
+                for index in self._search_targets():
+                    index.adjust_stock({pid: -qty for pid, qty in quantities.items()})
+                if self.carts is not None:
+                    self.carts.discard_lines(customer_id, quantities)
+                return True
+
+            except self.dialect.IntegrityError as e:
+                conn.rollback()
+                raise (self._not_found_error(conn, e, customer_id) or e) from e
+            except Exception:
+                conn.rollback()
+                raise
+
+    def placeOrderIdempotent(
+        self,
+        customer: Customer,
+        items: Optional[List[Tuple[Product, int]]],
+        shippingAddress: str,
+        idempotencyKey: str,
+    ) -> int:
+        """
+        placeOrder keyed by a client-chosen idempotencyKey (<= 64 chars),
+        stored in dbo.orders.request_key; returns the order_id. If this
+        customer already placed an order with the key, its order_id is
+        returned and nothing is placed again: from the in-memory key cache
+        without a round trip, else from the unique index. A key used by
+        another customer raises IdempotencyKeyConflictException. Keys are
+        honoured for idempotency_key_ttl seconds.
+        """
+        check_key(idempotencyKey)
+        customer_id = customer.get_customer_id()
+        placed = self.idempotency_keys.get(idempotencyKey)
+        if placed is not None:
+            return _replayed_order(idempotencyKey, customer_id, placed)
 
-                # 2) insert order_items + 3) decrement stock
-                for p, qty in prod_map.values():
+        if items is None:
+            # the first attempt emptied the cart, so look for the key first
+            with self.pool.connection() as conn:
+                placed = self._orders_by_request_key(conn, [idempotencyKey]).get(idempotencyKey)
+            if placed is not None:
+                self.idempotency_keys.put(idempotencyKey, *placed)
+                return _replayed_order(idempotencyKey, customer_id, placed)
+            items = self.getAllFromCart(customer)
+            if not items:
+                raise ValueError("Cart is empty; nothing to order.")
+
+        request = OrderRequest(customer_id,
+                               [(prod.get_product_id(), qty) for prod, qty in items],
+                               shippingAddress, request_key=idempotencyKey)
+        if self.group_commit is not None:
+            result = self.group_commit.place(request)
+        else:
+            result = self.placeOrders([request])[0]
+        if result.error is not None:
+            raise result.error
+        self.idempotency_keys.put(idempotencyKey, result.order_id, customer_id)
+        return result.order_id
+
+    def expireIdempotencyKeys(self, olderThanSeconds: Optional[float] = None) -> int:
+        """
+        Releases the keys of orders placed more than olderThanSeconds ago
+        (default idempotency_key_ttl) by setting request_key to NULL, so the
+        unique index only holds live keys. A retry with a released key
+        places a new order. Returns the number released.
+        """
+        age = self.idempotency_key_ttl if olderThanSeconds is None else olderThanSeconds
+        # order_date is stored in UTC
+        cutoff = (datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=age)).replace(
+            tzinfo=None, microsecond=0)
+        with self.pool.connection() as conn:
+            try:
+                with conn.cursor() as cur:
                     cur.execute(
-                        "INSERT INTO dbo.order_items (order_id, product_id, quantity) VALUES (?, ?, ?)",
-                        order_id,
-                        p.get_product_id(),
-                        qty,
+                        "UPDATE dbo.orders SET request_key = NULL "
+                        "WHERE request_key IS NOT NULL AND order_date < ?",
+                        cutoff,
                     )
+                    released = cur.rowcount
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return max(released, 0)
+
+    def placeOrders(self, requests: List[OrderRequest]) -> List[OrderResult]:
+        """
+        Places several orders with one combined stock reservation, one insert
+        per table and one commit, so orders sharing hot products decrement
+        each stock row once. Returns one OrderResult per request, in order.
+
+        A request whose request_key is already on dbo.orders for the same
+        customer is not placed again; it reports the existing order_id
+        (replayed=True). A key already used by another customer fails with
+        IdempotencyKeyConflictException. Requests for
+        unknown customers or products fail up front. If the combined
+        reservation comes up short, only the orders touching the short
+        products are split off and placed one by one (FIFO); the rest are
+        retried as a batch. Any other batch failure falls back to placing
+        every order on its own, so only the offending requests fail.
+        """
+        results = [OrderResult(req) for req in requests]
+        quantities: Dict[int, Dict[int, int]] = {}      # request index -> {product_id: qty}
+        first_by_key: Dict[str, int] = {}
+        duplicates: List[Tuple[int, int]] = []          # (index, index of the first request with its key)
+        for i, req in enumerate(requests):
+            if req.request_key is not None and req.request_key in first_by_key:
+                first = first_by_key[req.request_key]
+                if requests[first].customer_id != req.customer_id:
+                    results[i].error = IdempotencyKeyConflictException(req.request_key, req.customer_id)
+                else:
+                    duplicates.append((i, first))
+                continue
+            try:
+                quantities[i] = req.quantities()
+            except ValueError as e:
+                results[i].error = e
+                continue
+            if req.request_key is not None:
+                first_by_key[req.request_key] = i
+
+        with self.pool.connection() as conn:
+            if first_by_key:
+                for key, placed in self._orders_by_request_key(conn, list(first_by_key)).items():
+                    i = first_by_key[key]
+                    try:
+                        results[i].order_id = _replayed_order(key, requests[i].customer_id, placed)
+                        results[i].replayed = True
+                    except IdempotencyKeyConflictException as e:
+                        results[i].error = e
+                    quantities.pop(i, None)
+
+            products = self._load_products(conn, list({pid for q in quantities.values() for pid in q}),
+                                           missing_ok=True)
+            for i in list(quantities):
+                missing = next((pid for pid in quantities[i] if pid not in products), None)
+                if missing is not None:
+                    results[i].error = ProductNotFoundException(missing)
+                    del quantities[i]
+
+            pending = list(quantities)
+            if len(pending) > 1:
+                known = self._existing_customers(conn, {requests[i].customer_id for i in pending})
+                for i in pending:
+                    if requests[i].customer_id not in known:
+                        results[i].error = CustomerNotFoundException(requests[i].customer_id)
+                pending = [i for i in pending if results[i].error is None]
+
+            isolated: List[int] = []
+            while len(pending) > 1:
+                try:
+                    reservation = self._place_batch(conn, [(results[i], quantities[i]) for i in pending], products)
+                except Exception:
+                    break       # rolled back; place the orders one by one below
+                if reservation is None:
+                    pending = []
+                    break
+                short = {s.product_id for s in reservation.shortages}
+                if not short:
+                    break       # contention without a real shortage
+                isolated += [i for i in pending if short.intersection(quantities[i])]
+                pending = [i for i in pending if not short.intersection(quantities[i])]
+            for i in sorted(isolated + pending):
+                self._place_single(conn, results[i], quantities[i], products)
+
+        for i, j in duplicates:
+            results[i].order_id, results[i].error, results[i].replayed = results[j].order_id, results[j].error, True
+        return results
+
+    def _place_single(self, conn, result: OrderResult, quantities: Dict[int, int],
+                      products: Dict[int, Product]) -> None:
+        req = result.request
+        try:
+            shortage = self._place_batch(conn, [(result, quantities)], products)
+            if shortage is not None:
+                result.error = InsufficientStockException(shortage, _shortage_message(shortage, products))
+        except Exception as e:
+            if req.request_key is not None:
+                # a concurrent attempt may have committed the same key first
+                placed = self._orders_by_request_key(conn, [req.request_key]).get(req.request_key)
+                if placed is not None:
+                    try:
+                        result.order_id = _replayed_order(req.request_key, req.customer_id, placed)
+                        result.replayed = True
+                    except IdempotencyKeyConflictException as conflict:
+                        result.error = conflict
+                    return
+            if isinstance(e, self.dialect.IntegrityError):
+                e = self._not_found_error(conn, e, req.customer_id) or e
+            result.error = e
+
+    def _place_batch(self, conn, batch: List[Tuple[OrderResult, Dict[int, int]]],
+                     products: Dict[int, Product]) -> Optional[ReservationResult]:
+        """
+        One transaction for the whole batch: reserve the summed quantities,
+        insert the orders (with their request keys) and all order_items,
+        and clear the purchased lines from the customers' carts. Returns
+        None on success (order ids set on the results), or the failed
+        reservation when stock is short. Rolls back and re-raises on error.
+        """
+        self._wrote(*{r.request.customer_id for r, _ in batch})
+        totals: Dict[int, int] = {}
+        for _, q in batch:
+            for pid, qty in q.items():
+                totals[pid] = totals.get(pid, 0) + qty
+        reservation = self.reservations.reserve(conn, list(totals.items()))
+        if not reservation.reserved:
+            return reservation
+
+        try:
+            with conn.cursor() as cur:
+                order_ids = self.dialect.insert_many_returning(
+                    cur, "dbo.orders", _ORDER_COLUMNS, "order_id",
+                    [(r.request.customer_id,
+                      sum((products[pid].price or 0.0) * qty for pid, qty in q.items()),
+                      r.request.shipping_address,
+                      r.request.request_key)
+                     for r, q in batch],
+                )
+                lines = [(order_id, pid, qty, products[pid].price or 0.0)
+                         for order_id, (_, q) in zip(order_ids, batch) for pid, qty in q.items()]
+                for chunk in chunks(lines, MAX_PARAMS // 4):
                     cur.execute(
-                        "UPDATE dbo.products SET stockQuantity = stockQuantity - ? WHERE product_id = ?",
-                        qty,
-                        p.get_product_id(),
+                        "INSERT INTO dbo.order_items (order_id, product_id, quantity, unit_price) VALUES "
+                        + placeholders(len(chunk), 4),
+                        *[v for line in chunk for v in line],
                     )
-
-                # 4) clear purchased items from cart (for this customer)
-                for pid in prod_map.keys():
+                if self.sales is not None:
+                    self.sales.record(cur, [(r.request.customer_id,
+                                             [(pid, qty, products[pid].price or 0.0) for pid, qty in q.items()])
+                                            for r, q in batch])
+                cart_lines = [(r.request.customer_id, pid) for r, q in batch for pid in q]
+                for chunk in chunks(cart_lines, MAX_PARAMS // 2):
                     cur.execute(
-                        "DELETE FROM dbo.cart WHERE customer_id = ? AND product_id = ?",
-                        customer_id,
-                        pid,
+                        "DELETE FROM dbo.cart WHERE EXISTS (SELECT 1 FROM "
+                        + self.dialect.values_table(len(chunk), ("customer_id", "product_id"), "v")
+                        + " WHERE v.customer_id = dbo.cart.customer_id AND v.product_id = dbo.cart.product_id)",
+                        *[v for line in chunk for v in line],
                     )
-
-            self.conn.commit()
-            return True
-
+            conn.commit()
         except Exception:
-            self.conn.rollback()
+            conn.rollback()
             raise
+        for (result, _), order_id in zip(batch, order_ids):
+            result.order_id = int(order_id)
+        # cached stock for these products is now stale
+        self.product_cache.invalidate(totals)
+        for index in self._search_targets():
+            index.adjust_stock({pid: -qty for pid, qty in totals.items()})
+        if self.carts is not None:
+            for result, q in batch:
+                self.carts.discard_lines(result.request.customer_id, q)
+        return None
+
+    def _existing_customers(self, conn, customer_ids: Iterable[int]) -> set:
+        ids = list(customer_ids)
+        found = set()
+        with conn.cursor() as cur:
+            for chunk in chunks(ids, MAX_PARAMS):
+                cur.execute(
+                    f"SELECT customer_id FROM dbo.customers WHERE customer_id IN ({placeholders(len(chunk))})",
+                    *chunk,
+                )
+                found.update(int(row[0]) for row in cur.fetchall())
+        conn.rollback()     # read-only
+        return found
+
+    def _orders_by_request_key(self, conn, keys: List[str]) -> Dict[str, Tuple[int, int]]:
+        """
+        request_key -> (order_id, customer_id) of the orders holding the keys.
+        """
+        found: Dict[str, Tuple[int, int]] = {}
+        with conn.cursor() as cur:
+            for chunk in chunks(keys, MAX_PARAMS):
+                cur.execute(
+                    "SELECT request_key, order_id, customer_id FROM dbo.orders "
+                    f"WHERE request_key IN ({placeholders(len(chunk))})",
+                    *chunk,
+                )
+                for key, order_id, customer_id in cur.fetchall():
+                    found[key] = (int(order_id), int(customer_id))
+        conn.rollback()     # read-only; don't hold locks into the next transaction
+        return found
 
     def getOrdersByCustomer(self, customerId: int) -> List[Dict[str, Any]]:
         """
         Returns a list of dicts:
-          { 'order_id': int, 'order_date': datetime, 'product': Product, 'quantity': int }
+          { 'order_id': int, 'order_date': datetime, 'product': Product, 'quantity': int,
+            'unit_price': float }
         for all orders belonging to the given customer.
+        Prefer iterOrdersByCustomer / getOrdersByCustomerPage for long histories.
+        """
+        return list(self.iterOrdersByCustomer(customerId))
+
+    def iterOrdersByCustomer(self, customerId: int, arraysize: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Generator over the same rows as getOrdersByCustomer, fetched
+        `arraysize` rows at a time so memory stays flat for large histories.
+
+        The generator holds its own pooled connection until it is exhausted or
+        closed; other repository calls made while iterating use another one.
+        """
+        if self.replicas is not None:
+            conn, release = self.replicas.acquire(customerId), self.replicas.release
+        else:
+            conn, release = self.pool.acquire(), self.pool.release
+        try:
+            self._precheck(conn, customerId)
+            cur = conn.cursor()
+            try:
+                cur.arraysize = arraysize
+                cur.execute(_ORDER_LINES_SQL.format(orders="dbo.orders"), customerId)
+                seen = False
+                while True:
+                    rows = cur.fetchmany(arraysize)
+                    if not rows:
+                        break
+                    seen = True
+                    for r in rows:
+                        yield _order_line(r)
+            finally:
+                cur.close()
+            if not seen and not self.precheck_existence:
+                self._check_on_miss(conn, customerId)
+        finally:
+            release(conn)
+
+    def getOrdersByCustomerPage(
+        self,
+        customerId: int,
+        pageSize: int = 20,
+        after: Optional[Tuple[Any, int]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[Any, int]]]:
+        """
+        Keyset pagination over (order_date, order_id), newest first, served by
+        IX_orders_customer_date. A page holds `pageSize` whole orders (all of
+        their lines). Returns (rows, next_cursor); pass next_cursor back as
+        `after` to get the following page. next_cursor is None on the last page.
         """
-        self._ensure_customer_exists(customerId)
-
-        results: List[Dict[str, Any]] = []
-        with self.conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT 
-                    o.order_id, o.order_date,
-                    p.product_id, p.name, p.price, p.[description], p.stockQuantity,
-                    oi.quantity
-                FROM dbo.orders o
-                JOIN dbo.order_items oi ON oi.order_id = o.order_id
-                JOIN dbo.products p ON p.product_id = oi.product_id
-                WHERE o.customer_id = ?
-                ORDER BY o.order_date DESC, o.order_id DESC
-                """,
-                customerId,
-            )
-            rows = cur.fetchall()
-
-        if not rows:
-            # No orders found for a valid customer is not an error per se; return empty list.
-            return results
+        orders, params = _orders_page(self.dialect, customerId, pageSize, after)
 
+        with self._read_connection(customerId) as conn:
+            self._precheck(conn, customerId)
+            with conn.cursor() as cur:
+                cur.execute(_ORDER_LINES_SQL.format(orders=orders), *params, customerId)
+                rows = [_order_line(r) for r in cur.fetchall()]
+            if not rows and after is None and not self.precheck_existence:
+                self._check_on_miss(conn, customerId)
+
+        order_ids = []
         for r in rows:
-            prod = Product(
-                product_id=int(r[2]),
-                name=r[3],
-                price=float(r[4]),
-                description=r[5],
-                stockQuantity=int(r[6]),
-            )
-            results.append(
-                {
-                    "order_id": int(r[0]),
-                    "order_date": r[1],
-                    "product": prod,
-                    "quantity": int(r[7]),
-                }
-            )
-        return results
+            if not order_ids or order_ids[-1] != r["order_id"]:
+                order_ids.append(r["order_id"])
+        next_cursor = None
+        if len(order_ids) == pageSize:
+            last = rows[-1]
+            next_cursor = (last["order_date"], last["order_id"])
+        return rows, next_cursor
+
+    def getOrdersWithItemsByCustomer(
+        self,
+        customerId: int,
+        pageSize: int = 20,
+        after: Optional[Tuple[Any, int]] = None,
+    ) -> Tuple[List[Order], Optional[Tuple[Any, int]]]:
+        """
+        Returns (orders, next_cursor): a keyset page of Order entities, newest
+        first, each holding its OrderItems. Totals are the stored
+        orders.total_price and line prices the unit_price captured at
+        checkout, so nothing is re-sorted or re-aggregated by the caller.
+        """
+        orders_sql, params = _orders_page(self.dialect, customerId, pageSize, after)
+
+        orders: List[Order] = []
+        with self._read_connection(customerId) as conn:
+            self._precheck(conn, customerId)
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    SELECT
+                        o.order_id, o.order_date, o.total_price, o.shipping_address,
+                        oi.order_item_id, oi.order_id, oi.product_id, oi.quantity, oi.unit_price,
+                        p.product_id, p.name, p.price, p.[description], p.stockQuantity
+                    FROM {orders_sql} o
+                    JOIN dbo.order_items oi ON oi.order_id = o.order_id
+                    JOIN dbo.products p ON p.product_id = oi.product_id
+                    WHERE o.customer_id = ?
+                    ORDER BY o.order_date DESC, o.order_id DESC, oi.order_item_id
+                    """,
+                    *params, customerId,
+                )
+                # single pass: rows of one order are consecutive
+                order: Optional[Order] = None
+                for r in cur.fetchall():
+                    if order is None or order.order_id != r[0]:
+                        order = Order(r[0], customerId, r[1], float(r[2]), r[3])
+                        orders.append(order)
+                    item = order_item_from_row(r, 4)
+                    item.product = product_from_row(r, 9)
+                    order.items.append(item)
+            if not orders and after is None and not self.precheck_existence:
+                self._check_on_miss(conn, customerId)
+
+        next_cursor = None
+        if len(orders) == pageSize:
+            next_cursor = (orders[-1].order_date, orders[-1].order_id)
+        return orders, next_cursor
+
+
+def _orders_page(dialect: Dialect, customerId: int, pageSize: int,
+                 after: Optional[Tuple[Any, int]]) -> Tuple[str, List[Any]]:
+    """
+    Derived table selecting one keyset page of a customer's orders, plus its
+    parameters. Seeks IX_orders_customer_date past the `after` cursor.
+    """
+    if pageSize <= 0:
+        raise ValueError("pageSize must be > 0")
+    if after is None:
+        keyset, params = "", [customerId]
+    else:
+        keyset = "AND (order_date < ? OR (order_date = ? AND order_id < ?))"
+        params = [customerId, after[0], after[0], after[1]]
+    sql, params = dialect.select_top(
+        pageSize,
+        "order_id, customer_id, order_date, total_price, shipping_address",
+        f"""
+                    FROM dbo.orders
+                    WHERE customer_id = ? {keyset}
+                    ORDER BY order_date DESC, order_id DESC""",
+        params,
+    )
+    return f"({sql})", params
+
+
+# Order lines of one customer, newest order first; {orders} is the table or a
+# derived table limiting which orders are included.
+_ORDER_LINES_SQL = """
+    SELECT
+        o.order_id, o.order_date,
+        p.product_id, p.name, p.price, p.[description], p.stockQuantity,
+        oi.quantity, oi.unit_price
+    FROM {orders} o
+    JOIN dbo.order_items oi ON oi.order_id = o.order_id
+    JOIN dbo.products p ON p.product_id = oi.product_id
+    WHERE o.customer_id = ?
+    ORDER BY o.order_date DESC, o.order_id DESC
+    """
+
+
+def _order_line(r) -> Dict[str, Any]:
+    return {
+        "order_id": r[0],
+        "order_date": r[1],
+        "product": product_from_row(r, 2),
+        "quantity": r[7],
+        "unit_price": float(r[8]),
+    }
+
+
+def _replayed_order(key: str, customer_id: int, placed: Tuple[int, int]) -> int:
+    """
+    order_id of an order found under `key`, if it belongs to `customer_id`.
+    """
+    order_id, owner = placed
+    if owner != customer_id:
+        raise IdempotencyKeyConflictException(key, customer_id)
+    return order_id
+
+
+def _shortage_message(reservation, products: Dict[int, Product]) -> str:
+    if not reservation.shortages:
+        return "Stock is under heavy contention; please retry the order."
+    return "; ".join(
+        f"Insufficient stock for '{products[s.product_id].get_name()}': have {s.available}, need {s.requested}"
+        for s in reservation.shortages
+    )
+
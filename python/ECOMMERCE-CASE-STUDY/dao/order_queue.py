@@ -0,0 +1,285 @@
+# dao/order_queue.py
+"""
+Durable order-intake queue for asynchronous checkout.
+
+EcomApp enqueues a cart snapshot and gets a ticket back at once; worker
+processes (dao.checkout_worker) claim queued orders, place them with
+placeOrders() and record the outcome, which the app polls by ticket.
+
+The queue is a local SQLite file (WAL, synchronous=FULL: an enqueue that
+returned survives a power cut) shared by the app and the workers. Claims
+are leases: an order whose worker died goes back to the queue when its
+lease expires. The ticket is stored as dbo.orders.request_key, so an order
+that was committed just before the crash is replayed, not placed twice.
+The cart itself is only cleared when the order is placed, so a cart
+checkout (enqueue_cart) hands back the customer's pending ticket instead
+of queueing the same cart a second time.
+
+    ticket states: queued -> processing -> done | failed
+                            (lease expired / released -> queued again)
+"""
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from dao.order_request import OrderRequest
+
+QUEUED = "queued"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkout_queue (
+    seq               INTEGER PRIMARY KEY AUTOINCREMENT,   -- FIFO order
+    ticket            TEXT    NOT NULL UNIQUE,
+    customer_id       INTEGER NOT NULL,
+    lines             TEXT    NOT NULL,                    -- JSON [[product_id, quantity], ...]
+    shipping_address  TEXT    NOT NULL,
+    status            TEXT    NOT NULL DEFAULT 'queued',
+    attempts          INTEGER NOT NULL DEFAULT 0,
+    worker            TEXT    NULL,
+    lease_expires     REAL    NULL,
+    order_id          INTEGER NULL,
+    error             TEXT    NULL,
+    created_at        REAL    NOT NULL,
+    updated_at        REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS IX_checkout_queue_status ON checkout_queue(status, seq);
+CREATE INDEX IF NOT EXISTS IX_checkout_queue_customer ON checkout_queue(customer_id, status);
+"""
+
+
+class QueuedOrder:
+    """
+    A claimed queue entry.
+    """
+    __slots__ = ("ticket", "seq", "customer_id", "lines", "shipping_address", "attempts")
+
+    def __init__(self, ticket: str, seq: int, customer_id: int, lines: List[Tuple[int, int]],
+                 shipping_address: str, attempts: int):
+        self.ticket = ticket
+        self.seq = seq
+        self.customer_id = customer_id
+        self.lines = lines
+        self.shipping_address = shipping_address
+        self.attempts = attempts
+
+    def to_request(self) -> OrderRequest:
+        return OrderRequest(self.customer_id, self.lines, self.shipping_address, request_key=self.ticket)
+
+    def __repr__(self) -> str:
+        return f"QueuedOrder(ticket={self.ticket}, customer_id={self.customer_id}, lines={len(self.lines)})"
+
+
+class TicketStatus:
+    __slots__ = ("ticket", "status", "order_id", "error", "attempts", "created_at", "updated_at")
+
+    def __init__(self, ticket: str, status: str, order_id: Optional[int], error: Optional[str],
+                 attempts: int, created_at: float, updated_at: float):
+        self.ticket = ticket
+        self.status = status
+        self.order_id = order_id
+        self.error = error
+        self.attempts = attempts
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    def __repr__(self) -> str:
+        return f"TicketStatus(ticket={self.ticket}, status={self.status}, order_id={self.order_id})"
+
+
+class OrderQueue:
+    """
+    Safe to share between threads of one process (one connection behind a
+    lock) and between processes (each opens the file itself).
+    """
+
+    def __init__(self, path: str, max_attempts: int = 5, busy_timeout: float = 30.0):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # autocommit; multi-statement updates use explicit BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = wal")
+        self._conn.execute("PRAGMA synchronous = full")
+        self._conn.executescript(_SCHEMA)
+
+    @classmethod
+    def from_properties(cls, props: Dict[str, str]) -> Optional["OrderQueue"]:
+        """
+        The queue named by `checkout_queue`, or None when checkout is synchronous.
+        """
+        path = props.get("checkout_queue", "").strip()
+        if not path:
+            return None
+        return cls(path, max_attempts=int(props.get("checkout_max_attempts", "5")))
+
+    # ---------- producer side ----------
+
+    def enqueue(self, customer_id: int, lines: Sequence[Tuple[int, int]], shipping_address: str) -> str:
+        """
+        Stores the order and returns its ticket. Raises ValueError for an
+        order that could never be placed (no lines, bad quantity).
+        """
+        OrderRequest(customer_id, lines, shipping_address).quantities()
+        with self._lock:
+            return self._insert(customer_id, lines, shipping_address)
+
+    def enqueue_cart(self, customer_id: int, lines: Sequence[Tuple[int, int]],
+                     shipping_address: str) -> Tuple[str, bool]:
+        """
+        enqueue() for a checkout of the customer's cart: (ticket, True) for a
+        new entry, or (ticket, False) for the customer's order that is still
+        queued or processing - its cart rows stay until that order is placed,
+        so a second checkout would order the same cart twice.
+        """
+        OrderRequest(customer_id, lines, shipping_address).quantities()
+        with self._lock, self._transaction():
+            row = self._conn.execute(
+                "SELECT ticket FROM checkout_queue WHERE customer_id = ? AND status IN (?, ?) ORDER BY seq LIMIT 1",
+                (customer_id, QUEUED, PROCESSING),
+            ).fetchone()
+            if row is not None:
+                return row[0], False
+            return self._insert(customer_id, lines, shipping_address), True
+
+    def status(self, ticket: str) -> Optional[TicketStatus]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT ticket, status, order_id, error, attempts, created_at, updated_at "
+                "FROM checkout_queue WHERE ticket = ?",
+                (ticket,),
+            ).fetchone()
+        return TicketStatus(*row) if row else None
+
+    # ---------- worker side ----------
+
+    def claim(self, worker: str, limit: int, lease_seconds: float) -> List[QueuedOrder]:
+        """
+        Leases up to `limit` orders, oldest first: queued ones and ones whose
+        previous lease expired. Entries that already used max_attempts are
+        failed instead of being handed out again.
+        """
+        now = time.time()
+        with self._lock, self._transaction():
+            self._conn.execute(
+                "UPDATE checkout_queue SET status = ?, error = COALESCE(error, ?), worker = NULL, "
+                "lease_expires = NULL, updated_at = ? "
+                "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                (FAILED, f"gave up after {self.max_attempts} attempts", now, PROCESSING, now, self.max_attempts),
+            )
+            rows = self._conn.execute(
+                "SELECT seq, ticket, customer_id, lines, shipping_address, attempts FROM checkout_queue "
+                "WHERE status = ? OR (status = ? AND lease_expires < ?) ORDER BY seq LIMIT ?",
+                (QUEUED, PROCESSING, now, limit),
+            ).fetchall()
+            if rows:
+                self._conn.executemany(
+                    "UPDATE checkout_queue SET status = ?, worker = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE seq = ?",
+                    [(PROCESSING, worker, now + lease_seconds, now, row[0]) for row in rows],
+                )
+        return [
+            QueuedOrder(ticket, seq, customer_id, [tuple(line) for line in json.loads(lines)], address, attempts + 1)
+            for seq, ticket, customer_id, lines, address, attempts in rows
+        ]
+
+    def complete(self, placed: Sequence[Tuple[str, int]]) -> None:
+        """
+        Marks (ticket, order_id) pairs done. Not tied to the lease holder:
+        a replayed ticket reports the same order_id.
+        """
+        self._finish(DONE, [(order_id, None, ticket) for ticket, order_id in placed])
+
+    def fail(self, failures: Sequence[Tuple[str, str]]) -> None:
+        """
+        Marks (ticket, error message) pairs permanently failed.
+        """
+        self._finish(FAILED, [(None, error, ticket) for ticket, error in failures])
+
+    def release(self, worker: str, tickets: Sequence[str], error: str) -> None:
+        """
+        Hands orders back after a transient error (lock timeout, lost
+        connection); they are retried until max_attempts.
+        """
+        now = time.time()
+        with self._lock, self._transaction():
+            self._conn.executemany(
+                "UPDATE checkout_queue SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "error = ?, worker = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE ticket = ? AND worker = ? AND status = ?",
+                [(self.max_attempts, FAILED, QUEUED, error, now, ticket, worker, PROCESSING) for ticket in tickets],
+            )
+
+    def _finish(self, status: str, rows: List[Tuple[Optional[int], Optional[str], str]]) -> None:
+        if not rows:
+            return
+        now = time.time()
+        with self._lock, self._transaction():
+            self._conn.executemany(
+                "UPDATE checkout_queue SET status = ?, order_id = ?, error = ?, worker = NULL, "
+                "lease_expires = NULL, updated_at = ? WHERE ticket = ? AND status <> ?",
+                [(status, order_id, error, now, ticket, DONE) for order_id, error, ticket in rows],
+            )
+
+    # ---------- housekeeping ----------
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM checkout_queue GROUP BY status").fetchall()
+        counts = {QUEUED: 0, PROCESSING: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def purge(self, older_than_seconds: float) -> int:
+        """
+        Deletes done/failed entries last updated more than older_than_seconds
+        ago; returns how many.
+        """
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM checkout_queue WHERE status IN (?, ?) AND updated_at < ?",
+                (DONE, FAILED, time.time() - older_than_seconds),
+            )
+        return cur.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _transaction(self) -> "_Transaction":
+        return _Transaction(self._conn)
+
+    def _insert(self, customer_id: int, lines: Sequence[Tuple[int, int]], shipping_address: str) -> str:
+        # caller holds the lock
+        ticket = uuid.uuid4().hex
+        now = time.time()
+        self._conn.execute(
+            "INSERT INTO checkout_queue (ticket, customer_id, lines, shipping_address, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (ticket, customer_id, json.dumps([[int(p), int(q)] for p, q in lines]), shipping_address, now, now),
+        )
+        return ticket
+
+
+class _Transaction:
+    """
+    BEGIN IMMEDIATE ... COMMIT (ROLLBACK on error) on an autocommit connection.
+    """
+    __slots__ = ("_conn",)
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self._conn.execute("BEGIN IMMEDIATE")
+        return self._conn
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> bool:
+        self._conn.execute("ROLLBACK" if exc_type is not None else "COMMIT")
+        return False
@@ -0,0 +1,77 @@
+# dao/order_request.py
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class OrderRequest:
+    """
+    One order for OrderProcessorRepositoryImpl.placeOrders().
+
+    lines       - (product_id, quantity) pairs; repeated products are summed
+    request_key - optional unique key stored on dbo.orders.request_key; a
+                  request whose key is already there is not placed again
+                  and reports the existing order_id (replay after a crash)
+    """
+
+    __slots__ = ("customer_id", "lines", "shipping_address", "request_key")
+
+    def __init__(self,
+                 customer_id: int,
+                 lines: Sequence[Tuple[int, int]],
+                 shipping_address: str,
+                 request_key: Optional[str] = None):
+        self.customer_id = customer_id
+        self.lines = list(lines)
+        self.shipping_address = shipping_address
+        self.request_key = request_key
+
+    def quantities(self) -> Dict[int, int]:
+        """
+        Quantity per product; raises ValueError for an empty order or a
+        non-positive quantity.
+        """
+        if not self.lines:
+            raise ValueError("Order has no items.")
+        result: Dict[int, int] = {}
+        for pid, qty in self.lines:
+            if qty <= 0:
+                raise ValueError(f"Invalid quantity {qty} for product_id={pid}")
+            result[pid] = result.get(pid, 0) + qty
+        return result
+
+    def __repr__(self) -> str:
+        return (f"OrderRequest(customer_id={self.customer_id}, lines={len(self.lines)}, "
+                f"request_key={self.request_key!r})")
+
+
+class OrderResult:
+    """
+    Outcome of one OrderRequest: order_id on success, else the exception
+    that the single-order path would have raised (InsufficientStockException,
+    CustomerNotFoundException, ...). replayed is True when the order already
+    existed under the request's key.
+    """
+
+    __slots__ = ("request", "order_id", "error", "replayed")
+
+    def __init__(self, request: OrderRequest, order_id: Optional[int] = None,
+                 error: Optional[Exception] = None, replayed: bool = False):
+        self.request = request
+        self.order_id = order_id
+        self.error = error
+        self.replayed = replayed
+
+    @property
+    def ok(self) -> bool:
+        return self.order_id is not None
+
+    def __repr__(self) -> str:
+        return f"OrderResult(order_id={self.order_id}, error={self.error!r}, replayed={self.replayed})"
+
+
+def summarize(results: List[OrderResult]) -> Dict[str, int]:
+    """
+    Counts of placed / replayed / failed results.
+    """
+    placed = sum(1 for r in results if r.ok and not r.replayed)
+    replayed = sum(1 for r in results if r.replayed)
+    return {"placed": placed, "replayed": replayed, "failed": len(results) - placed - replayed}
@@ -0,0 +1,108 @@
+# dao/product_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from entity.product import Product
+
+
+class ProductCache:
+    """
+    In-process, size-bounded LRU cache of catalog rows with a per-entry TTL.
+
+    Entries are stored as plain tuples and a fresh Product is built on every
+    hit, so callers can never mutate what is cached. The cached stockQuantity
+    is informational only: stock is always enforced by the conditional
+    decrement in placeOrder, never by this cache.
+
+    max_size = 0 disables caching (every lookup is a miss).
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # product_id -> (expires_at, (product_id, name, price, description, stockQuantity))
+        self._entries: "OrderedDict[int, Tuple[float, tuple]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_properties(cls, props: Dict[str, str]) -> "ProductCache":
+        size = props.get("product_cache_size")
+        ttl = props.get("product_cache_ttl")
+        return cls(
+            max_size=int(size) if size else 10000,
+            ttl=float(ttl) if ttl else 60.0,
+        )
+
+    def get(self, product_id: int) -> Optional[Product]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(product_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] <= now:
+                del self._entries[product_id]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(product_id)
+            self.hits += 1
+            row = entry[1]
+        return Product(*row)
+
+    def get_many(self, product_ids: Iterable[int]) -> Tuple[Dict[int, Product], List[int]]:
+        """
+        Returns ({product_id: Product} for hits, [product_id] for misses).
+        """
+        found: Dict[int, Product] = {}
+        missing: List[int] = []
+        for pid in product_ids:
+            prod = self.get(pid)
+            if prod is None:
+                missing.append(pid)
+            else:
+                found[pid] = prod
+        return found, missing
+
+    def put(self, product: Product, ttl: Optional[float] = None) -> None:
+        if self.max_size <= 0:
+            return
+        pid = product.product_id
+        row = (pid, product.name, product.price, product.description, product.stockQuantity)
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[pid] = (expires_at, row)
+            self._entries.move_to_end(pid)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, product_ids: Iterable[int]) -> None:
+        with self._lock:
+            for pid in product_ids:
+                if self._entries.pop(pid, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
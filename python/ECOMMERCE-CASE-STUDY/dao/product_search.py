@@ -0,0 +1,304 @@
+# dao/product_search.py
+"""
+In-memory full-text search over the catalog (name and description).
+
+ProductSearchIndex is an inverted index: every case-folded word maps to
+the sorted list of documents containing it, kept separately for names and
+descriptions so name matches rank higher. Queries are AND across words;
+the last word also matches as a prefix (search-as-you-type). Candidates
+come from the rarest word, the other words are checked by binary search
+in their posting lists, so selective queries touch only a few postings
+however large the catalog is.
+
+Documents live in parallel arrays indexed by a slot number (appended in
+insertion order, so posting lists stay sorted without re-sorting). A
+deleted or replaced product only clears its slot's `alive` flag;
+compact() rebuilds the index without dead slots.
+
+OrderProcessorRepositoryImpl builds it from dbo.products on the first
+searchProducts() call and keeps it current on createProduct(s),
+deleteProduct and placeOrder (stock for the in-stock filter).
+
+Limitation: those hooks only see this process's writes. Products imported
+or deleted by another process (main.import_catalog, main.batch, a second
+app) and stock sold by checkout workers stay invisible until the index is
+rebuilt: refreshSearchIndex() loads a new index and swaps it in, and with
+`search_refresh_seconds` > 0 searchProducts() starts that rebuild in the
+background once the index is older than that. Searches keep answering
+from the old index during a rebuild; writes made meanwhile reach both,
+and products deleted while the table was being read are removed from the
+new index before it is swapped in.
+"""
+import bisect
+import heapq
+import math
+import re
+import sys
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+_WORD = re.compile(r"\w+")
+
+# score multiplier for a word found in the product name
+NAME_WEIGHT = 3.0
+# a prefix expands to at most this many indexed words (the most common ones)
+MAX_PREFIX_EXPANSIONS = 64
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _WORD.findall(text.casefold()) if text else []
+
+
+class SearchResult:
+    """
+    One page of hits: (product_id, score) best first, and the total number
+    of matching products before pagination.
+    """
+    __slots__ = ("hits", "total")
+
+    def __init__(self, hits: List[Tuple[int, float]], total: int):
+        self.hits = hits
+        self.total = total
+
+    @property
+    def product_ids(self) -> List[int]:
+        return [pid for pid, _ in self.hits]
+
+    def __repr__(self) -> str:
+        return f"SearchResult(total={self.total}, hits={self.hits[:5]}{'...' if len(self.hits) > 5 else ''})"
+
+
+class ProductSearchIndex:
+    """
+    Thread-safe; writes and queries take one lock (queries are short).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slot_of: Dict[int, int] = {}          # product_id -> live slot
+        self._pid = array("q")
+        self._price = array("d")
+        self._stock = array("q")
+        self._alive = bytearray()
+        self._name: Dict[str, array] = {}           # word -> sorted slots (word in name)
+        self._desc: Dict[str, array] = {}           # word -> sorted slots (word only in description)
+        self._sorted_words: Optional[List[str]] = None
+
+    # ---------- maintenance ----------
+
+    def build(self, rows: Iterable[Sequence]) -> int:
+        """
+        Adds (product_id, name, price, description, stockQuantity) rows;
+        returns how many were added.
+        """
+        n = 0
+        with self._lock:
+            for row in rows:
+                self._add(*row[:5])
+                n += 1
+        return n
+
+    def add(self, product_id: int, name: Optional[str], price: Optional[float],
+            description: Optional[str], stock: Optional[int]) -> None:
+        """
+        Indexes a product, replacing an earlier version with the same id.
+        """
+        with self._lock:
+            self._add(product_id, name, price, description, stock)
+
+    def remove(self, product_id: int) -> bool:
+        with self._lock:
+            slot = self._slot_of.pop(product_id, None)
+            if slot is None:
+                return False
+            self._alive[slot] = 0
+            return True
+
+    def adjust_stock(self, deltas: Dict[int, int]) -> None:
+        """
+        Applies stock changes (e.g. {product_id: -quantity} after an order).
+        """
+        with self._lock:
+            for pid, delta in deltas.items():
+                slot = self._slot_of.get(pid)
+                if slot is not None:
+                    self._stock[slot] += delta
+
+    def compact(self) -> None:
+        """
+        Rebuilds the postings without dead slots.
+        """
+        with self._lock:
+            live = sorted(self._slot_of.values())
+            remap = {old: new for new, old in enumerate(live)}
+            self._pid = array("q", (self._pid[s] for s in live))
+            self._price = array("d", (self._price[s] for s in live))
+            self._stock = array("q", (self._stock[s] for s in live))
+            self._alive = bytearray(b"\x01" * len(live))
+            self._slot_of = {pid: remap[slot] for pid, slot in self._slot_of.items()}
+            for postings in (self._name, self._desc):
+                for word in list(postings):
+                    kept = array("i", (remap[s] for s in postings[word] if s in remap))
+                    if kept:
+                        postings[word] = kept
+                    else:
+                        del postings[word]
+            self._sorted_words = None
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "products": len(self._slot_of),
+                "slots": len(self._pid),
+                "words": len(set(self._name) | set(self._desc)),
+                "postings": sum(len(a) for a in self._name.values()) + sum(len(a) for a in self._desc.values()),
+                "approx_bytes": self._approx_bytes(),
+            }
+
+    def _approx_bytes(self) -> int:
+        # arrays, posting dicts and their keys; ignores allocator overhead
+        size = sum(sys.getsizeof(a) for a in (self._pid, self._price, self._stock, self._alive))
+        size += sys.getsizeof(self._slot_of) + 32 * len(self._slot_of)
+        for postings in (self._name, self._desc):
+            size += sys.getsizeof(postings)
+            size += sum(sys.getsizeof(word) + sys.getsizeof(slots) for word, slots in postings.items())
+        return size
+
+    def _add(self, product_id: int, name: Optional[str], price: Optional[float],
+             description: Optional[str], stock: Optional[int]) -> None:
+        old = self._slot_of.get(product_id)
+        if old is not None:
+            self._alive[old] = 0
+        slot = len(self._pid)
+        self._pid.append(product_id)
+        self._price.append(float(price or 0.0))
+        self._stock.append(int(stock or 0))
+        self._alive.append(1)
+        self._slot_of[product_id] = slot
+        name_words = set(tokenize(name))
+        for word in name_words:
+            self._post(self._name, word, slot)
+        for word in set(tokenize(description)) - name_words:
+            self._post(self._desc, word, slot)
+
+    def _post(self, postings: Dict[str, array], word: str, slot: int) -> None:
+        arr = postings.get(word)
+        if arr is None:
+            arr = postings[word] = array("i")
+            if self._sorted_words is not None:
+                i = bisect.bisect_left(self._sorted_words, word)
+                if i == len(self._sorted_words) or self._sorted_words[i] != word:
+                    self._sorted_words.insert(i, word)
+        arr.append(slot)
+
+    # ---------- queries ----------
+
+    def search(self, query: str, min_price: Optional[float] = None, max_price: Optional[float] = None,
+               in_stock: bool = False, offset: int = 0, limit: int = 20, prefix: bool = True) -> SearchResult:
+        """
+        Products matching every word of `query` (the last one also as a
+        prefix when `prefix`), ranked by idf-weighted matches with name
+        matches counting NAME_WEIGHT times; ties go to the product indexed
+        first (for a catalog loaded from the table: the lower product_id).
+        """
+        words = tokenize(query)
+        if not words or limit <= 0:
+            return SearchResult([], 0)
+        with self._lock:
+            groups = []
+            for i, word in enumerate(words):
+                expansions = self._expand(word) if prefix and i == len(words) - 1 else self._exact(word)
+                if not expansions:
+                    return SearchResult([], 0)
+                groups.append(expansions)
+            total_docs = max(len(self._pid), 1)
+            weighted = [
+                [(self._name.get(w), self._desc.get(w), math.log(1.0 + total_docs / self._df(w))) for w in group]
+                for group in groups
+            ]
+            weighted.sort(key=lambda group: sum(self._len(n) + self._len(d) for n, d, _ in group))
+            pids = self._pid
+
+            if len(weighted) == 1 and len(weighted[0]) == 1:
+                # One word: every name match outranks every description match
+                # and ties keep index order, so the postings are the ranking.
+                name_slots, desc_slots, idf = weighted[0][0]
+                ranked = [(self._filter(slots, min_price, max_price, in_stock), score)
+                          for slots, score in ((name_slots, idf * NAME_WEIGHT), (desc_slots, idf)) if slots]
+                hits: List[Tuple[int, float]] = []
+                skip = offset
+                for matched, score in ranked:
+                    hits += [(pids[slot], score) for slot in matched[skip:skip + limit - len(hits)]]
+                    skip = max(0, skip - len(matched))
+                return SearchResult(hits, sum(len(matched) for matched, _ in ranked))
+
+            scores: Dict[int, float] = {}
+            for name_slots, desc_slots, idf in weighted[0]:
+                for slots, weight in ((name_slots, idf * NAME_WEIGHT), (desc_slots, idf)):
+                    for slot in slots or ():
+                        if scores.get(slot, 0.0) < weight:
+                            scores[slot] = weight
+            for group in weighted[1:]:
+                # candidates in slot order, so each posting list is searched
+                # from where the previous candidate was found
+                cursors = [[0, 0] for _ in group]
+                narrowed: Dict[int, float] = {}
+                for slot in sorted(scores):
+                    best = 0.0
+                    for (name_slots, desc_slots, idf), cursor in zip(group, cursors):
+                        if name_slots:
+                            i = cursor[0] = bisect.bisect_left(name_slots, slot, cursor[0])
+                            if i < len(name_slots) and name_slots[i] == slot:
+                                best = max(best, idf * NAME_WEIGHT)
+                                continue
+                        if desc_slots and best < idf:
+                            i = cursor[1] = bisect.bisect_left(desc_slots, slot, cursor[1])
+                            if i < len(desc_slots) and desc_slots[i] == slot:
+                                best = idf
+                    if best:
+                        narrowed[slot] = scores[slot] + best
+                scores = narrowed
+                if not scores:
+                    return SearchResult([], 0)
+
+            kept = set(self._filter(scores, min_price, max_price, in_stock))
+            matches = [(-score, slot) for slot, score in scores.items() if slot in kept]
+        page = heapq.nsmallest(offset + limit, matches)[offset:]
+        return SearchResult([(pids[slot], -neg) for neg, slot in page], len(matches))
+
+    def _filter(self, slots: Iterable[int], min_price: Optional[float], max_price: Optional[float],
+                in_stock: bool) -> List[int]:
+        alive = self._alive
+        if min_price is None and max_price is None and not in_stock:
+            return [slot for slot in slots if alive[slot]]
+        price, stock = self._price, self._stock
+        lo = -math.inf if min_price is None else min_price
+        hi = math.inf if max_price is None else max_price
+        return [slot for slot in slots
+                if alive[slot] and lo <= price[slot] <= hi and (not in_stock or stock[slot] > 0)]
+
+    def _exact(self, word: str) -> List[str]:
+        return [word] if word in self._name or word in self._desc else []
+
+    def _expand(self, prefix: str) -> List[str]:
+        if self._sorted_words is None:
+            self._sorted_words = sorted(set(self._name) | set(self._desc))
+        words = self._sorted_words
+        lo = bisect.bisect_left(words, prefix)
+        hi = bisect.bisect_left(words, prefix + "\U0010ffff", lo)
+        found = words[lo:hi]
+        if len(found) > MAX_PREFIX_EXPANSIONS:
+            found = heapq.nlargest(MAX_PREFIX_EXPANSIONS, found, key=self._df)
+        return found
+
+    def _df(self, word: str) -> int:
+        return max(self._len(self._name.get(word)) + self._len(self._desc.get(word)), 1)
+
+    @staticmethod
+    def _len(slots: Optional[array]) -> int:
+        return len(slots) if slots is not None else 0
+
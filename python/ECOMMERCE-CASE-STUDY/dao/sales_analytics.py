@@ -0,0 +1,288 @@
+# dao/sales_analytics.py
+"""
+Sales aggregates kept up to date with every order, so analytics never
+GROUP BY the whole order history:
+
+    dbo.product_sales_daily   (sales_date, product_id) -> units, revenue
+    dbo.product_sales         product_id -> units, revenue (all time)
+    dbo.customer_value        customer_id -> order_count, lifetime_value
+
+SalesAggregates.record() adds an order batch to the three tables inside
+the order's own transaction (placeOrder and placeOrders call it before
+committing), so the aggregates agree with dbo.orders whichever process
+placed the order. Rows are upserted in key order, so concurrent orders
+lock them in the same order.
+
+Orders placed before the aggregates were switched on are counted by
+backfill() (python -m main.sales_backfill). Holding an exclusive lock on
+dbo.orders, it clears the aggregates and records the highest order_id as
+its cut-off: later orders are counted by record(), earlier ones are read
+back in order_id ranges. Each range is committed together with the
+progress in dbo.sales_backfill, so an interrupted run resumes where it
+stopped. Every process placing orders must have the aggregates on.
+
+Queries read only the aggregates: top products over a date window sum the
+window's daily rows (days x products sold per day, however many orders
+that was), all-time rankings read an index. Rankings are kept in memory
+for `sales_query_cache_seconds`, so dashboards polling them cost nothing
+in between. Daily buckets are UTC dates; record() uses the date its
+transaction runs on, so an order placed at midnight may land in the
+neighbouring day.
+
+db.properties:
+    sales_aggregates=yes          maintain the aggregates in every order transaction
+    sales_query_cache_seconds=60  how long a top-N ranking is reused (0 = never)
+"""
+import datetime
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from dao.batching import MAX_PARAMS, chunks
+
+DateLike = Union[datetime.date, str]
+
+_PRODUCT_DAILY = ("dbo.product_sales_daily", ("sales_date", "product_id"), ("units", "revenue"))
+_PRODUCT_TOTAL = ("dbo.product_sales", ("product_id",), ("units", "revenue"))
+_CUSTOMER = ("dbo.customer_value", ("customer_id",), ("order_count", "lifetime_value"))
+
+# order line for record(): (product_id, quantity, unit_price)
+Line = Tuple[int, int, float]
+
+
+def _day(value: DateLike) -> str:
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return value.isoformat() if isinstance(value, datetime.date) else str(value)[:10]
+
+
+class _Delta:
+    """
+    Increments for the three tables, summed per key before they are sent.
+    """
+    __slots__ = ("daily", "products", "customers")
+
+    def __init__(self):
+        self.daily: Dict[tuple, List[float]] = {}
+        self.products: Dict[tuple, List[float]] = {}
+        self.customers: Dict[tuple, List[float]] = {}
+
+    def line(self, day: str, product_id: int, quantity: int, unit_price: float) -> None:
+        revenue = quantity * float(unit_price or 0.0)
+        for counters, key in ((self.daily, (day, product_id)), (self.products, (product_id,))):
+            entry = counters.setdefault(key, [0, 0.0])
+            entry[0] += quantity
+            entry[1] += revenue
+
+    def order(self, customer_id: int, total: float) -> None:
+        entry = self.customers.setdefault((customer_id,), [0, 0.0])
+        entry[0] += 1
+        entry[1] += float(total or 0.0)
+
+
+class SalesAggregates:
+    def __init__(self, repo, cache_seconds: float = 60.0):
+        self.repo = repo
+        self.cache_seconds = cache_seconds
+        self._cache_lock = threading.Lock()
+        self._cache: Dict[tuple, Tuple[float, list]] = {}    # query -> (expires_at, rows)
+
+    @classmethod
+    def from_properties(cls, repo, props: Dict[str, str]) -> Optional["SalesAggregates"]:
+        """
+        Aggregates if `sales_aggregates` is on, else None.
+        """
+        if props.get("sales_aggregates", "no").lower() not in ("yes", "true", "1"):
+            return None
+        cache = props.get("sales_query_cache_seconds")
+        return cls(repo, cache_seconds=float(cache) if cache else 60.0)
+
+    # ---------- maintenance ----------
+
+    def record(self, cur, orders: Iterable[Tuple[int, Sequence[Line]]]) -> None:
+        """
+        Adds orders given as (customer_id, lines) to the aggregates on the
+        caller's cursor, inside the caller's transaction.
+        """
+        day = datetime.datetime.now(datetime.timezone.utc).date().isoformat()
+        delta = _Delta()
+        for customer_id, lines in orders:
+            total = 0.0
+            for product_id, quantity, unit_price in lines:
+                delta.line(day, product_id, quantity, unit_price)
+                total += quantity * float(unit_price or 0.0)
+            delta.order(customer_id, total)
+        self._apply(cur, delta)
+
+    def _apply(self, cur, delta: _Delta) -> None:
+        for (table, keys, columns), counters in ((_PRODUCT_DAILY, delta.daily),
+                                                 (_PRODUCT_TOTAL, delta.products),
+                                                 (_CUSTOMER, delta.customers)):
+            rows = sorted(counters.items())
+            for chunk in chunks(rows, MAX_PARAMS // (len(keys) + len(columns))):
+                cur.execute(
+                    self.repo.dialect.upsert_add(table, keys, columns, len(chunk)),
+                    *[v for key, (count, amount) in chunk for v in (*key, count, round(amount, 2))],
+                )
+
+    def backfill(self, chunk_size: int = 10000, restart: bool = False,
+                 progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """
+        Counts the orders placed before the aggregates were maintained,
+        `chunk_size` order ids per transaction; resumes an interrupted run
+        unless `restart`. Calls progress(done_order_id, cutoff) after each
+        chunk and returns the number of orders counted by this call.
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be > 0")
+        counted = 0
+        with self.repo.pool.connection() as conn:
+            state = None if restart else self._state(conn)
+            through, done = state if state is not None else self._cut(conn)
+            while done < through:
+                upto = min(done + chunk_size, through)
+                try:
+                    with conn.cursor() as cur:
+                        counted += self._backfill_range(cur, done, upto)
+                        cur.execute("UPDATE dbo.sales_backfill SET done_order_id = ? WHERE id = 1", upto)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                done = upto
+                if progress is not None:
+                    progress(done, through)
+        self.clear_cache()
+        return counted
+
+    def status(self) -> Optional[Tuple[int, int]]:
+        """
+        (done_order_id, cutoff) of the backfill, None if it never started.
+        """
+        with self.repo.pool.connection() as conn:
+            state = self._state(conn)
+        return None if state is None else (state[1], state[0])
+
+    def _state(self, conn) -> Optional[Tuple[int, int]]:
+        with conn.cursor() as cur:
+            cur.execute("SELECT through_order_id, done_order_id FROM dbo.sales_backfill WHERE id = 1")
+            row = next(iter(cur.fetchall()), None)
+        conn.rollback()     # read-only
+        return (int(row[0]), int(row[1])) if row else None
+
+    def _cut(self, conn) -> Tuple[int, int]:
+        try:
+            with conn.cursor() as cur:
+                # no order commits between clearing the aggregates and reading the cut-off
+                self.repo.dialect.lock_table(cur, "dbo.orders")
+                for table, _, _ in (_PRODUCT_DAILY, _PRODUCT_TOTAL, _CUSTOMER):
+                    cur.execute(f"DELETE FROM {table}")
+                cur.execute("SELECT MAX(order_id) FROM dbo.orders")
+                through = int(cur.fetchall()[0][0] or 0)
+                cur.execute("DELETE FROM dbo.sales_backfill")
+                cur.execute("INSERT INTO dbo.sales_backfill (id, through_order_id, done_order_id) VALUES (1, ?, 0)",
+                            through)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return through, 0
+
+    def _backfill_range(self, cur, after: int, upto: int) -> int:
+        delta = _Delta()
+        cur.execute(
+            "SELECT customer_id, total_price FROM dbo.orders WHERE order_id > ? AND order_id <= ?",
+            after, upto,
+        )
+        orders = cur.fetchall()
+        for customer_id, total in orders:
+            delta.order(customer_id, total)
+        cur.execute(
+            """
+            SELECT o.order_date, oi.product_id, oi.quantity, oi.unit_price
+            FROM dbo.order_items oi
+            JOIN dbo.orders o ON o.order_id = oi.order_id
+            WHERE o.order_id > ? AND o.order_id <= ?
+            """,
+            after, upto,
+        )
+        for order_date, product_id, quantity, unit_price in cur.fetchall():
+            delta.line(_day(order_date), product_id, quantity, unit_price)
+        self._apply(cur, delta)
+        return len(orders)
+
+    # ---------- queries ----------
+
+    def top_products(self, n: int = 10, since: Optional[DateLike] = None,
+                     until: Optional[DateLike] = None) -> List[Tuple[int, int, float]]:
+        """
+        (product_id, units, revenue) of the n best-selling products by
+        revenue, over all time or the UTC dates since..until (inclusive).
+        """
+        if since is not None or until is not None:
+            since, until = _day(since or datetime.date.min), _day(until or datetime.date.max)
+        return self._cached(("products", n, since, until), lambda: self._top_products(n, since, until))
+
+    def _top_products(self, n: int, since: Optional[str], until: Optional[str]) -> List[Tuple[int, int, float]]:
+        if since is None:
+            sql, params = self.repo.dialect.select_top(
+                n, "product_id, units, revenue",
+                "FROM dbo.product_sales ORDER BY revenue DESC, product_id", [])
+        else:
+            sql, params = self.repo.dialect.select_top(
+                n, "product_id, SUM(units), SUM(revenue)",
+                "FROM dbo.product_sales_daily WHERE sales_date >= ? AND sales_date <= ? "
+                "GROUP BY product_id ORDER BY SUM(revenue) DESC, product_id",
+                [since, until])
+        return [(int(pid), int(units), float(revenue)) for pid, units, revenue in self._read(sql, params)]
+
+    def top_customers(self, n: int = 10) -> List[Tuple[int, int, float]]:
+        """
+        (customer_id, order_count, lifetime_value) of the n most valuable customers.
+        """
+        sql, params = self.repo.dialect.select_top(
+            n, "customer_id, order_count, lifetime_value",
+            "FROM dbo.customer_value ORDER BY lifetime_value DESC, customer_id", [])
+        return self._cached(("customers", n), lambda: [(int(cid), int(count), float(value))
+                                                        for cid, count, value in self._read(sql, params)])
+
+    def product_sales(self, product_id: int) -> Tuple[int, float]:
+        """
+        (units, revenue) sold of one product, all time.
+        """
+        rows = self._read("SELECT units, revenue FROM dbo.product_sales WHERE product_id = ?", [product_id])
+        return (int(rows[0][0]), float(rows[0][1])) if rows else (0, 0.0)
+
+    def customer_value(self, customer_id: int) -> Tuple[int, float]:
+        """
+        (order_count, lifetime_value) of one customer.
+        """
+        rows = self._read("SELECT order_count, lifetime_value FROM dbo.customer_value WHERE customer_id = ?",
+                          [customer_id])
+        return (int(rows[0][0]), float(rows[0][1])) if rows else (0, 0.0)
+
+    def _cached(self, key: tuple, compute: Callable[[], list]) -> list:
+        if self.cache_seconds <= 0:
+            return compute()
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > now:
+                return list(entry[1])
+        rows = compute()
+        with self._cache_lock:
+            if len(self._cache) >= 256:
+                self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+            self._cache[key] = (now + self.cache_seconds, rows)
+        return list(rows)
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
+
+    def _read(self, sql: str, params: List) -> List[tuple]:
+        # analytics tolerate replica lag
+        with self.repo._read_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, *params)
+                return cur.fetchall()
@@ -0,0 +1,220 @@
+# dao/sqlite_dialect.py
+"""
+Embedded SQLite backend (WAL mode) for local runs, benchmarks and
+edge/kiosk deployments. Selected with `dialect=sqlite`; `database` is the
+path of the database file.
+
+Connections accept the same SQL and call style as the SQL Server ones:
+`cur.execute(sql, *params)`, cursors usable in `with` blocks (closed on
+exit, never committed), `dbo.` table prefixes mapped to the main schema.
+SQLite already understands [bracketed] identifiers.
+
+SQLite has no replication; for local read-replica setups
+(util.replica_router, `replica.<n>.database=<file>`) SQLiteReplicaSync
+copies the primary file over each replica file every
+`sqlite_replica_sync_seconds`, so replicas lag like asynchronous ones.
+"""
+import datetime
+import decimal
+import logging
+import os
+import re
+import sqlite3
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from dao.batching import placeholders
+from dao.dialect import Dialect
+
+_log = logging.getLogger(__name__)
+_SCHEMA_PREFIX = re.compile(r"\bdbo\.")
+
+# Stored as 'YYYY-MM-DD HH:MM:SS' (the CURRENT_TIMESTAMP format) so keyset
+# cursors compare correctly; read back as datetime like pyodbc does.
+sqlite3.register_adapter(datetime.datetime, lambda d: d.isoformat(" "))
+sqlite3.register_adapter(decimal.Decimal, float)
+sqlite3.register_converter("TIMESTAMP", lambda b: datetime.datetime.fromisoformat(b.decode()))
+
+
+@lru_cache(maxsize=1024)
+def _translate(sql: str) -> str:
+    return _SCHEMA_PREFIX.sub("", sql)
+
+
+class SQLiteCursor(sqlite3.Cursor):
+    """
+    sqlite3 cursor taking pyodbc-style positional parameters.
+    """
+
+    def execute(self, sql: str, *params: Any) -> "SQLiteCursor":
+        if len(params) == 1 and isinstance(params[0], (list, tuple)):
+            params = params[0]
+        return super().execute(_translate(sql), params)
+
+    def executemany(self, sql: str, seq_of_params) -> "SQLiteCursor":
+        return super().executemany(_translate(sql), seq_of_params)
+
+    def __enter__(self) -> "SQLiteCursor":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self.close()
+        return False
+
+
+class SQLiteConnection(sqlite3.Connection):
+    def cursor(self, factory=SQLiteCursor) -> SQLiteCursor:
+        return super().cursor(factory)
+
+
+class SQLiteDialect(Dialect):
+    """
+    Properties (all optional except database):
+      database               path of the database file
+      sqlite_journal_mode    default wal (readers never block the writer)
+      sqlite_synchronous     default normal (safe with WAL, fsync at checkpoints)
+      sqlite_busy_timeout    seconds to wait for the write lock, default 5
+      sqlite_schema          script run once when the database has no tables
+      sqlite_replica_sync_seconds
+                             with replica.<n>.database files: copy the primary
+                             to them this often, default 1 (0 = never)
+    """
+    name = "sqlite"
+    IntegrityError = sqlite3.IntegrityError
+
+    def __init__(self):
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def connect(self, props: Dict[str, str]) -> SQLiteConnection:
+        path = props.get("database")
+        if not path:
+            raise ValueError("Missing 'database' (SQLite file path) in property file.")
+        conn = sqlite3.connect(
+            path,
+            timeout=float(props.get("sqlite_busy_timeout", "5")),
+            # BEGIN IMMEDIATE before the first write: the write lock is taken
+            # up front, so a transaction never fails upgrading a read lock
+            isolation_level="IMMEDIATE",
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,        # pooled connections move between threads
+            factory=SQLiteConnection,
+        )
+        conn.execute(f"PRAGMA journal_mode = {props.get('sqlite_journal_mode', 'wal')}")
+        conn.execute(f"PRAGMA synchronous = {props.get('sqlite_synchronous', 'normal')}")
+        conn.execute("PRAGMA foreign_keys = ON")
+        if not self._schema_ready:
+            self._ensure_schema(conn, props.get("sqlite_schema"))
+        return conn
+
+    def _ensure_schema(self, conn: SQLiteConnection, script: str) -> None:
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            if script and not _has_tables(conn):
+                if not os.path.isfile(script):
+                    raise FileNotFoundError(f"SQLite schema script not found: {script}")
+                with open(script, "r", encoding="utf-8") as f:
+                    conn.executescript(f.read())
+            self._schema_ready = True
+
+    def is_retryable(self, err: Exception) -> bool:
+        return isinstance(err, sqlite3.OperationalError) and ("locked" in str(err) or "busy" in str(err))
+
+    def is_foreign_key_violation(self, err: Exception) -> bool:
+        # SQLite does not say which constraint failed
+        return isinstance(err, sqlite3.IntegrityError) and "FOREIGN KEY" in str(err)
+
+    def insert_returning(self, table: str, columns: Sequence[str], id_column: str) -> str:
+        return (
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({placeholders(len(columns))}) "
+            f"RETURNING {id_column}"
+        )
+
+    def insert_many_returning(self, cur, table: str, columns: Sequence[str], id_column: str,
+                              rows: Sequence[Sequence[Any]]) -> List[int]:
+        # In-process, so one statement per row costs no round trip, and the
+        # order of multi-row RETURNING output is not guaranteed.
+        sql = self.insert_returning(table, columns, id_column)
+        ids = []
+        for row in rows:
+            cur.execute(sql, *row)
+            ids.append(cur.fetchone()[0])
+        return ids
+
+    def upsert_add(self, table: str, keys: Sequence[str], columns: Sequence[str], rows: int) -> str:
+        cols = [*keys, *columns]
+        return (
+            f"INSERT INTO {table} ({', '.join(cols)}) VALUES {placeholders(rows, len(cols))} "
+            f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET "
+            + ", ".join(f"{c} = {c} + excluded.{c}" for c in columns)
+        )
+
+    def lock_table(self, cur, table: str) -> None:
+        # one writer per database: a no-op write begins the IMMEDIATE
+        # transaction, which holds the write lock until commit/rollback
+        cur.execute(f"UPDATE {table} SET rowid = rowid WHERE 0")
+
+    def select_top(self, limit: int, columns: str, rest: str, params: Sequence[Any]) -> Tuple[str, List[Any]]:
+        return f"SELECT {columns} {rest} LIMIT ?", [*params, limit]
+
+    def values_table(self, rows: int, columns: Sequence[str], alias: str) -> str:
+        names = ", ".join(f"column{i} AS {c}" for i, c in enumerate(columns, 1))
+        return f"(SELECT {names} FROM (VALUES {placeholders(rows, len(columns))})) AS {alias}"
+
+    def start_replication(self, props: Dict[str, str],
+                          replicas: Dict[str, Dict[str, str]]) -> Optional[Callable[[], None]]:
+        interval = float(props.get("sqlite_replica_sync_seconds") or 1)
+        if interval <= 0:
+            return None
+        sync = SQLiteReplicaSync(props["database"], [r["database"] for r in replicas.values()], interval)
+        return sync.stop
+
+
+class SQLiteReplicaSync:
+    """
+    Daemon thread copying the primary database to each replica file with
+    the online backup API every `interval` seconds (first copy up front).
+    Readers of a replica keep their snapshot during a copy.
+    """
+
+    def __init__(self, primary: str, replicas: List[str], interval: float):
+        self.primary = primary
+        self.replicas = [r for r in replicas if os.path.abspath(r) != os.path.abspath(primary)]
+        self.interval = interval
+        self.copies = 0
+        self._stop = threading.Event()
+        self.sync_once()
+        self._thread = threading.Thread(target=self._run, name="sqlite-replica-sync", daemon=True)
+        self._thread.start()
+
+    def sync_once(self) -> None:
+        src = sqlite3.connect(self.primary)
+        try:
+            for path in self.replicas:
+                try:
+                    dst = sqlite3.connect(path, timeout=30)
+                    try:
+                        src.backup(dst)
+                    finally:
+                        dst.close()
+                    self.copies += 1
+                except sqlite3.Error:
+                    _log.exception("copy to replica %s failed", path)     # it lags until the next round
+        finally:
+            src.close()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sync_once()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _has_tables(conn: SQLiteConnection) -> bool:
+    cur = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products'")
+    return cur.fetchone() is not None
@@ -1,8 +1,30 @@
 # entity/__init__.py
-from .customer import Customer
-from .product import Product
-from .cart import Cart
-from .order import Order
-from .order_item import OrderItem
+# Exports load on first access (PEP 562), so `from entity.customer import
+# Customer` imports that one module only.
+from importlib import import_module
 
-__all__ = ["Customer", "Product", "Cart", "Order", "OrderItem"]
+_EXPORTS = {
+    "Customer": ".customer",
+    "Product": ".product",
+    "Cart": ".cart",
+    "Order": ".order",
+    "OrderItem": ".order_item",
+    "product_from_row": ".row_mapper",
+    "products_from_rows": ".row_mapper",
+    "order_item_from_row": ".row_mapper",
+}
+
+__all__ = [
+    "Customer", "Product", "Cart", "Order", "OrderItem",
+    "product_from_row", "products_from_rows", "order_item_from_row",
+]
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = getattr(import_module(module, __name__), name)
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
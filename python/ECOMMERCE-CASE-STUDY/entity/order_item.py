@@ -1,47 +1,72 @@
 # entity/order_item.py
 from typing import Optional
+from entity.product import Product
 
 class OrderItem:
     """
     Entity class for 'order_items' table.
-    Columns: order_item_id (PK), order_id (FK), product_id (FK), quantity
+    Columns: order_item_id (PK), order_id (FK), product_id (FK), quantity, unit_price
+    unit_price is the product price captured when the order was placed.
+
+    Slotted: fields are plain attributes; get_/set_ methods are compatibility shims.
     """
 
+    __slots__ = ("order_item_id", "order_id", "product_id", "quantity", "unit_price", "product")
+
     def __init__(self,
                  order_item_id: Optional[int] = None,
                  order_id: Optional[int] = None,
                  product_id: Optional[int] = None,
-                 quantity: Optional[int] = None):
-        self._order_item_id = order_item_id
-        self._order_id = order_id
-        self._product_id = product_id
-        self._quantity = quantity
+                 quantity: Optional[int] = None,
+                 unit_price: Optional[float] = None,
+                 product: Optional[Product] = None):
+        self.order_item_id = order_item_id
+        self.order_id = order_id
+        self.product_id = product_id
+        self.quantity = quantity
+        self.unit_price = unit_price
+        self.product = product
 
     # Getters
     def get_order_item_id(self) -> Optional[int]:
-        return self._order_item_id
+        return self.order_item_id
 
     def get_order_id(self) -> Optional[int]:
-        return self._order_id
+        return self.order_id
 
     def get_product_id(self) -> Optional[int]:
-        return self._product_id
+        return self.product_id
 
     def get_quantity(self) -> Optional[int]:
-        return self._quantity
+        return self.quantity
+
+    def get_unit_price(self) -> Optional[float]:
+        return self.unit_price
+
+    def get_product(self) -> Optional[Product]:
+        return self.product
+
+    def get_line_total(self) -> float:
+        return (self.unit_price or 0.0) * (self.quantity or 0)
 
     # Setters
     def set_order_item_id(self, order_item_id: int) -> None:
-        self._order_item_id = order_item_id
+        self.order_item_id = order_item_id
 
     def set_order_id(self, order_id: int) -> None:
-        self._order_id = order_id
+        self.order_id = order_id
 
     def set_product_id(self, product_id: int) -> None:
-        self._product_id = product_id
+        self.product_id = product_id
 
     def set_quantity(self, quantity: int) -> None:
-        self._quantity = quantity
+        self.quantity = quantity
+
+    def set_unit_price(self, unit_price: float) -> None:
+        self.unit_price = unit_price
+
+    def set_product(self, product: Optional[Product]) -> None:
+        self.product = product
 
     def __repr__(self) -> str:
-        return f"OrderItem(order_item_id={self._order_item_id}, order_id={self._order_id}, product_id={self._product_id}, quantity={self._quantity})"
+        return f"OrderItem(order_item_id={self.order_item_id}, order_id={self.order_id}, product_id={self.product_id}, quantity={self.quantity}, unit_price={self.unit_price})"
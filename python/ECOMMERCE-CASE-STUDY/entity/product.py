@@ -5,51 +5,56 @@ class Product:
     """
     Entity class for 'products' table.
     Columns: product_id (PK), name, price, description, stockQuantity
+
+    Slotted: fields are plain attributes (product.price); the get_/set_
+    methods are kept as thin compatibility shims.
     """
 
+    __slots__ = ("product_id", "name", "price", "description", "stockQuantity")
+
     def __init__(self,
                  product_id: Optional[int] = None,
                  name: Optional[str] = None,
                  price: Optional[float] = None,
                  description: Optional[str] = None,
                  stockQuantity: Optional[int] = None):
-        self._product_id = product_id
-        self._name = name
-        self._price = price
-        self._description = description
-        self._stockQuantity = stockQuantity
+        self.product_id = product_id
+        self.name = name
+        self.price = price
+        self.description = description
+        self.stockQuantity = stockQuantity
 
     # Getters
     def get_product_id(self) -> Optional[int]:
-        return self._product_id
+        return self.product_id
 
     def get_name(self) -> Optional[str]:
-        return self._name
+        return self.name
 
     def get_price(self) -> Optional[float]:
-        return self._price
+        return self.price
 
     def get_description(self) -> Optional[str]:
-        return self._description
+        return self.description
 
     def get_stockQuantity(self) -> Optional[int]:
-        return self._stockQuantity
+        return self.stockQuantity
 
     # Setters
     def set_product_id(self, product_id: int) -> None:
-        self._product_id = product_id
+        self.product_id = product_id
 
     def set_name(self, name: str) -> None:
-        self._name = name
+        self.name = name
 
     def set_price(self, price: float) -> None:
-        self._price = price
+        self.price = price
 
     def set_description(self, description: Optional[str]) -> None:
-        self._description = description
+        self.description = description
 
     def set_stockQuantity(self, stockQuantity: int) -> None:
-        self._stockQuantity = stockQuantity
+        self.stockQuantity = stockQuantity
 
     def __repr__(self) -> str:
-        return f"Product(product_id={self._product_id}, name={self._name}, price={self._price}, stockQuantity={self._stockQuantity})"
+        return f"Product(product_id={self.product_id}, name={self.name}, price={self.price}, stockQuantity={self.stockQuantity})"
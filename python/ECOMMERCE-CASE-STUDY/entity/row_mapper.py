@@ -0,0 +1,29 @@
+# entity/row_mapper.py
+"""
+Positional row -> entity mapping for DB-API rows (pyodbc.Row, tuples).
+
+Column order expected by every mapper:
+  product:    product_id, name, price, description, stockQuantity
+  order item: order_item_id, order_id, product_id, quantity, unit_price
+
+`offset` is the index of the first of those columns in the row, so joined
+rows can be mapped without slicing. Only DECIMAL prices need converting;
+INT columns already arrive as Python ints.
+"""
+from typing import Any, List, Sequence
+
+from entity.product import Product
+from entity.order_item import OrderItem
+
+
+def product_from_row(row: Sequence[Any], offset: int = 0) -> Product:
+    return Product(row[offset], row[offset + 1], float(row[offset + 2]), row[offset + 3], row[offset + 4])
+
+
+def products_from_rows(rows: Sequence[Sequence[Any]]) -> List[Product]:
+    # inlined loop body: avoids one Python call per row on large result sets
+    return [Product(r[0], r[1], float(r[2]), r[3], r[4]) for r in rows]
+
+
+def order_item_from_row(row: Sequence[Any], offset: int = 0) -> OrderItem:
+    return OrderItem(row[offset], row[offset + 1], row[offset + 2], row[offset + 3], float(row[offset + 4]))
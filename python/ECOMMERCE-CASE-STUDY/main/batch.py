@@ -0,0 +1,87 @@
+# main/batch.py
+"""
+Run EcomApp operations from a command feed instead of the menu.
+
+    python -m main.batch carts.jsonl --chunk-size 1000 --workers 4 --out results.jsonl
+    python -m main.batch - --format csv < orders.csv > results.jsonl
+
+The feed holds one command per line (JSONL) or row (CSV with a header);
+see dao.command_batch for the ops and their fields. Use "-" to read from
+stdin (JSONL unless --format csv). One JSON result per command is written
+in input order to --out (default stdout); --failures-only keeps just the
+failed ones. A throughput summary goes to stderr at the end (--summary-json
+prints it as one JSON object). Exits 0 if every command succeeded, 1 if
+any failed, 2 if the feed cannot be read.
+"""
+import argparse
+import json
+import os
+import sys
+
+from dao import OrderProcessorRepositoryImpl
+from dao.command_batch import CommandBatch, read_commands
+
+
+def _print_summary(summary: dict, as_json: bool) -> None:
+    if as_json:
+        print(json.dumps(summary), file=sys.stderr)
+        return
+    print(f"{summary['commands']} commands, {summary['failed']} failed, {summary['calls']} repository calls "
+          f"in {summary['elapsed_s']:.1f}s ({summary['commands_per_s']:.0f} commands/s, "
+          f"{summary['workers']} workers, chunk {summary['chunk_size']})", file=sys.stderr)
+    for op, stats in summary["ops"].items():
+        print(f"  {op:<18} {stats['commands']:>9} commands {stats['failed']:>7} failed "
+              f"{stats['calls']:>8} calls", file=sys.stderr)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("feed", help="path to a .jsonl or .csv command feed, or - for stdin")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="override detection by extension")
+    parser.add_argument("--chunk-size", type=int, default=500, help="commands per bulk call / transaction")
+    parser.add_argument("--workers", type=int, default=1, help="threads running commands concurrently")
+    parser.add_argument("--out", default="-", help="file for the JSONL results (default stdout)")
+    parser.add_argument("--failures-only", action="store_true", help="write results of failed commands only")
+    parser.add_argument("--summary-json", action="store_true", help="print the summary as JSON")
+    parser.add_argument("--props", default="config/db.properties")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("jsonl" if args.feed == "-" else os.path.splitext(args.feed)[1].lstrip(".").lower())
+    if fmt not in ("csv", "jsonl", "ndjson", "json"):
+        print(f"Unsupported feed format: {fmt!r} (use --format csv or jsonl)", file=sys.stderr)
+        return 2
+    try:
+        feed = sys.stdin if args.feed == "-" else open(args.feed, "r", encoding="utf-8", newline="")
+    except OSError as e:
+        print(f"Cannot read feed: {e}", file=sys.stderr)
+        return 2
+
+    # carts go straight to dbo.cart: with cart_store=memory they belong to the running app
+    repo = OrderProcessorRepositoryImpl(args.props, own_carts=False)
+    batch = CommandBatch(repo, chunk_size=args.chunk_size, workers=args.workers)
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    failed = 0
+    try:
+        for result in batch.run(read_commands(feed, fmt)):
+            failed += not result.ok
+            if result.ok and args.failures_only:
+                continue
+            out.write(json.dumps(result.to_dict(), default=str) + "\n")
+    except Exception as e:
+        print(f"Batch stopped: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if feed is not sys.stdin:
+            feed.close()
+        if repo.group_commit is not None:
+            repo.group_commit.close()
+        if repo.replicas is not None:
+            repo.replicas.close()
+        _print_summary(batch.summary(), args.summary_json)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# main/checkout_workers.py
+"""
+Run the checkout worker processes that drain the order queue.
+
+    python -m main.checkout_workers --props config/db.properties --workers 4
+    python -m main.checkout_workers --until-empty       # drain and exit
+
+The queue file and the defaults below come from the `checkout_*` settings
+in the property file. Ctrl+C stops the workers; orders they had leased go
+back to the queue when the lease expires.
+"""
+import argparse
+import multiprocessing
+import os
+import socket
+import sys
+import time
+
+from dao.checkout_worker import run_worker
+from dao.order_queue import OrderQueue
+from util.property_util import DBPropertyUtil
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--props", default="config/db.properties")
+    parser.add_argument("--workers", type=int, help="worker processes (default checkout_workers)")
+    parser.add_argument("--until-empty", action="store_true", help="exit once the queue is drained")
+    args = parser.parse_args(argv)
+
+    props = DBPropertyUtil.get_properties(args.props)
+    queue = OrderQueue.from_properties(props)
+    if queue is None:
+        print("checkout_queue is not set in", args.props, file=sys.stderr)
+        return 1
+    before = queue.stats()
+    queue.close()
+
+    workers = args.workers or int(props.get("checkout_workers", "4"))
+    stop = multiprocessing.Event()
+    kwargs = dict(
+        claim_size=int(props.get("checkout_claim_size", "64")),
+        batch_size=int(props.get("checkout_batch_size", "32")),
+        lease_seconds=float(props.get("checkout_lease_seconds", "60")),
+        max_attempts=int(props.get("checkout_max_attempts", "5")),
+        stop=stop,
+        exit_when_idle=args.until_empty,
+    )
+    procs = [
+        multiprocessing.Process(
+            target=run_worker,
+            args=(f"{socket.gethostname()}-{os.getpid()}-{i}", queue.path, args.props),
+            kwargs=kwargs,
+            daemon=True,
+        )
+        for i in range(workers)
+    ]
+    print(f"Starting {workers} checkout workers on {queue.path} "
+          f"({before['queued']} queued, {before['processing']} in progress).")
+    started = time.perf_counter()
+    for p in procs:
+        p.start()
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        stop.set()
+        for p in procs:
+            p.join()
+
+    queue = OrderQueue(queue.path)
+    after = queue.stats()
+    queue.close()
+    elapsed = time.perf_counter() - started
+    print(f"Workers stopped after {elapsed:.1f}s: {after['done']} done, {after['failed']} failed, "
+          f"{after['queued']} queued, {after['processing']} in progress.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
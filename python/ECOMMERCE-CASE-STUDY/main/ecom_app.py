@@ -1,14 +1,22 @@
 # main/ecom_app.py
-from typing import List, Tuple, Dict, Any
-from dao import OrderProcessorRepositoryImpl
+from typing import TYPE_CHECKING, List, Tuple, Dict, Any, Optional
 from entity.customer import Customer
 from entity.product import Product
+from util.property_util import DBPropertyUtil
 from myexceptions import (
     CustomerNotFoundException,
     ProductNotFoundException,
     OrderNotFoundException,
 )
 
+if TYPE_CHECKING:
+    # imported on the first menu action (see EcomApp.repo / EcomApp.queue)
+    from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+    from dao.order_queue import OrderQueue
+
+# Orders fetched per page in "View Customer Orders"
+_ORDERS_PAGE_SIZE = 20
+
 # ---------- small input helpers ----------
 def _prompt_nonempty(prompt: str) -> str:
     while True:
@@ -47,7 +55,7 @@ class EcomApp:
     """
     Menu-driven CLI that uses OrderProcessorRepositoryImpl to perform actions.
 
-    Menu (7 items):
+    Menu (8 items):
       1) Register Customer
       2) Create Product
       3) Delete Product
@@ -55,11 +63,44 @@ class EcomApp:
       5) View Cart
       6) Place Order
       7) View Customer Order
+      8) Check Order Status
       0) Exit
+
+    With `checkout_queue` set in the property file, Place Order enqueues the
+    cart for the checkout workers (main.checkout_workers) and prints a
+    ticket; Check Order Status polls it.
+
+    For bulk work (loading carts, replaying orders) python -m main.batch
+    runs the same operations from a JSONL/CSV feed (dao.command_batch).
+
+    The menu renders before the repository (and everything behind it) is
+    imported or any connection is opened: both happen on the first action
+    that needs them.
     """
 
     def __init__(self, prop_file: str = "config/db.properties"):
-        self.repo = OrderProcessorRepositoryImpl(prop_file)
+        self.prop_file = prop_file
+        self._repo: Optional["OrderProcessorRepositoryImpl"] = None
+        self._queue: Optional["OrderQueue"] = None
+        self._queue_loaded = False
+
+    @property
+    def repo(self) -> "OrderProcessorRepositoryImpl":
+        if self._repo is None:
+            from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl
+            # the app is the process that releases expired idempotency keys
+            self._repo = OrderProcessorRepositoryImpl(self.prop_file, key_cleanup=True)
+        return self._repo
+
+    @property
+    def queue(self) -> Optional["OrderQueue"]:
+        if not self._queue_loaded:
+            props = DBPropertyUtil.get_properties(self.prop_file)
+            if props.get("checkout_queue", "").strip():
+                from dao.order_queue import OrderQueue
+                self._queue = OrderQueue.from_properties(props)
+            self._queue_loaded = True
+        return self._queue
 
     # -------- menu handlers --------
 
@@ -153,6 +194,9 @@ class EcomApp:
         cid = _prompt_int("Customer ID: ", min_val=1)
         addr = _prompt_nonempty("Shipping Address: ")
         cust = Customer(customer_id=cid)
+        if self.queue is not None:
+            self._enqueue_order(cust, addr)
+            return
         try:
             ok = self.repo.placeOrder(cust, None, addr)  # None => use items from cart
             if ok:
@@ -165,34 +209,77 @@ class EcomApp:
         except Exception as e:
             print("Failed to place order:", e)
 
+    def _enqueue_order(self, cust: Customer, addr: str):
+        try:
+            items = self.repo.getAllFromCart(cust)
+            if not items:
+                print("Cannot place order: cart is empty.")
+                return
+            ticket, queued = self.queue.enqueue_cart(cust.get_customer_id(),
+                                                     [(prod.get_product_id(), qty) for prod, qty in items], addr)
+            if not queued:
+                print(f"This customer's checkout is still pending. Ticket: {ticket}")
+                print("Use 'Check Order Status' to follow it, then check out again.")
+                return
+            if self.repo.carts is not None:
+                # the in-memory cart is authoritative; the worker clears dbo.cart
+                self.repo.carts.discard_lines(cust.get_customer_id(), [prod.get_product_id() for prod, _ in items])
+            print(f"Order queued. Ticket: {ticket}")
+            print("Use 'Check Order Status' to follow it.")
+        except CustomerNotFoundException as e:
+            print(e)
+        except ValueError as e:
+            print("Cannot place order:", e)
+        except Exception as e:
+            print("Failed to queue order:", e)
+
+    def _check_order_status(self):
+        print("\n-- Check Order Status --")
+        if self.queue is None:
+            print("Orders are placed immediately (no checkout queue configured).")
+            return
+        ticket = _prompt_nonempty("Ticket: ")
+        try:
+            st = self.queue.status(ticket)
+        except Exception as e:
+            print("Failed to read order status:", e)
+            return
+        from dao.order_queue import DONE, FAILED
+        if st is None:
+            print("Unknown ticket.")
+        elif st.status == DONE:
+            print(f"Order placed successfully (order #{st.order_id}).")
+        elif st.status == FAILED:
+            print("Order failed:", st.error)
+        else:
+            print(f"Order is {st.status} (attempt {st.attempts}).")
+
     def _view_customer_orders(self):
         print("\n-- View Customer Orders --")
         cid = _prompt_int("Customer ID: ", min_val=1)
         try:
-            rows: List[Dict[str, Any]] = self.repo.getOrdersByCustomer(cid)
-            if not rows:
+            # Fetch and print one page of orders at a time (keyset pagination);
+            # totals and line prices are the ones stored at checkout
+            cursor = None
+            printed = 0
+            while True:
+                orders, cursor = self.repo.getOrdersWithItemsByCustomer(cid, _ORDERS_PAGE_SIZE, cursor)
+                for order in orders:
+                    printed += 1
+                    _print_line("=")
+                    print(f"Order #{order.get_order_id()}  on {order.get_order_date()}")
+                    _print_line("-")
+                    for item in order.get_items():
+                        prod = item.get_product()
+                        print(f"[{item.get_product_id():>3}] {prod.get_name():<30} "
+                              f"₹{item.get_unit_price():>8.2f}  x {item.get_quantity():<3} = ₹{item.get_line_total():>8.2f}")
+                    _print_line()
+                    print(f"Order Total: ₹{order.get_total_price():.2f}")
+                if cursor is None:
+                    break
+            if not printed:
                 print("No orders found for this customer.")
                 return
-            # Group by order_id to present neatly
-            grouped: Dict[int, Dict[str, Any]] = {}
-            for r in rows:
-                oid = r["order_id"]
-                if oid not in grouped:
-                    grouped[oid] = {"order_date": r["order_date"], "items": []}
-                grouped[oid]["items"].append((r["product"], r["quantity"]))
-
-            for oid, data in sorted(grouped.items(), key=lambda kv: kv[1]["order_date"], reverse=True):
-                _print_line("=")
-                print(f"Order #{oid}  on {data['order_date']}")
-                _print_line("-")
-                order_total = 0.0
-                for prod, qty in data["items"]:
-                    line_total = (prod.get_price() or 0.0) * qty
-                    order_total += line_total
-                    print(f"[{prod.get_product_id():>3}] {prod.get_name():<30} "
-                          f"₹{prod.get_price():>8.2f}  x {qty:<3} = ₹{line_total:>8.2f}")
-                _print_line()
-                print(f"Order Total: ₹{order_total:.2f}")
             _print_line("=")
         except CustomerNotFoundException as e:
             print(e)
@@ -216,6 +303,7 @@ class EcomApp:
             print("5) View Cart")
             print("6) Place Order")
             print("7) View Customer Order")
+            print("8) Check Order Status")
             print("0) Exit")
             _print_line()
 
@@ -234,7 +322,16 @@ class EcomApp:
                 self._place_order()
             elif choice == "7":
                 self._view_customer_orders()
+            elif choice == "8":
+                self._check_order_status()
             elif choice == "0":
+                repo = self._repo      # None if no action ever needed it
+                if repo is not None and repo.carts is not None:
+                    repo.carts.close()     # write pending cart changes
+                if repo is not None and repo.replicas is not None:
+                    repo.replicas.close()
+                if repo is not None and repo.key_janitor is not None:
+                    repo.key_janitor.stop()
                 print("Goodbye!")
                 break
             else:
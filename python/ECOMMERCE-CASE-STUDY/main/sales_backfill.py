@@ -0,0 +1,65 @@
+# main/sales_backfill.py
+"""
+Count the existing order history into the sales aggregates (one-time).
+
+    python -m main.sales_backfill --chunk-size 10000
+    python -m main.sales_backfill --top 10 --days 30
+
+Run it after sales_aggregates=yes is set for every process placing orders
+(orders placed from then on are counted as they commit). An interrupted
+run resumes where it stopped; --restart recounts from scratch. --top
+prints the best-selling products of the last --days days afterwards.
+"""
+import argparse
+import datetime
+import sys
+import time
+
+from dao import OrderProcessorRepositoryImpl
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--props", default="config/db.properties")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="order ids per committed chunk")
+    parser.add_argument("--restart", action="store_true", help="clear the aggregates and count everything again")
+    parser.add_argument("--top", type=int, default=0, help="print the top N products by revenue afterwards")
+    parser.add_argument("--days", type=int, default=30, help="window for --top (0 = all time)")
+    args = parser.parse_args(argv)
+
+    repo = OrderProcessorRepositoryImpl(args.props, own_carts=False)
+    if repo.sales is None:
+        print("sales_aggregates is off in this property file; turn it on for every process "
+              "placing orders before backfilling, or new orders will be missed.", file=sys.stderr)
+        return 2
+
+    shown = []
+
+    def progress(done: int, through: int) -> None:
+        shown.append(done)
+        print(f"\r  order_id {done}/{through}", end="", flush=True)
+
+    started = time.perf_counter()
+    try:
+        counted = repo.sales.backfill(args.chunk_size, restart=args.restart, progress=progress)
+    except Exception as e:
+        if shown:
+            print()
+        print(f"Backfill stopped (run again to resume): {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+    if shown:
+        print()
+    print(f"Counted {counted} orders in {elapsed:.1f}s.")
+
+    if args.top > 0:
+        since = datetime.datetime.now(datetime.timezone.utc).date() - datetime.timedelta(days=args.days - 1)
+        top = repo.sales.top_products(args.top, since=since) if args.days > 0 else repo.sales.top_products(args.top)
+        print(f"Top {args.top} products by revenue ({f'last {args.days} days' if args.days > 0 else 'all time'}):")
+        for product_id, units, revenue in top:
+            print(f"  product {product_id:<8} units {units:<10} revenue {revenue:,.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,9 +2,15 @@
 from .customer_not_found_exception import CustomerNotFoundException
 from .product_not_found_exception import ProductNotFoundException
 from .order_not_found_exception import OrderNotFoundException
+from .connection_pool_timeout_exception import ConnectionPoolTimeoutException
+from .insufficient_stock_exception import InsufficientStockException
+from .idempotency_key_conflict_exception import IdempotencyKeyConflictException
 
 __all__ = [
     "CustomerNotFoundException",
     "ProductNotFoundException",
     "OrderNotFoundException",
+    "ConnectionPoolTimeoutException",
+    "InsufficientStockException",
+    "IdempotencyKeyConflictException",
 ]
@@ -0,0 +1,16 @@
+# myexceptions/connection_pool_timeout_exception.py
+
+class ConnectionPoolTimeoutException(Exception):
+    """
+    Raised when no pooled database connection becomes available
+    within the configured checkout timeout.
+    """
+
+    def __init__(self, timeout=None, message=None):
+        if message is None:
+            if timeout is None:
+                message = "Timed out waiting for a database connection."
+            else:
+                message = f"Timed out after {timeout}s waiting for a database connection."
+        super().__init__(message)
+        self.timeout = timeout
@@ -0,0 +1,16 @@
+# myexceptions/idempotency_key_conflict_exception.py
+
+class IdempotencyKeyConflictException(ValueError):
+    """
+    Raised when an idempotency key (dbo.orders.request_key) was already
+    used for another customer's order. Keys are unique across customers,
+    so nothing is placed and the other customer's order is not revealed;
+    it subclasses ValueError so "cannot place order" handling applies.
+    """
+
+    def __init__(self, key=None, customer_id=None, message=None):
+        if message is None:
+            message = f"Idempotency key {key!r} was already used by another customer."
+        super().__init__(message)
+        self.key = key
+        self.customer_id = customer_id
@@ -0,0 +1,21 @@
+# myexceptions/insufficient_stock_exception.py
+
+class InsufficientStockException(ValueError):
+    """
+    Raised when an order cannot reserve the stock it needs.
+    `result` is the ReservationResult describing which products were short
+    and how many units are still available; it subclasses ValueError so
+    existing "cannot place order" handling keeps working.
+    """
+
+    def __init__(self, result=None, message=None):
+        if message is None:
+            shortages = getattr(result, "shortages", None)
+            if shortages:
+                message = "Insufficient stock: " + ", ".join(
+                    f"product_id={s.product_id} have {s.available}, need {s.requested}" for s in shortages
+                )
+            else:
+                message = "Insufficient stock."
+        super().__init__(message)
+        self.result = result
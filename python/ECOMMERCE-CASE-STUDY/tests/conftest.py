@@ -0,0 +1,94 @@
+# tests/conftest.py
+"""
+Shared fixtures: repositories on a scratch SQLite database built from
+config/db-sqlite.properties, so the suite runs without SQL Server.
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from dao.order_processor_repository_impl import OrderProcessorRepositoryImpl   # noqa: E402
+from entity.customer import Customer                                          # noqa: E402
+from entity.product import Product                                            # noqa: E402
+from util.db_connection import DBConnection                                   # noqa: E402
+
+_SCHEMA = os.path.normpath(os.path.join(ROOT, "..", "..", "sql", "ecommerce-case-study-sqlite.sql"))
+
+
+def write_properties(path: str, **overrides: str) -> str:
+    """
+    config/db-sqlite.properties with `overrides` replacing (or adding) keys.
+    """
+    with open(os.path.join(ROOT, "config", "db-sqlite.properties"), encoding="utf-8") as f:
+        lines = [line for line in f.read().splitlines()
+                 if line.split("=", 1)[0].strip().lower() not in overrides]
+    lines += [f"{key}={value}" for key, value in overrides.items()]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+
+@pytest.fixture
+def sqlite_props(tmp_path):
+    """
+    props(**overrides) -> path of a property file for this test's scratch
+    database; every file it returns points at the same database.
+    """
+    made = []
+
+    def props(**overrides: str) -> str:
+        overrides = {"database": str(tmp_path / "ecom.sqlite3"), "sqlite_schema": _SCHEMA,
+                     "cart_log": str(tmp_path / "cart-writes.log"), **overrides}
+        made.append(write_properties(str(tmp_path / f"db-{len(made)}.properties"), **overrides))
+        return made[-1]
+
+    yield props
+    for path in made:
+        pool = DBConnection._pools.pop(path, None)
+        if pool is not None:
+            pool.close()
+        router = DBConnection._routers.pop(path, None)
+        if router is not None:
+            router.close()
+
+
+@pytest.fixture
+def make_repo(sqlite_props):
+    """
+    make_repo(own_carts=True, key_cleanup=False, **properties) ->
+    OrderProcessorRepositoryImpl on the scratch database; background parts
+    are closed afterwards.
+    """
+    repos = []
+
+    def make(own_carts: bool = True, key_cleanup: bool = False, **overrides: str) -> OrderProcessorRepositoryImpl:
+        repos.append(OrderProcessorRepositoryImpl(sqlite_props(**overrides), own_carts=own_carts,
+                                                  key_cleanup=key_cleanup))
+        return repos[-1]
+
+    yield make
+    for repo in repos:
+        for part in (repo.carts, repo.group_commit):
+            if part is not None:
+                part.close()
+        if repo.key_janitor is not None:
+            repo.key_janitor.stop()
+
+
+def new_customer(repo, name: str = "test") -> Customer:
+    customer = Customer(name=name, email=f"{name}-{id(repo)}-{os.urandom(4).hex()}@example.com", password="x")
+    repo.createCustomer(customer)
+    return customer
+
+
+def new_product(repo, name: str = "widget", price: float = 2.0, stock: int = 100) -> Product:
+    product = Product(name=name, price=price, description=None, stockQuantity=stock)
+    repo.createProduct(product)
+    return product
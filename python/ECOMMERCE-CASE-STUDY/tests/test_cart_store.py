@@ -0,0 +1,44 @@
+# tests/test_cart_store.py
+import pytest
+
+from conftest import new_customer, new_product
+
+
+def _cart(repo, customer):
+    return [(product.product_id, qty) for product, qty in repo.getAllFromCart(customer)]
+
+
+def test_failed_deletes_keep_memory_carts(make_repo):
+    repo = make_repo(cart_store="memory", cart_flush_ms="60000")
+    customer, product = new_customer(repo), new_product(repo)
+    repo.placeOrder(customer, [(product, 1)], "addr")     # orders now reference both rows
+    repo.addToCart(customer, product, 3)                   # pending in memory only
+
+    with pytest.raises(repo.dialect.IntegrityError):
+        repo.deleteProduct(product.product_id)
+    with pytest.raises(repo.dialect.IntegrityError):
+        repo.deleteCustomer(customer.customer_id)
+
+    assert _cart(repo, customer) == [(product.product_id, 3)]
+    repo.carts.flush()
+    assert _cart(make_repo(own_carts=False), customer) == [(product.product_id, 3)]
+
+
+def test_delete_drops_product_from_memory_carts(make_repo):
+    repo = make_repo(cart_store="memory", cart_flush_ms="60000")
+    customer, kept, deleted = new_customer(repo), new_product(repo, "kept"), new_product(repo, "deleted")
+    repo.addToCart(customer, kept, 1)
+    repo.addToCart(customer, deleted, 2)
+
+    assert repo.deleteProduct(deleted.product_id)
+
+    assert _cart(repo, customer) == [(kept.product_id, 1)]
+    repo.carts.flush()
+    assert _cart(make_repo(own_carts=False), customer) == [(kept.product_id, 1)]
+
+
+def test_second_owner_of_cart_log_is_refused(make_repo):
+    make_repo(cart_store="memory")
+    with pytest.raises(RuntimeError, match="owned by another process"):
+        make_repo(cart_store="memory")
+    assert make_repo(own_carts=False, cart_store="memory").carts is None
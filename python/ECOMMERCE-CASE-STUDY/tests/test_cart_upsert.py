@@ -0,0 +1,41 @@
+# tests/test_cart_upsert.py
+import threading
+
+from conftest import new_customer, new_product
+
+THREADS = 16
+ADDS = 25
+
+
+def _cart_rows(repo, customer_id):
+    with repo.pool.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT product_id, quantity FROM dbo.cart WHERE customer_id = ?", customer_id)
+            rows = [tuple(row) for row in cur.fetchall()]
+        conn.rollback()
+    return rows
+
+
+def test_concurrent_add_to_cart_sums_into_one_row(make_repo):
+    repo = make_repo(pool_max_size=str(THREADS))
+    customer, product = new_customer(repo), new_product(repo)
+    start = threading.Barrier(THREADS)
+    errors = []
+
+    def add(quantity: int) -> None:
+        start.wait()
+        try:
+            for _ in range(ADDS):
+                repo.addToCart(customer, product, quantity)
+        except Exception as e:      # reported below; a thread must not die silently
+            errors.append(e)
+
+    threads = [threading.Thread(target=add, args=(n % 3 + 1,)) for n in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    expected = sum(n % 3 + 1 for n in range(THREADS)) * ADDS
+    assert _cart_rows(repo, customer.customer_id) == [(product.product_id, expected)]
@@ -0,0 +1,30 @@
+# tests/test_idempotency.py
+import pytest
+
+from conftest import new_customer, new_product
+from dao.order_request import OrderRequest
+from myexceptions import IdempotencyKeyConflictException
+
+
+def test_key_replays_only_for_its_customer(make_repo):
+    repo = make_repo()
+    owner, other, product = new_customer(repo, "owner"), new_customer(repo, "other"), new_product(repo)
+    order_id = repo.placeOrderIdempotent(owner, [(product, 1)], "addr", "key-1")
+
+    assert repo.placeOrderIdempotent(owner, [(product, 1)], "addr", "key-1") == order_id
+    with pytest.raises(IdempotencyKeyConflictException):
+        repo.placeOrderIdempotent(other, [(product, 1)], "addr", "key-1")
+    repo.idempotency_keys.clear()       # answered from dbo.orders this time
+    with pytest.raises(IdempotencyKeyConflictException):
+        repo.placeOrderIdempotent(other, [(product, 1)], "addr", "key-1")
+
+    mine, theirs = repo.placeOrders([OrderRequest(owner.customer_id, [(product.product_id, 1)], "addr", "key-1"),
+                                     OrderRequest(other.customer_id, [(product.product_id, 1)], "addr", "key-1")])
+    assert (mine.order_id, mine.replayed) == (order_id, True)
+    assert theirs.order_id is None and isinstance(theirs.error, IdempotencyKeyConflictException)
+
+
+def test_key_cleanup_runs_only_where_requested(make_repo):
+    assert make_repo(idempotency_cleanup_interval="3600").key_janitor is None
+    assert make_repo(key_cleanup=True).key_janitor is None          # interval 0 by default
+    assert make_repo(key_cleanup=True, idempotency_cleanup_interval="3600").key_janitor is not None
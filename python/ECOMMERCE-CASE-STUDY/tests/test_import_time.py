@@ -0,0 +1,39 @@
+# tests/test_import_time.py
+"""
+Cold-start budgets from benchmarks/bench_import_time.py, in fresh
+interpreters. IMPORT_BUDGET_SCALE (default 1) multiplies every budget on
+slow machines.
+"""
+import os
+
+import pytest
+
+from benchmarks.bench_import_time import _TARGETS, _importtime, _measure
+
+RUNS = 3
+SCALE = float(os.environ.get("IMPORT_BUDGET_SCALE", "1"))
+_BUDGETS = {statement: budget for statement, budget, _ in _TARGETS}
+
+
+@pytest.fixture(scope="module")
+def startup():
+    return set(_importtime("pass"))
+
+
+def test_packages_import_within_budget(startup):
+    budget = sum(_BUDGETS[f"import {name}"] for name in ("dao", "util", "entity")) * SCALE
+    total, top, _ = _measure("import dao, util, entity", startup, RUNS)
+    assert total <= budget, f"{total:.1f} ms over {budget:g} ms; heaviest: {top[:5]}"
+
+
+@pytest.mark.parametrize("statement, budget, forbidden", _TARGETS, ids=[t[0] for t in _TARGETS])
+def test_target_within_budget_and_lazy(startup, statement, budget, forbidden):
+    total, top, loaded = _measure(statement, startup, RUNS)
+    assert sorted(loaded & set(forbidden)) == []
+    assert total <= budget * SCALE, f"{total:.1f} ms over {budget * SCALE:g} ms; heaviest: {top[:5]}"
+
+
+def test_import_dao_loads_no_driver_or_optional_features():
+    loaded = set(_importtime("import dao"))
+    assert not loaded & {"pyodbc", "dao.cart_store", "dao.product_search", "dao.sales_analytics",
+                         "dao.order_processor_repository_impl"}
@@ -0,0 +1,31 @@
+# tests/test_order_queue.py
+from dao.order_queue import OrderQueue
+
+
+def test_cart_checkout_is_queued_once_while_pending(tmp_path):
+    queue = OrderQueue(str(tmp_path / "checkout.sqlite3"))
+    try:
+        first, queued = queue.enqueue_cart(1, [(10, 2)], "addr")
+        assert queued
+        assert queue.enqueue_cart(1, [(10, 2)], "addr") == (first, False)
+
+        claimed = queue.claim("w1", limit=10, lease_seconds=60)
+        assert [o.ticket for o in claimed] == [first]
+        assert queue.enqueue_cart(1, [(10, 2)], "addr") == (first, False)      # processing
+
+        queue.complete([(first, 99)])
+        second, queued = queue.enqueue_cart(1, [(11, 1)], "addr")
+        assert queued and second != first
+        assert queue.enqueue_cart(2, [(10, 1)], "addr")[1]                    # other customers unaffected
+    finally:
+        queue.close()
+
+
+def test_plain_enqueue_allows_several_orders_per_customer(tmp_path):
+    queue = OrderQueue(str(tmp_path / "checkout.sqlite3"))
+    try:
+        tickets = {queue.enqueue(1, [(10, 1)], "addr") for _ in range(3)}
+        assert len(tickets) == 3
+        assert queue.stats()["queued"] == 3
+    finally:
+        queue.close()
@@ -0,0 +1,41 @@
+# tests/test_product_search.py
+import threading
+
+from conftest import new_product
+from dao.product_search import ProductSearchIndex
+
+
+def _names(repo, query):
+    return sorted(p.name for p in repo.searchProducts(query)[0])
+
+
+def test_refresh_picks_up_other_processes_products(make_repo):
+    repo = make_repo()
+    new_product(repo, "blue kettle")
+    assert _names(repo, "kettle") == ["blue kettle"]
+
+    new_product(make_repo(), "red kettle")         # another repository, as another process would
+    assert _names(repo, "kettle") == ["blue kettle"]
+    repo.refreshSearchIndex()
+    assert _names(repo, "kettle") == ["blue kettle", "red kettle"]
+
+
+def test_delete_during_refresh_stays_deleted(make_repo, monkeypatch):
+    repo = make_repo()
+    kept, deleted = new_product(repo, "kept lamp"), new_product(repo, "deleted lamp")
+    assert _names(repo, "lamp") == ["deleted lamp", "kept lamp"]
+    indexed = len(repo.search_index)
+    build = ProductSearchIndex.build
+
+    def build_after_delete(index, rows):
+        rows = list(rows)       # read before the delete commits ...
+        if index is repo._search_rebuild and any(row[0] == deleted.product_id for row in rows):
+            t = threading.Thread(target=repo.deleteProduct, args=(deleted.product_id,))
+            t.start()
+            t.join()
+        return build(index, rows)   # ... and indexed after its remove()
+
+    monkeypatch.setattr(ProductSearchIndex, "build", build_after_delete)
+    repo.refreshSearchIndex()
+    assert len(repo.search_index) == indexed - 1
+    assert repo.searchProducts("lamp")[1] == 1      # total counts index hits, not loaded rows
@@ -1,6 +1,30 @@
 # util/__init__.py
-from .property_util import DBPropertyUtil
-from .db_conn_util import DBConnUtil
-from .db_connection import DBConnection
+# Exports load on first access (PEP 562): importing util, or one of its
+# modules, does not pull in the pools, asyncio or the SQL Server driver.
+from importlib import import_module
 
-__all__ = ["DBPropertyUtil", "DBConnUtil", "DBConnection"]
+_EXPORTS = {
+    "DBPropertyUtil": ".property_util",
+    "DBConnUtil": ".db_conn_util",
+    "DBConnection": ".db_connection",
+    "ConnectionPool": ".connection_pool",
+    "PoolStats": ".connection_pool",
+    "AsyncConnectionPool": ".async_connection_pool",
+    "Instrumentation": ".instrumentation",
+    "SlowQueryLog": ".instrumentation",
+    "CallStats": ".instrumentation",
+    "ReplicaRouter": ".replica_router",
+}
+
+__all__ = ["DBPropertyUtil", "DBConnUtil", "DBConnection", "ConnectionPool", "PoolStats", "AsyncConnectionPool",
+           "Instrumentation", "SlowQueryLog", "CallStats", "ReplicaRouter"]
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = getattr(import_module(module, __name__), name)
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,94 @@
+# util/async_connection_pool.py
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from myexceptions import ConnectionPoolTimeoutException
+from util.connection_pool import ConnectionPool
+
+
+class AsyncConnectionPool:
+    """
+    asyncio front-end for a ConnectionPool.
+
+    Each unit of work is a blocking callable (a repository method, which
+    checks out its own connection) run on a worker thread. Admission is
+    gated by an asyncio.Semaphore sized to the pool, and there are as many
+    worker threads as slots, so a unit never waits inside the pool and
+    thousands of waiting coroutines cost no threads. A free slot is taken
+    without a timer; only a caller that has to queue waits under
+    checkout_timeout.
+
+    Cancellation-safe: a unit that has started cannot be interrupted; it
+    runs to its own commit or rollback on the worker thread, which keeps
+    its connection until then (a cancelled caller frees its slot, but the
+    thread count still bounds the connections in use). A unit cancelled
+    before it started never runs.
+
+    This is for event-loop callers: each call costs a thread hand-off, so
+    with the same concurrency the sync repository is faster, and with far
+    more clients than slots latency is queueing (clients / throughput).
+    """
+
+    def __init__(self, pool: ConnectionPool, max_concurrency: Optional[int] = None,
+                 checkout_timeout: Optional[float] = None):
+        self.pool = pool
+        # more slots than connections would only park threads inside the pool
+        self.max_concurrency = min(max_concurrency or pool.max_size, pool.max_size)
+        self.checkout_timeout = pool.checkout_timeout if checkout_timeout is None else checkout_timeout
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                            thread_name_prefix="async-db")
+        self._lock = threading.Lock()
+        self._semaphores: Dict[int, asyncio.Semaphore] = {}
+        self._waiting = 0
+        self._running = 0
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Runs fn(*args) on a worker thread once a slot is free.
+        """
+        sem = self._semaphore()
+        if sem.locked():
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(sem.acquire(), self.checkout_timeout)
+            except asyncio.TimeoutError:
+                raise ConnectionPoolTimeoutException(self.checkout_timeout) from None
+            finally:
+                self._waiting -= 1
+        else:
+            await sem.acquire()     # returns at once, no timer task
+
+        self._running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._running -= 1
+            sem.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "waiting": self._waiting,
+            "running": self._running,
+            "max_concurrency": self.max_concurrency,
+            "pool": self.pool.stats().as_dict(),
+        }
+
+    def close(self) -> None:
+        """
+        Waits for running units of work and stops the worker threads.
+        """
+        self._executor.shutdown(wait=True)
+
+    # ---------- internals ----------
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # one semaphore per event loop (asyncio primitives are loop-bound)
+        key = id(asyncio.get_running_loop())
+        with self._lock:
+            sem = self._semaphores.get(key)
+            if sem is None:
+                sem = asyncio.Semaphore(self.max_concurrency)
+                self._semaphores[key] = sem
+            return sem
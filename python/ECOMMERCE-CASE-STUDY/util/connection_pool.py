@@ -0,0 +1,434 @@
+# util/connection_pool.py
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from myexceptions import ConnectionPoolTimeoutException
+
+# Upper bounds (milliseconds) of the checkout latency histogram buckets.
+DEFAULT_LATENCY_BUCKETS_MS: Tuple[float, ...] = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+def _as_float(props: Dict[str, str], key: str, default: float) -> float:
+    value = props.get(key)
+    return float(value) if value not in (None, "") else default
+
+
+def _as_int(props: Dict[str, str], key: str, default: int) -> int:
+    value = props.get(key)
+    return int(value) if value not in (None, "") else default
+
+
+class _PoolEntry:
+    """
+    Book-keeping for one physical connection owned by the pool.
+    """
+
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn: Any, now: float):
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+
+
+class PoolStats:
+    """
+    Point-in-time snapshot of pool usage, meant for sizing the pool.
+    """
+
+    def __init__(self,
+                 size: int,
+                 idle: int,
+                 in_use: int,
+                 waiters: int,
+                 max_size: int,
+                 checkouts: int,
+                 timeouts: int,
+                 created: int,
+                 discarded: int,
+                 health_check_failures: int,
+                 latency_histogram: List[Tuple[float, int]],
+                 total_checkout_ms: float):
+        self.size = size
+        self.idle = idle
+        self.in_use = in_use
+        self.waiters = waiters
+        self.max_size = max_size
+        self.checkouts = checkouts
+        self.timeouts = timeouts
+        self.created = created
+        self.discarded = discarded
+        self.health_check_failures = health_check_failures
+        # [(upper_bound_ms, count)], last bucket has upper bound float("inf")
+        self.latency_histogram = latency_histogram
+        self.total_checkout_ms = total_checkout_ms
+
+    @property
+    def mean_checkout_ms(self) -> float:
+        return self.total_checkout_ms / self.checkouts if self.checkouts else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "idle": self.idle,
+            "in_use": self.in_use,
+            "waiters": self.waiters,
+            "max_size": self.max_size,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "created": self.created,
+            "discarded": self.discarded,
+            "health_check_failures": self.health_check_failures,
+            "mean_checkout_ms": self.mean_checkout_ms,
+            "latency_histogram": [
+                {"le_ms": bound, "count": count} for bound, count in self.latency_histogram
+            ],
+        }
+
+    def __repr__(self) -> str:
+        return (f"PoolStats(size={self.size}, idle={self.idle}, in_use={self.in_use}, "
+                f"waiters={self.waiters}, checkouts={self.checkouts}, timeouts={self.timeouts})")
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of DB-API connections.
+
+    - min_size / max_size: idle eviction never shrinks below min_size and
+      at most max_size connections are open at any time.
+    - checkout_timeout: seconds to wait for a free connection before
+      ConnectionPoolTimeoutException is raised.
+    - health checks: a connection idle for longer than validate_after seconds
+      is validated with health_check_query before being handed out.
+    - idle_timeout / max_lifetime: idle connections are closed after
+      idle_timeout seconds and every connection is recycled once it is older
+      than max_lifetime seconds (0 disables either).
+
+    The `connect` factory is any zero-argument callable returning a DB-API
+    connection, so the pool works the same with pyodbc or sqlite3.
+    `dialect` (a dao.dialect.Dialect) records which SQL those connections
+    speak and `instrumentation` (util.instrumentation) the hooks wrapping
+    them; the pool itself never looks at either.
+    """
+
+    def __init__(self,
+                 connect: Callable[[], Any],
+                 min_size: int = 1,
+                 max_size: int = 10,
+                 checkout_timeout: float = 30.0,
+                 idle_timeout: float = 300.0,
+                 max_lifetime: float = 1800.0,
+                 validate_after: float = 1.0,
+                 health_check_query: Optional[str] = "SELECT 1",
+                 latency_buckets_ms: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS_MS,
+                 dialect: Optional[Any] = None,
+                 instrumentation: Optional[Any] = None):
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        if min_size < 0 or min_size > max_size:
+            raise ValueError("min_size must be between 0 and max_size")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.validate_after = validate_after
+        self.health_check_query = health_check_query
+        self.dialect = dialect
+        self.instrumentation = instrumentation
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle: Deque[_PoolEntry] = deque()      # most recently used on the right
+        self._in_use: Dict[int, _PoolEntry] = {}
+        self._size = 0                               # open + being opened
+        self._waiters = 0
+        self._closed = False
+        self._local = threading.local()
+
+        # stats
+        self._buckets = tuple(latency_buckets_ms)
+        self._bucket_counts = [0] * (len(self._buckets) + 1)
+        self._checkouts = 0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+        self._health_check_failures = 0
+        self._total_checkout_ms = 0.0
+
+    @classmethod
+    def from_properties(cls, props: Dict[str, str], connect: Callable[[], Any],
+                        dialect: Optional[Any] = None,
+                        instrumentation: Optional[Any] = None) -> "ConnectionPool":
+        """
+        Builds a pool from the pool_* keys of a parsed db.properties file.
+        """
+        query = props.get("pool_health_check_query", "SELECT 1")
+        return cls(
+            connect,
+            min_size=_as_int(props, "pool_min_size", 1),
+            max_size=_as_int(props, "pool_max_size", 10),
+            checkout_timeout=_as_float(props, "pool_checkout_timeout", 30.0),
+            idle_timeout=_as_float(props, "pool_idle_timeout", 300.0),
+            max_lifetime=_as_float(props, "pool_max_lifetime", 1800.0),
+            validate_after=_as_float(props, "pool_validate_after", 1.0),
+            health_check_query=query or None,
+            dialect=dialect,
+            instrumentation=instrumentation,
+        )
+
+    # ---------- checkout / return ----------
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """
+        Checks out a connection, waiting up to `timeout` seconds
+        (defaults to checkout_timeout).
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            entry, create, stale = self._reserve(deadline, timeout)
+            self._close_entries(stale)
+
+            if create:
+                try:
+                    conn = self._connect()
+                except BaseException:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                entry = _PoolEntry(conn, time.monotonic())
+                with self._cond:
+                    self._created += 1
+            elif not self._is_healthy(entry):
+                with self._cond:
+                    self._health_check_failures += 1
+                self._discard(entry)
+                continue
+
+            now = time.monotonic()
+            with self._cond:
+                self._in_use[id(entry.conn)] = entry
+                self._record_checkout((now - started) * 1000.0)
+            return entry.conn
+
+    def release(self, conn: Any, discard: bool = False) -> None:
+        """
+        Returns a connection to the pool. Any open transaction is rolled back;
+        broken or over-age connections are closed instead of being reused.
+        """
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+        if entry is None:
+            raise ValueError("Connection does not belong to this pool or was already released.")
+
+        if not discard:
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
+
+        now = time.monotonic()
+        if discard or self._closed or self._expired(entry, now):
+            self._discard(entry)
+            return
+
+        entry.last_used = now
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+            stale = self._collect_idle(now)
+        self._close_entries(stale)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """
+        Context manager for one unit of work. Re-entrant per thread: nested
+        blocks reuse the connection already checked out by the outer block.
+        """
+        held = getattr(self._local, "held", None)
+        if held is not None:
+            held[1] += 1
+            try:
+                yield held[0]
+            finally:
+                held[1] -= 1
+            return
+
+        conn = self.acquire()
+        self._local.held = [conn, 1]
+        broken = False
+        try:
+            yield conn
+        except BaseException as e:
+            broken = not isinstance(e, Exception)
+            raise
+        finally:
+            self._local.held = None
+            self.release(conn, discard=broken)
+
+    # ---------- maintenance ----------
+
+    def warm_up(self) -> None:
+        """
+        Opens connections until min_size are available.
+        """
+        conns = [self.acquire() for _ in range(max(self.min_size - self.size, 0))]
+        for conn in conns:
+            self.release(conn)
+
+    def evict_idle(self) -> int:
+        """
+        Closes idle connections past idle_timeout / max_lifetime; returns the count.
+        """
+        with self._cond:
+            stale = self._collect_idle(time.monotonic())
+        self._close_entries(stale)
+        return len(stale)
+
+    def close(self) -> None:
+        """
+        Closes idle connections; checked-out ones are closed when released.
+        """
+        with self._cond:
+            self._closed = True
+            stale = list(self._idle)
+            self._idle.clear()
+            self._size -= len(stale)
+            self._discarded += len(stale)
+            self._cond.notify_all()
+        self._close_entries(stale)
+
+    @property
+    def size(self) -> int:
+        with self._cond:
+            return self._size
+
+    @property
+    def in_use(self) -> int:
+        with self._cond:
+            return len(self._in_use)
+
+    def holds_connection(self) -> bool:
+        """
+        True inside a connection() block on the calling thread.
+        """
+        return getattr(self._local, "held", None) is not None
+
+    def stats(self) -> PoolStats:
+        with self._cond:
+            bounds = list(self._buckets) + [float("inf")]
+            return PoolStats(
+                size=self._size,
+                idle=len(self._idle),
+                in_use=len(self._in_use),
+                waiters=self._waiters,
+                max_size=self.max_size,
+                checkouts=self._checkouts,
+                timeouts=self._timeouts,
+                created=self._created,
+                discarded=self._discarded,
+                health_check_failures=self._health_check_failures,
+                latency_histogram=list(zip(bounds, self._bucket_counts)),
+                total_checkout_ms=self._total_checkout_ms,
+            )
+
+    # ---------- internals (callers hold no lock unless noted) ----------
+
+    def _reserve(self, deadline: float, timeout: float) -> Tuple[Optional[_PoolEntry], bool, List[_PoolEntry]]:
+        """
+        Waits for an idle entry or a free slot. Returns (entry, create, stale).
+        """
+        stale: List[_PoolEntry] = []
+        with self._cond:
+            self._waiters += 1
+            try:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Connection pool is closed.")
+                    now = time.monotonic()
+                    while self._idle:
+                        entry = self._idle.pop()
+                        if self._expired(entry, now):
+                            self._size -= 1
+                            self._discarded += 1
+                            stale.append(entry)
+                            continue
+                        return entry, False, stale
+                    if self._size < self.max_size:
+                        self._size += 1
+                        return None, True, stale
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise ConnectionPoolTimeoutException(timeout)
+                    self._cond.wait(remaining)
+            finally:
+                self._waiters -= 1
+
+    def _expired(self, entry: _PoolEntry, now: float) -> bool:
+        return bool(self.max_lifetime) and now - entry.created_at >= self.max_lifetime
+
+    def _collect_idle(self, now: float) -> List[_PoolEntry]:
+        # caller holds self._cond; oldest idle entries sit on the left
+        stale: List[_PoolEntry] = []
+        keep: Deque[_PoolEntry] = deque()
+        for entry in self._idle:
+            idle_too_long = bool(self.idle_timeout) and now - entry.last_used >= self.idle_timeout
+            if self._expired(entry, now) or (idle_too_long and self._size - len(stale) > self.min_size):
+                stale.append(entry)
+            else:
+                keep.append(entry)
+        if stale:
+            self._idle = keep
+            self._size -= len(stale)
+            self._discarded += len(stale)
+        return stale
+
+    def _is_healthy(self, entry: _PoolEntry) -> bool:
+        if not self.health_check_query:
+            return True
+        if time.monotonic() - entry.last_used < self.validate_after:
+            return True
+        try:
+            cur = entry.conn.cursor()
+            try:
+                cur.execute(self.health_check_query)
+                cur.fetchall()
+            finally:
+                cur.close()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, entry: _PoolEntry) -> None:
+        with self._cond:
+            self._size -= 1
+            self._discarded += 1
+            self._cond.notify()
+        self._close_entries([entry])
+
+    @staticmethod
+    def _close_entries(entries: List[_PoolEntry]) -> None:
+        for entry in entries:
+            try:
+                entry.conn.close()
+            except Exception:
+                pass
+
+    def _record_checkout(self, elapsed_ms: float) -> None:
+        # caller holds self._cond
+        self._checkouts += 1
+        self._total_checkout_ms += elapsed_ms
+        for i, bound in enumerate(self._buckets):
+            if elapsed_ms <= bound:
+                self._bucket_counts[i] += 1
+                return
+        self._bucket_counts[-1] += 1
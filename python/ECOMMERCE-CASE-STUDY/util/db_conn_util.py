@@ -1,15 +1,32 @@
 # util/db_conn_util.py
-import pyodbc
-from typing import Optional
+from typing import Any, Optional
 
 class DBConnUtil:
     """
     Returns a live pyodbc connection given a connection string.
+    pyodbc is imported on the first SQL Server connection, not with util.
     """
+    _pyodbc: Any = None
 
     @staticmethod
-    def get_connection(conn_str: Optional[str]) -> pyodbc.Connection:
+    def driver() -> Optional[Any]:
+        """
+        The pyodbc module, or None when it is not installed (dialect=sqlite needs none).
+        """
+        if DBConnUtil._pyodbc is None:
+            try:
+                import pyodbc
+            except ImportError:
+                return None
+            DBConnUtil._pyodbc = pyodbc
+        return DBConnUtil._pyodbc
+
+    @staticmethod
+    def get_connection(conn_str: Optional[str]) -> Any:
         if not conn_str or not conn_str.strip():
             raise ValueError("A valid connection string is required.")
+        pyodbc = DBConnUtil.driver()
+        if pyodbc is None:
+            raise ImportError("pyodbc is required for SQL Server connections (pip install pyodbc).")
         # autocommit=False so DAO methods can control transactions explicitly
         return pyodbc.connect(conn_str, autocommit=False)
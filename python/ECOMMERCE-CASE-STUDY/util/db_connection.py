@@ -1,21 +1,41 @@
 # util/db_connection.py
 import threading
-import pyodbc
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 from util.property_util import DBPropertyUtil
 from util.db_conn_util import DBConnUtil
+from util.connection_pool import ConnectionPool
+from util.instrumentation import Instrumentation
+from util.statement_cache import CachingConnection
+
+if TYPE_CHECKING:
+    from util.replica_router import ReplicaRouter
 
 class DBConnection:
     """
     Singleton-style provider to get one shared connection.
     Call DBConnection.get_connection("config/db.properties")
+
+    DBConnection.get_pool("config/db.properties") returns the shared
+    ConnectionPool for that property file; repositories check out a
+    connection from it per unit of work. The backend is chosen by the
+    `dialect` property (sqlserver or sqlite) and kept on pool.dialect;
+    with `instrumentation=yes` its connections report statement timings
+    to pool.instrumentation, and each connection keeps up to
+    `statement_cache_size` reusable statement cursors (default: the
+    dialect's, on for SQL Server only).
+
+    DBConnection.get_router(prop_file) returns the ReplicaRouter over the
+    file's `replica.<n>.*` read replicas (util.replica_router), or None
+    when it configures none. Like the pool, it connects on first use.
     """
     _lock = threading.Lock()
-    _conn: Optional[pyodbc.Connection] = None
+    _conn: Optional[Any] = None
     _last_prop_file: Optional[str] = None
+    _pools: Dict[str, ConnectionPool] = {}
+    _routers: Dict[str, Optional["ReplicaRouter"]] = {}
 
     @staticmethod
-    def get_connection(prop_file: str = "config/db.properties") -> pyodbc.Connection:
+    def get_connection(prop_file: str = "config/db.properties") -> Any:
         if DBConnection._conn is None or DBConnection._last_prop_file != prop_file:
             with DBConnection._lock:
                 if DBConnection._conn is None or DBConnection._last_prop_file != prop_file:
@@ -23,3 +43,54 @@ class DBConnection:
                     DBConnection._conn = DBConnUtil.get_connection(conn_str)
                     DBConnection._last_prop_file = prop_file
         return DBConnection._conn
+
+    @staticmethod
+    def get_pool(prop_file: str = "config/db.properties") -> ConnectionPool:
+        pool = DBConnection._pools.get(prop_file)
+        if pool is None:
+            with DBConnection._lock:
+                pool = DBConnection._pools.get(prop_file)
+                if pool is None:
+                    props = DBPropertyUtil.get_properties(prop_file)
+                    pool = DBConnection._build_pool(props, Instrumentation.from_properties(props))
+                    DBConnection._pools[prop_file] = pool
+        return pool
+
+    @staticmethod
+    def get_router(prop_file: str = "config/db.properties") -> Optional["ReplicaRouter"]:
+        if prop_file not in DBConnection._routers:
+            primary = DBConnection.get_pool(prop_file)
+            with DBConnection._lock:
+                if prop_file not in DBConnection._routers:
+                    props = DBPropertyUtil.get_properties(prop_file)
+                    router = None
+                    if any(key.startswith("replica.") for key in props):    # else skip the import
+                        router = DBConnection._build_router(props, primary)
+                    DBConnection._routers[prop_file] = router
+        return DBConnection._routers[prop_file]
+
+    @staticmethod
+    def _build_router(props: Dict[str, str], primary: ConnectionPool) -> Optional["ReplicaRouter"]:
+        from util.replica_router import ReplicaRouter, replica_properties
+        # replica statements report to the primary's listeners
+        router = ReplicaRouter.from_properties(
+            props, primary, lambda p: DBConnection._build_pool(p, primary.instrumentation))
+        if router is not None:
+            def start() -> None:
+                primary.warm_up()       # primary schema exists before the first copy
+                stop = primary.dialect.start_replication(props, replica_properties(props))
+                if stop is not None:
+                    router.on_close(stop)
+            router.on_start(start)
+        return router
+
+    @staticmethod
+    def _build_pool(props: Dict[str, str], instrumentation: Optional[Instrumentation]) -> ConnectionPool:
+        from dao.dialect import get_dialect     # dao imports util; resolve lazily
+        dialect = get_dialect(props)
+        connect = lambda: dialect.connect(props)
+        if instrumentation is not None:
+            connect = instrumentation.wrap_connect(connect)
+        connect = CachingConnection.wrap_connect(
+            connect, int(props.get("statement_cache_size") or dialect.statement_cache_size))
+        return ConnectionPool.from_properties(props, connect, dialect=dialect, instrumentation=instrumentation)
@@ -0,0 +1,338 @@
+# util/instrumentation.py
+"""
+Statement-level instrumentation for pooled connections.
+
+When enabled, every pooled connection is wrapped so each execute, commit
+and rollback is timed and reported to listeners:
+
+    StatementEvent    one execute/executemany: SQL, duration, rowcount, error
+    TransactionEvent  first statement -> commit/rollback: duration, statements
+    CallEvent         one repository call: duration, round trips, commits
+
+Listeners are plain callables taking an event; SlowQueryLog and CallStats
+are ready-made ones. When instrumentation is off nothing is wrapped, so
+the cost is zero.
+
+db.properties:
+    instrumentation=yes       wrap connections (default no)
+    slow_query_ms=100         log statements slower than this to the
+                              "ecommerce.slow_query" logger (0 = off)
+"""
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+_log = logging.getLogger(__name__)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _one_line(sql: str, limit: int = 500) -> str:
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    return sql if len(sql) <= limit else sql[:limit] + "..."
+
+
+class StatementEvent:
+    __slots__ = ("sql", "param_count", "duration_ms", "rowcount", "operation", "error")
+
+    def __init__(self, sql: str, param_count: int, duration_ms: float, rowcount: int,
+                 operation: Optional[str], error: Optional[BaseException] = None):
+        self.sql = sql
+        self.param_count = param_count
+        self.duration_ms = duration_ms
+        self.rowcount = rowcount
+        self.operation = operation
+        self.error = error
+
+    def __repr__(self) -> str:
+        return (f"StatementEvent(operation={self.operation}, duration_ms={self.duration_ms:.3f}, "
+                f"rowcount={self.rowcount}, sql={_one_line(self.sql, 80)!r})")
+
+
+class TransactionEvent:
+    __slots__ = ("outcome", "duration_ms", "statements", "operation")
+
+    def __init__(self, outcome: str, duration_ms: float, statements: int, operation: Optional[str]):
+        self.outcome = outcome            # "commit" or "rollback"
+        self.duration_ms = duration_ms
+        self.statements = statements
+        self.operation = operation
+
+    def __repr__(self) -> str:
+        return (f"TransactionEvent(operation={self.operation}, outcome={self.outcome}, "
+                f"duration_ms={self.duration_ms:.3f}, statements={self.statements})")
+
+
+class CallEvent:
+    __slots__ = ("operation", "duration_ms", "statements", "commits", "error")
+
+    def __init__(self, operation: str, duration_ms: float, statements: int, commits: int,
+                 error: Optional[BaseException] = None):
+        self.operation = operation
+        self.duration_ms = duration_ms
+        self.statements = statements      # round trips
+        self.commits = commits
+        self.error = error
+
+    def __repr__(self) -> str:
+        return (f"CallEvent(operation={self.operation}, duration_ms={self.duration_ms:.3f}, "
+                f"statements={self.statements}, commits={self.commits})")
+
+
+class _CallState:
+    __slots__ = ("operation", "depth", "statements", "commits")
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.depth = 0
+        self.statements = 0
+        self.commits = 0
+
+
+class Instrumentation:
+    """
+    Listener registry plus the connection wrapper. Repository calls are
+    attributed with `call(name)`; nested calls (placeOrder reading the cart)
+    roll up into the outermost one.
+    """
+
+    def __init__(self, slow_query_ms: float = 0.0):
+        self._listeners: List[Callable[[Any], None]] = []
+        self._local = threading.local()
+        if slow_query_ms > 0:
+            self.add_listener(SlowQueryLog(slow_query_ms))
+
+    @classmethod
+    def from_properties(cls, props: Dict[str, str]) -> Optional["Instrumentation"]:
+        """
+        An Instrumentation if `instrumentation` is on, else None.
+        """
+        if props.get("instrumentation", "no").lower() not in ("yes", "true", "1"):
+            return None
+        return cls(slow_query_ms=float(props.get("slow_query_ms", "0") or 0))
+
+    def add_listener(self, listener: Callable[[Any], None]) -> None:
+        self._listeners = self._listeners + [listener]      # copy-on-write: emit() never locks
+
+    def remove_listener(self, listener: Callable[[Any], None]) -> None:
+        self._listeners = [l for l in self._listeners if l is not listener]
+
+    def emit(self, event: Any) -> None:
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception:
+                _log.exception("instrumentation listener %r failed", listener)
+
+    def wrap(self, conn: Any) -> "InstrumentedConnection":
+        return InstrumentedConnection(conn, self)
+
+    def wrap_connect(self, connect: Callable[[], Any]) -> Callable[[], Any]:
+        """
+        Connection factory for ConnectionPool whose connections are instrumented.
+        """
+        return lambda: InstrumentedConnection(connect(), self)
+
+    @contextmanager
+    def call(self, operation: str) -> Iterator[None]:
+        state: Optional[_CallState] = getattr(self._local, "call", None)
+        if state is not None:               # nested: counted in the outer call
+            state.depth += 1
+            try:
+                yield
+            finally:
+                state.depth -= 1
+            return
+
+        state = self._local.call = _CallState(operation)
+        started = time.perf_counter()
+        error: Optional[BaseException] = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._local.call = None
+            self.emit(CallEvent(operation, (time.perf_counter() - started) * 1000.0,
+                                state.statements, state.commits, error))
+
+    def wrap_method(self, operation: str, method: Callable[..., Any]) -> Callable[..., Any]:
+        def instrumented(*args, **kwargs):
+            with self.call(operation):
+                return method(*args, **kwargs)
+        instrumented.__name__ = getattr(method, "__name__", operation)
+        instrumented.__doc__ = getattr(method, "__doc__", None)
+        return instrumented
+
+    # ---------- used by the wrappers ----------
+
+    def _current(self) -> Optional[_CallState]:
+        return getattr(self._local, "call", None)
+
+
+class InstrumentedCursor:
+    """
+    Cursor proxy timing execute/executemany.
+    """
+    __slots__ = ("_cur", "_conn")
+
+    def __init__(self, cur: Any, conn: "InstrumentedConnection"):
+        object.__setattr__(self, "_cur", cur)
+        object.__setattr__(self, "_conn", conn)
+
+    def execute(self, sql: str, *params: Any):
+        return self._run(self._cur.execute, sql, params, len(params))
+
+    def executemany(self, sql: str, seq_of_params):
+        seq_of_params = list(seq_of_params)
+        return self._run(self._cur.executemany, sql, (seq_of_params,), len(seq_of_params))
+
+    def _run(self, fn: Callable[..., Any], sql: str, params: tuple, param_count: int):
+        conn = self._conn
+        instr = conn._instr
+        state = instr._current()
+        if conn._txn_started is None:
+            conn._txn_started = time.perf_counter()
+        started = time.perf_counter()
+        error: Optional[BaseException] = None
+        try:
+            fn(sql, *params)
+            return self
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            duration = (time.perf_counter() - started) * 1000.0
+            conn._txn_statements += 1
+            if state is not None:
+                state.statements += 1
+            rowcount = getattr(self._cur, "rowcount", -1)
+            instr.emit(StatementEvent(sql, param_count, duration, rowcount,
+                                      state.operation if state else None, error))
+
+    def __getattr__(self, name: str):
+        return getattr(self._cur, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._cur, name, value)
+
+    def __iter__(self):
+        return iter(self._cur)
+
+    def __enter__(self) -> "InstrumentedCursor":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self._cur.close()
+        return False
+
+
+class InstrumentedConnection:
+    """
+    Connection proxy handing out InstrumentedCursor and timing transactions
+    from their first statement to commit/rollback.
+    """
+    __slots__ = ("_conn", "_instr", "_txn_started", "_txn_statements")
+
+    def __init__(self, conn: Any, instr: Instrumentation):
+        self._conn = conn
+        self._instr = instr
+        self._txn_started: Optional[float] = None
+        self._txn_statements = 0
+
+    def cursor(self) -> InstrumentedCursor:
+        return InstrumentedCursor(self._conn.cursor(), self)
+
+    def commit(self) -> None:
+        state = self._instr._current()
+        if state is not None:
+            state.commits += 1
+        try:
+            self._conn.commit()
+        finally:
+            self._end("commit", state)
+
+    def rollback(self) -> None:
+        try:
+            self._conn.rollback()
+        finally:
+            self._end("rollback", self._instr._current())
+
+    def _end(self, outcome: str, state: Optional[_CallState]) -> None:
+        if self._txn_started is None:
+            return
+        duration = (time.perf_counter() - self._txn_started) * 1000.0
+        statements = self._txn_statements
+        self._txn_started = None
+        self._txn_statements = 0
+        self._instr.emit(TransactionEvent(outcome, duration, statements, state.operation if state else None))
+
+    def __getattr__(self, name: str):
+        return getattr(self._conn, name)
+
+
+class SlowQueryLog:
+    """
+    Listener logging statements slower than threshold_ms as warnings.
+    """
+
+    def __init__(self, threshold_ms: float, logger: Optional[logging.Logger] = None):
+        self.threshold_ms = threshold_ms
+        self.logger = logger or logging.getLogger("ecommerce.slow_query")
+
+    def __call__(self, event: Any) -> None:
+        if isinstance(event, StatementEvent) and event.duration_ms >= self.threshold_ms:
+            self.logger.warning(
+                "slow statement %.1f ms (rows=%s, op=%s%s): %s",
+                event.duration_ms, event.rowcount, event.operation,
+                f", error={event.error!r}" if event.error else "",
+                _one_line(event.sql),
+            )
+
+
+class CallStats:
+    """
+    Listener aggregating CallEvents and StatementEvents in memory:
+    per-operation call count, round trips and latency, and the statements
+    with the largest total time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: Dict[str, List[float]] = {}          # op -> [count, statements, commits, total_ms]
+        self.statements: Dict[str, List[float]] = {}     # sql -> [count, total_ms, max_ms]
+
+    def __call__(self, event: Any) -> None:
+        if isinstance(event, CallEvent):
+            with self._lock:
+                s = self.calls.setdefault(event.operation, [0, 0, 0, 0.0])
+                s[0] += 1
+                s[1] += event.statements
+                s[2] += event.commits
+                s[3] += event.duration_ms
+        elif isinstance(event, StatementEvent):
+            key = _one_line(event.sql, 200)
+            with self._lock:
+                s = self.statements.setdefault(key, [0, 0.0, 0.0])
+                s[0] += 1
+                s[1] += event.duration_ms
+                s[2] = max(s[2], event.duration_ms)
+
+    def per_call(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {"operation": op, "calls": int(n), "statements_per_call": st / n,
+                 "commits_per_call": cm / n, "mean_ms": ms / n}
+                for op, (n, st, cm, ms) in sorted(self.calls.items())
+            ]
+
+    def top_statements(self, limit: int = 10) -> List[Dict[str, Any]]:
+        with self._lock:
+            ranked = sorted(self.statements.items(), key=lambda kv: kv[1][1], reverse=True)[:limit]
+        return [
+            {"sql": sql, "count": int(n), "total_ms": total, "mean_ms": total / n, "max_ms": mx}
+            for sql, (n, total, mx) in ranked
+        ]
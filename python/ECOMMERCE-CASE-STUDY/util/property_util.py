@@ -67,6 +67,7 @@
 #         return ";".join(parts)
 # util/property_util.py
 import os
+from typing import Dict
 
 class DBPropertyUtil:
     """
@@ -84,11 +85,14 @@ class DBPropertyUtil:
     """
 
     @staticmethod
-    def get_property_string(file_name: str) -> str:
+    def get_properties(file_name: str) -> Dict[str, str]:
+        """
+        Parses the property file into a dict with lower-cased keys.
+        """
         if not os.path.isfile(file_name):
             raise FileNotFoundError(f"Property file not found: {file_name}")
 
-        props = {}
+        props: Dict[str, str] = {}
         with open(file_name, "r", encoding="utf-8") as f:
             for line in f:
                 line = line.strip()
@@ -97,7 +101,17 @@ class DBPropertyUtil:
                 if "=" in line:
                     k, v = line.split("=", 1)
                     props[k.strip().lower()] = v.strip()
+        return props
 
+    @staticmethod
+    def get_property_string(file_name: str) -> str:
+        return DBPropertyUtil.build_connection_string(DBPropertyUtil.get_properties(file_name))
+
+    @staticmethod
+    def build_connection_string(props: Dict[str, str]) -> str:
+        """
+        SQL Server ODBC connection string from already parsed properties.
+        """
         # Read properties with sensible defaults
         driver   = props.get("driver", "ODBC Driver 18 for SQL Server")
         server   = props.get("server") or props.get("host") or "localhost"
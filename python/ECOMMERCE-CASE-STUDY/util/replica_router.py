@@ -0,0 +1,256 @@
+# util/replica_router.py
+"""
+Read/write splitting: writes stay on the primary pool, read-only calls
+are spread over read replicas.
+
+Each replica is configured as overrides of the primary's properties
+(`replica.<n>.<key>`), so it inherits driver, credentials and pool sizing
+and only changes what differs, usually the server (SQL Server) or the
+database file (SQLite). Reads go to a replica chosen round-robin or by
+the fewest connections in use; a replica that cannot hand out a
+connection is skipped for `replica_retry_seconds` and the read falls
+back to the primary.
+
+Replicas lag the primary, so routing is read-your-writes aware: after a
+write for a customer (wrote()), that customer's reads go to the primary
+for `read_your_writes_seconds`. The window is tracked in this process
+only; size it above the replicas' usual lag. A read nested inside a
+primary unit of work (e.g. placeOrder reading the cart) always stays on
+the primary connection it is already using.
+
+Nothing connects when the router is built: on_start() callbacks (such as
+starting a replication stand-in) run before the first read is routed.
+
+db.properties:
+    replica.1.server=db-ro-1            one block of overrides per replica
+    replica.2.server=db-ro-2
+    replica_routing=round_robin         or least_loaded
+    read_your_writes_seconds=5
+    replica_retry_seconds=30
+"""
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from util.connection_pool import ConnectionPool
+
+_log = logging.getLogger(__name__)
+_REPLICA_KEY = re.compile(r"replica\.(\w+)\.(.+)")
+
+ROUTINGS = ("round_robin", "least_loaded")
+
+
+def replica_properties(props: Dict[str, str]) -> Dict[str, Dict[str, str]]:
+    """
+    {replica name: full property dict} for every `replica.<name>.*` block,
+    each one the primary's properties with the block's keys applied.
+    """
+    base = {k: v for k, v in props.items() if not _REPLICA_KEY.match(k)}
+    overrides: Dict[str, Dict[str, str]] = {}
+    for key, value in props.items():
+        m = _REPLICA_KEY.match(key)
+        if m:
+            overrides.setdefault(m.group(1), {})[m.group(2)] = value
+    return {name: {**base, **overrides[name]} for name in sorted(overrides)}
+
+
+class _Replica:
+    __slots__ = ("name", "pool", "down_until", "reads", "failures")
+
+    def __init__(self, name: str, pool: ConnectionPool):
+        self.name = name
+        self.pool = pool
+        self.down_until = 0.0
+        self.reads = 0
+        self.failures = 0
+
+
+class ReplicaRouter:
+    """
+    Hands out read connections; used like a pool:
+
+        with router.connection(customer_id) as conn: ...
+
+    or acquire(customer_id) / release(conn) for a connection held across
+    calls (generators).
+    """
+
+    def __init__(self,
+                 primary: ConnectionPool,
+                 replicas: Dict[str, ConnectionPool],
+                 routing: str = "round_robin",
+                 read_your_writes: float = 5.0,
+                 retry_after: float = 30.0,
+                 max_tracked: int = 100000):
+        if routing not in ROUTINGS:
+            raise ValueError(f"replica_routing must be one of: {', '.join(ROUTINGS)}")
+        self.primary = primary
+        self.routing = routing
+        self.read_your_writes = read_your_writes
+        self.retry_after = retry_after
+        self.max_tracked = max_tracked
+        self._replicas = [_Replica(name, pool) for name, pool in replicas.items()]
+        self._lock = threading.Lock()
+        self._next = 0
+        # customer_id -> end of its read-your-writes window, oldest first
+        self._recent: "OrderedDict[int, float]" = OrderedDict()
+        self._owner: Dict[int, _Replica] = {}   # id(conn) -> replica it came from
+        self._on_start: List[Callable[[], None]] = []
+        self._start_lock = threading.Lock()
+        self._on_close: List[Callable[[], None]] = []
+        self.primary_reads = 0
+        self.pinned_reads = 0
+        self.fallbacks = 0
+
+    @classmethod
+    def from_properties(cls, props: Dict[str, str], primary: ConnectionPool,
+                        build_pool: Callable[[Dict[str, str]], ConnectionPool]) -> Optional["ReplicaRouter"]:
+        """
+        Router over one pool per `replica.<n>.*` block (built by
+        `build_pool` from that replica's properties); None without replicas.
+        """
+        configs = replica_properties(props)
+        if not configs:
+            return None
+        return cls(
+            primary,
+            {name: build_pool(replica_props) for name, replica_props in configs.items()},
+            routing=(props.get("replica_routing") or "round_robin").strip().lower(),
+            read_your_writes=float(props.get("read_your_writes_seconds") or 5),
+            retry_after=float(props.get("replica_retry_seconds") or 30),
+        )
+
+    # ---------- writes ----------
+
+    def wrote(self, customer_id: Optional[int]) -> None:
+        """
+        Pins the customer's reads to the primary for read_your_writes seconds.
+        """
+        if customer_id is None or self.read_your_writes <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._recent[customer_id] = now + self.read_your_writes
+            self._recent.move_to_end(customer_id)
+            while self._recent and (len(self._recent) > self.max_tracked
+                                    or next(iter(self._recent.values())) <= now):
+                self._recent.popitem(last=False)
+
+    # ---------- reads ----------
+
+    @contextmanager
+    def connection(self, customer_id: Optional[int] = None) -> Iterator[Any]:
+        """
+        A read connection for one unit of work on behalf of `customer_id`.
+        """
+        if self.primary.holds_connection():
+            with self.primary.connection() as conn:
+                yield conn
+            return
+        conn = self.acquire(customer_id)
+        broken = False
+        try:
+            yield conn
+        except BaseException as e:
+            broken = not isinstance(e, Exception)
+            raise
+        finally:
+            self.release(conn, discard=broken)
+
+    def acquire(self, customer_id: Optional[int] = None) -> Any:
+        if self._on_start:
+            self._start()
+        now = time.monotonic()
+        replica = self._choose(customer_id, now)
+        if replica is not None:
+            try:
+                conn = replica.pool.acquire()
+            except Exception:
+                _log.warning("replica %s unavailable; reading from the primary for %.0fs",
+                             replica.name, self.retry_after, exc_info=True)
+                with self._lock:
+                    replica.failures += 1
+                    replica.down_until = now + self.retry_after
+                    self.fallbacks += 1
+            else:
+                with self._lock:
+                    replica.reads += 1
+                    self._owner[id(conn)] = replica
+                return conn
+        return self.primary.acquire()
+
+    def release(self, conn: Any, discard: bool = False) -> None:
+        with self._lock:
+            replica = self._owner.pop(id(conn), None)
+        (replica.pool if replica is not None else self.primary).release(conn, discard=discard)
+
+    def served_by_replica(self, conn: Any) -> bool:
+        """
+        True for a connection checked out from a replica (it may lag).
+        """
+        return id(conn) in self._owner
+
+    def _choose(self, customer_id: Optional[int], now: float) -> Optional[_Replica]:
+        with self._lock:
+            if customer_id is not None:
+                until = self._recent.get(customer_id)
+                if until is not None and until > now:
+                    self.pinned_reads += 1
+                    return None
+            live = [r for r in self._replicas if r.down_until <= now]
+            if not live:
+                self.primary_reads += 1
+                return None
+            start = self._next % len(live)
+            self._next += 1
+        if self.routing == "round_robin":
+            return live[start]
+        # least_loaded: fewest connections in use, ties rotate
+        rotated = live[start:] + live[:start]
+        return min(rotated, key=lambda r: r.pool.in_use)
+
+    # ---------- lifecycle ----------
+
+    def on_start(self, callback: Callable[[], None]) -> None:
+        """
+        Runs `callback` once, before the first read is routed.
+        """
+        self._on_start.append(callback)
+
+    def _start(self) -> None:
+        with self._start_lock:
+            while self._on_start:
+                self._on_start[0]()     # raises to the reader; retried by the next one
+                self._on_start.pop(0)
+
+    def on_close(self, callback: Callable[[], None]) -> None:
+        """
+        Runs `callback` on close() (e.g. stopping a replication stand-in).
+        """
+        self._on_close.append(callback)
+
+    def close(self) -> None:
+        for callback in self._on_close:
+            callback()
+        for replica in self._replicas:
+            replica.pool.close()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "routing": self.routing,
+                "primary_reads": self.primary_reads,
+                "pinned_reads": self.pinned_reads,
+                "fallbacks": self.fallbacks,
+                "pinned_customers": sum(1 for until in self._recent.values() if until > now),
+                "replicas": {
+                    r.name: {"reads": r.reads, "failures": r.failures, "in_use": r.pool.in_use,
+                             "down": r.down_until > now}
+                    for r in self._replicas
+                },
+            }
@@ -0,0 +1,135 @@
+# util/statement_cache.py
+"""
+Per-connection registry of reusable cursors for the repository's fixed
+statements (existence checks, product load, cart lookup/upsert, order insert).
+
+pyodbc keeps a statement prepared on its cursor and skips SQLPrepare when
+the same SQL text is executed on it again, so handing the same cursor to
+every execution of a statement saves the cursor allocation and the
+server-side parse/prepare per call. (sqlite3 also keeps its own compiled
+statement cache per connection; reusing the cursor saves its allocation.)
+
+The registry lives on the connection proxy, so it disappears with the
+connection: a reconnect (pool discard/recycle) starts with an empty cache.
+A cursor whose statement raised is closed and dropped, and the registry is
+bounded (LRU, `statement_cache_size` in db.properties; 0 disables it).
+
+Unset, the size comes from the dialect: on for SQL Server, off for SQLite,
+where the proxy layer costs about what the saved cursor allocation gains
+(benchmarks/bench_statement_cache.py: addToCart no faster, _load_product a
+few microseconds).
+"""
+from collections import OrderedDict
+from typing import Any, Callable
+
+
+class _CachedCursor:
+    """
+    Registry entry; used as `with cache.cursor(sql) as cur:`. Leaving the
+    block keeps the cursor open for the next call unless an error escaped.
+    """
+    __slots__ = ("cache", "sql", "cur", "busy")
+
+    def __init__(self, cache: "StatementCache", sql: str, cur: Any):
+        self.cache = cache
+        self.sql = sql
+        self.cur = cur
+        self.busy = False
+
+    def __enter__(self) -> Any:
+        self.busy = True
+        return self.cur
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.busy = False
+        if exc_type is not None:
+            self.cache.discard(self.sql)
+        return False
+
+
+class StatementCache:
+    """
+    LRU map of SQL text -> open cursor for one connection. Not thread-safe:
+    like the connection itself, it is used by one thread at a time.
+    """
+
+    def __init__(self, conn: Any, max_size: int = 32):
+        self._conn = conn
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, _CachedCursor]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def cursor(self, sql: str) -> Any:
+        """
+        Context manager yielding the cursor registered for `sql`. Results
+        must be consumed inside the block. A statement already in use further
+        up the stack gets a plain, unregistered cursor.
+        """
+        entry = self._entries.get(sql)
+        if entry is not None:
+            if entry.busy:
+                return self._conn.cursor()
+            self.hits += 1
+            self._entries.move_to_end(sql)
+            return entry
+        self.misses += 1
+        if self.max_size <= 0:
+            return self._conn.cursor()
+        entry = _CachedCursor(self, sql, self._conn.cursor())
+        self._entries[sql] = entry
+        while len(self._entries) > self.max_size:
+            _, old = self._entries.popitem(last=False)
+            self.evictions += 1
+            _close(old.cur)
+        return entry
+
+    def discard(self, sql: str) -> None:
+        entry = self._entries.pop(sql, None)
+        if entry is not None:
+            _close(entry.cur)
+
+    def clear(self) -> None:
+        entries, self._entries = self._entries, OrderedDict()
+        for entry in entries.values():
+            _close(entry.cur)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CachingConnection:
+    """
+    Connection proxy carrying a StatementCache as `.statements`. Closing
+    the connection closes its cached cursors.
+    """
+    __slots__ = ("_conn", "statements")
+
+    def __init__(self, conn: Any, max_size: int = 32):
+        self._conn = conn
+        self.statements = StatementCache(conn, max_size)
+
+    @staticmethod
+    def wrap_connect(connect: Callable[[], Any], max_size: int) -> Callable[[], Any]:
+        """
+        Connection factory for ConnectionPool; returns `connect` unchanged
+        when max_size is 0.
+        """
+        if max_size <= 0:
+            return connect
+        return lambda: CachingConnection(connect(), max_size)
+
+    def close(self) -> None:
+        self.statements.clear()
+        self._conn.close()
+
+    def __getattr__(self, name: str):
+        return getattr(self._conn, name)
+
+
+def _close(cur: Any) -> None:
+    try:
+        cur.close()
+    except Exception:
+        pass        # connection already gone
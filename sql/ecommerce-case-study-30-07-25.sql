@@ -8,6 +8,10 @@ USE EcomDB;
 GO
 
 -- Drop if they exist (safe to re-run)
+IF OBJECT_ID('dbo.sales_backfill', 'U')      IS NOT NULL DROP TABLE dbo.sales_backfill;
+IF OBJECT_ID('dbo.customer_value', 'U')      IS NOT NULL DROP TABLE dbo.customer_value;
+IF OBJECT_ID('dbo.product_sales', 'U')       IS NOT NULL DROP TABLE dbo.product_sales;
+IF OBJECT_ID('dbo.product_sales_daily', 'U') IS NOT NULL DROP TABLE dbo.product_sales_daily;
 IF OBJECT_ID('dbo.order_items', 'U') IS NOT NULL DROP TABLE dbo.order_items;
 IF OBJECT_ID('dbo.orders', 'U')       IS NOT NULL DROP TABLE dbo.orders;
 IF OBJECT_ID('dbo.cart', 'U')         IS NOT NULL DROP TABLE dbo.cart;
@@ -53,6 +57,7 @@ CREATE TABLE dbo.orders (
     order_date        DATETIME2(0)  NOT NULL CONSTRAINT DF_orders_order_date DEFAULT (SYSUTCDATETIME()),
     total_price       DECIMAL(12,2) NOT NULL CHECK (total_price >= 0),
     shipping_address  NVARCHAR(500) NOT NULL,
+    request_key       NVARCHAR(64)  NULL,              -- client/queue key; replays return the existing order
     CONSTRAINT FK_orders_customer FOREIGN KEY (customer_id) REFERENCES dbo.customers(customer_id)
 );
 GO
@@ -63,15 +68,51 @@ CREATE TABLE dbo.order_items (
     order_id      INT NOT NULL,
     product_id    INT NOT NULL,
     quantity      INT NOT NULL CHECK (quantity > 0),
+    unit_price    DECIMAL(10,2) NOT NULL CHECK (unit_price >= 0),  -- price at purchase time
     CONSTRAINT FK_order_items_order   FOREIGN KEY (order_id)   REFERENCES dbo.orders(order_id) ON DELETE CASCADE,
     CONSTRAINT FK_order_items_product FOREIGN KEY (product_id)  REFERENCES dbo.products(product_id)
 );
 GO
 
+-- 6) sales aggregates (dao/sales_analytics.py); updated with every order when sales_aggregates=yes
+CREATE TABLE dbo.product_sales_daily (
+    sales_date  DATE          NOT NULL,        -- UTC
+    product_id  INT           NOT NULL,
+    units       BIGINT        NOT NULL,
+    revenue     DECIMAL(18,2) NOT NULL,
+    CONSTRAINT PK_product_sales_daily PRIMARY KEY (sales_date, product_id)
+);
+GO
+
+CREATE TABLE dbo.product_sales (
+    product_id  INT           PRIMARY KEY,
+    units       BIGINT        NOT NULL,
+    revenue     DECIMAL(18,2) NOT NULL
+);
+GO
+
+CREATE TABLE dbo.customer_value (
+    customer_id     INT           PRIMARY KEY,
+    order_count     INT           NOT NULL,
+    lifetime_value  DECIMAL(18,2) NOT NULL
+);
+GO
+
+-- progress of the one-time backfill (python -m main.sales_backfill)
+CREATE TABLE dbo.sales_backfill (
+    id                INT PRIMARY KEY CHECK (id = 1),
+    through_order_id  INT NOT NULL,
+    done_order_id     INT NOT NULL
+);
+GO
+
 -- Optional indexes
 CREATE INDEX IX_cart_customer            ON dbo.cart(customer_id);
 CREATE INDEX IX_order_items_order        ON dbo.order_items(order_id);
 CREATE INDEX IX_orders_customer_date     ON dbo.orders(customer_id, order_date DESC);
+CREATE UNIQUE INDEX UX_orders_request_key ON dbo.orders(request_key) WHERE request_key IS NOT NULL;
+CREATE INDEX IX_product_sales_revenue    ON dbo.product_sales(revenue DESC);
+CREATE INDEX IX_customer_value_ltv       ON dbo.customer_value(lifetime_value DESC);
 GO
 
 -- Seed data (optional for quick testing)
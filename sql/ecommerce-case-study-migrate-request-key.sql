@@ -0,0 +1,17 @@
+-- Upgrade for databases created before orders.request_key existed.
+-- The key lets placeOrders() / the checkout workers replay a request
+-- without placing the order twice. Existing orders keep NULL.
+USE EcomDB;
+GO
+
+IF COL_LENGTH('dbo.orders', 'request_key') IS NULL
+BEGIN
+    ALTER TABLE dbo.orders ADD request_key NVARCHAR(64) NULL;
+END
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'UX_orders_request_key' AND object_id = OBJECT_ID('dbo.orders'))
+BEGIN
+    CREATE UNIQUE INDEX UX_orders_request_key ON dbo.orders(request_key) WHERE request_key IS NOT NULL;
+END
+GO
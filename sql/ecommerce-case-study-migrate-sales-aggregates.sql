@@ -0,0 +1,51 @@
+-- Upgrade for databases created before the sales aggregates existed
+-- (dao/sales_analytics.py). After creating the tables, set
+-- sales_aggregates=yes for every process that places orders, then count
+-- the existing history once with: python -m main.sales_backfill
+-- (SQLite databases: run ecommerce-case-study-sqlite.sql again instead.)
+USE EcomDB;
+GO
+
+IF OBJECT_ID('dbo.product_sales_daily', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.product_sales_daily (
+        sales_date  DATE          NOT NULL,        -- UTC
+        product_id  INT           NOT NULL,
+        units       BIGINT        NOT NULL,
+        revenue     DECIMAL(18,2) NOT NULL,
+        CONSTRAINT PK_product_sales_daily PRIMARY KEY (sales_date, product_id)
+    );
+END
+GO
+
+IF OBJECT_ID('dbo.product_sales', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.product_sales (
+        product_id  INT           PRIMARY KEY,
+        units       BIGINT        NOT NULL,
+        revenue     DECIMAL(18,2) NOT NULL
+    );
+    CREATE INDEX IX_product_sales_revenue ON dbo.product_sales(revenue DESC);
+END
+GO
+
+IF OBJECT_ID('dbo.customer_value', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.customer_value (
+        customer_id     INT           PRIMARY KEY,
+        order_count     INT           NOT NULL,
+        lifetime_value  DECIMAL(18,2) NOT NULL
+    );
+    CREATE INDEX IX_customer_value_ltv ON dbo.customer_value(lifetime_value DESC);
+END
+GO
+
+IF OBJECT_ID('dbo.sales_backfill', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.sales_backfill (
+        id                INT PRIMARY KEY CHECK (id = 1),
+        through_order_id  INT NOT NULL,
+        done_order_id     INT NOT NULL
+    );
+END
+GO
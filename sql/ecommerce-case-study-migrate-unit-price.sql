@@ -0,0 +1,20 @@
+-- Upgrade for databases created before order_items.unit_price existed.
+-- Existing lines are backfilled with the current product price (best effort).
+USE EcomDB;
+GO
+
+IF COL_LENGTH('dbo.order_items', 'unit_price') IS NULL
+BEGIN
+    ALTER TABLE dbo.order_items ADD unit_price DECIMAL(10,2) NULL;
+END
+GO
+
+UPDATE oi SET oi.unit_price = p.price
+FROM dbo.order_items oi
+JOIN dbo.products p ON p.product_id = oi.product_id
+WHERE oi.unit_price IS NULL;
+GO
+
+ALTER TABLE dbo.order_items ALTER COLUMN unit_price DECIMAL(10,2) NOT NULL;
+ALTER TABLE dbo.order_items ADD CONSTRAINT CK_order_items_unit_price CHECK (unit_price >= 0);
+GO
@@ -0,0 +1,117 @@
+-- SQLite port of ecommerce-case-study-30-07-25.sql (dialect=sqlite).
+-- Same tables, columns and constraint names; the repository maps dbo.<table>
+-- to these. Idempotent: applied automatically when the database file has no
+-- tables (sqlite_schema in db.properties), and safe to run again by hand.
+-- Journal mode / synchronous / foreign_keys are per-connection PRAGMAs set
+-- by the dialect, not here.
+
+BEGIN IMMEDIATE;
+
+-- 1) customers (NOCASE: emails compare like SQL Server's default collation)
+CREATE TABLE IF NOT EXISTS customers (
+    customer_id      INTEGER PRIMARY KEY,
+    name             TEXT    NOT NULL,
+    email            TEXT    NOT NULL UNIQUE COLLATE NOCASE,
+    [password]       TEXT    NOT NULL
+);
+
+-- 2) products
+CREATE TABLE IF NOT EXISTS products (
+    product_id     INTEGER PRIMARY KEY,
+    name           TEXT    NOT NULL,
+    price          NUMERIC NOT NULL CHECK (price >= 0),
+    [description]  TEXT    NULL,
+    stockQuantity  INTEGER NOT NULL CHECK (stockQuantity >= 0)
+);
+
+-- 3) cart
+CREATE TABLE IF NOT EXISTS cart (
+    cart_id      INTEGER PRIMARY KEY,
+    customer_id  INTEGER NOT NULL,
+    product_id   INTEGER NOT NULL,
+    quantity     INTEGER NOT NULL CHECK (quantity > 0),
+    CONSTRAINT FK_cart_customer FOREIGN KEY (customer_id) REFERENCES customers(customer_id),
+    CONSTRAINT FK_cart_product  FOREIGN KEY (product_id)  REFERENCES products(product_id),
+    CONSTRAINT UQ_cart_customer_product UNIQUE (customer_id, product_id)
+);
+
+-- 4) orders (TIMESTAMP: read back as datetime; 'YYYY-MM-DD HH:MM:SS' UTC)
+CREATE TABLE IF NOT EXISTS orders (
+    order_id          INTEGER   PRIMARY KEY,
+    customer_id       INTEGER   NOT NULL,
+    order_date        TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    total_price       NUMERIC   NOT NULL CHECK (total_price >= 0),
+    shipping_address  TEXT      NOT NULL,
+    request_key       TEXT      NULL,       -- client/queue key; replays return the existing order
+    CONSTRAINT FK_orders_customer FOREIGN KEY (customer_id) REFERENCES customers(customer_id)
+);
+
+-- 5) order_items
+CREATE TABLE IF NOT EXISTS order_items (
+    order_item_id INTEGER PRIMARY KEY,
+    order_id      INTEGER NOT NULL,
+    product_id    INTEGER NOT NULL,
+    quantity      INTEGER NOT NULL CHECK (quantity > 0),
+    unit_price    NUMERIC NOT NULL CHECK (unit_price >= 0),  -- price at purchase time
+    CONSTRAINT FK_order_items_order   FOREIGN KEY (order_id)   REFERENCES orders(order_id) ON DELETE CASCADE,
+    CONSTRAINT FK_order_items_product FOREIGN KEY (product_id) REFERENCES products(product_id)
+);
+
+-- 6) sales aggregates (dao/sales_analytics.py); sales_date is 'YYYY-MM-DD' UTC
+CREATE TABLE IF NOT EXISTS product_sales_daily (
+    sales_date  TEXT    NOT NULL,
+    product_id  INTEGER NOT NULL,
+    units       INTEGER NOT NULL,
+    revenue     NUMERIC NOT NULL,
+    CONSTRAINT PK_product_sales_daily PRIMARY KEY (sales_date, product_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS product_sales (
+    product_id  INTEGER PRIMARY KEY,
+    units       INTEGER NOT NULL,
+    revenue     NUMERIC NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS customer_value (
+    customer_id     INTEGER PRIMARY KEY,
+    order_count     INTEGER NOT NULL,
+    lifetime_value  NUMERIC NOT NULL
+);
+
+-- progress of the one-time backfill (python -m main.sales_backfill)
+CREATE TABLE IF NOT EXISTS sales_backfill (
+    id                INTEGER PRIMARY KEY CHECK (id = 1),
+    through_order_id  INTEGER NOT NULL,
+    done_order_id     INTEGER NOT NULL
+);
+
+-- Indexes (FK columns are not indexed automatically in SQLite)
+CREATE INDEX IF NOT EXISTS IX_cart_customer        ON cart(customer_id);
+CREATE INDEX IF NOT EXISTS IX_cart_product         ON cart(product_id);
+CREATE INDEX IF NOT EXISTS IX_order_items_order    ON order_items(order_id);
+CREATE INDEX IF NOT EXISTS IX_order_items_product  ON order_items(product_id);
+CREATE INDEX IF NOT EXISTS IX_orders_customer_date ON orders(customer_id, order_date DESC);
+CREATE UNIQUE INDEX IF NOT EXISTS UX_orders_request_key ON orders(request_key) WHERE request_key IS NOT NULL;
+CREATE INDEX IF NOT EXISTS IX_product_sales_revenue ON product_sales(revenue DESC);
+CREATE INDEX IF NOT EXISTS IX_customer_value_ltv    ON customer_value(lifetime_value DESC);
+
+-- Seed data (optional for quick testing; only into an empty database)
+INSERT OR IGNORE INTO customers (name, email, [password]) VALUES
+('Alice Sharma', 'alice@example.com', 'alice@123'),
+('Bob Kumar',    'bob@example.com',   'bob@123');
+
+INSERT INTO products (name, price, [description], stockQuantity)
+SELECT * FROM (VALUES
+('Bluetooth Earbuds', 1999.00, 'TWS earbuds with charging case', 50),
+('Smartwatch',        4999.00, 'Heart-rate monitor, GPS',        35),
+('USB-C Charger 30W',  899.00, 'Fast charging adapter',          100),
+('Mechanical Keyboard',3999.00,'RGB, blue switches',             20))
+WHERE NOT EXISTS (SELECT 1 FROM products);
+
+INSERT OR IGNORE INTO cart (customer_id, product_id, quantity)
+SELECT c.customer_id, p.product_id, 2
+FROM customers c
+JOIN products p ON p.name='USB-C Charger 30W'
+WHERE c.email='alice@example.com';
+
+COMMIT;